@@ -0,0 +1,5 @@
+##
+# \package sylva.analysis
+#
+# Analysis and simulation of SDF graphs before synthesis.
+##
@@ -0,0 +1,459 @@
+##
+# \package sylva.analysis.buffer_sizing
+#
+# Buffer sizing of SDFG edges under throughput constraints.
+#
+# The throughput of a buffer distribution (one buffer size per Edge)
+# is computed by executing the SDFG self-timed with bounded buffers
+# until a state is visited twice.
+# The buffer distributions are explored in increasing total size,
+# and only the edges whose lack of space delayed an invocation
+# in the periodic phase are enlarged.
+# More information can be found in
+# <https://doi.org/10.1145/1146909.1147138> (last checked 2026-10-19)
+##
+
+import heapq
+from fractions import Fraction
+from math import gcd
+
+from sylva.base.sylva_base import SYLVABase
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Class for buffer distribution.
+##
+
+
+class BufferDistribution(SYLVABase):
+
+    ##
+    # \var sizes
+    # Buffer size of each Edge in number of tokens,
+    # in the order of `sdfg.edges`
+    ##
+    # \var throughput
+    # Number of system iterations per clock cycle
+    # (a fractions.Fraction object)
+    ##
+    # \var edges
+    # The SDFG Edge list
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self        The object
+    # @param      sizes       \copydoc BufferDistribution::sizes
+    # @param      throughput  \copydoc BufferDistribution::throughput
+    # @param      edges       \copydoc BufferDistribution::edges
+    ##
+    def __init__(self, sizes, throughput, edges=[]):
+        self.sizes = list(sizes)
+        self.throughput = throughput
+        self.edges = list(edges)
+
+    ##
+    # @brief      Get the total buffer size
+    ##
+    # @param      self  The object
+    ##
+    # @return     The total buffer size in number of tokens
+    ##
+    def get_size(self):
+        return sum(self.sizes)
+
+    ##
+    # \var size
+    # Total buffer size in number of tokens
+    ##
+    size = property(get_size)
+
+    ##
+    # @brief      Get the buffer size of each output port
+    #
+    # This is the form used by
+    # \ref sylva.code_generation.air.buffer_actors "buffer_actors()".
+    # Ports with more than one outgoing Edge get the largest size.
+    ##
+    # @param      self  The object
+    ##
+    # @return     dictionary object,
+    # the keys are (actor name, port name),
+    # the values are buffer sizes in number of tokens
+    ##
+    def get_port_sizes(self):
+        result = {}
+        for e, size in zip(self.edges, self.sizes):
+            key = (e.src_actor.name, e.src_port.name)
+            result[key] = max(result.get(key, 0), size)
+        return result
+
+
+##
+# @brief      Class for buffer sizing of one SDFG.
+#
+# Usage:
+#
+#     buffer_sizing = BufferSizing(sdfg, execution_times={'fft': 8})
+#     for distribution in buffer_sizing.explore():
+#         print(distribution.size, distribution.throughput)
+#     smallest = buffer_sizing.minimum(Fraction(1, 16))
+##
+
+
+class BufferSizing(SYLVABase):
+
+    ##
+    # \var sdfg
+    # The SDFG
+    ##
+    # \var execution_times
+    # The execution time of each Actor in clock cycles,
+    # in the order of `sdfg.actors`.
+    ##
+    # \var lower_bounds
+    # The smallest buffer size of each Edge which does not deadlock
+    # the Edge on its own
+    ##
+    # \var upper_bounds
+    # The largest explored buffer size of each Edge
+    ##
+    # \var steps
+    # The buffer size increment of each Edge.
+    # Only sizes `lower_bound + k * step` can change the throughput.
+    ##
+    # \var throughputs
+    # Explored buffer distributions,
+    # the keys are tuples of buffer sizes,
+    # the values are (throughput, storage dependent edges).
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self             The object
+    # @param      sdfg             \copydoc BufferSizing::sdfg
+    # @param      execution_times  dictionary object,
+    # the keys are Actor indexes or Actor names,
+    # the values are execution times in clock cycles, default 1.
+    ##
+    def __init__(self, sdfg, execution_times=None):
+
+        execution_times = dict(execution_times or {})
+
+        self.sdfg = sdfg
+        self.actors = list(sdfg.actors)
+        self.edges = list(sdfg.edges)
+        self.repetition_vector = sdfg.repetition_vector
+
+        self.execution_times = [
+            max(1, execution_times.get(a.index, execution_times.get(a.name, 1)))
+            for a in self.actors]
+
+        positions = {a.index: i for i, a in enumerate(self.actors)}
+        self.src = [positions[e.src_actor.index] for e in self.edges]
+        self.dest = [positions[e.dest_actor.index] for e in self.edges]
+        self.produce = [e.src_port.count for e in self.edges]
+        self.consume = [e.dest_port.count for e in self.edges]
+        self.delay = [e.delay or 0 for e in self.edges]
+
+        self.lower_bounds = []
+        self.upper_bounds = []
+        self.steps = []
+        for i in range(len(self.edges)):
+            p, c, d = self.produce[i], self.consume[i], self.delay[i]
+            step = gcd(p, c)
+            if self.src[i] == self.dest[i]:
+                # output space is claimed before the input space is released
+                lower = d + p
+            elif d <= p + c - step:
+                lower = p + c - step + d % step
+            else:
+                lower = d
+            tnse = self.repetition_vector[self.src[i]] * p
+            self.lower_bounds.append(lower)
+            self.upper_bounds.append(max(lower, 2 * tnse + d))
+            self.steps.append(step)
+
+        self.throughputs = {}
+
+    ##
+    # @brief      Compute the throughput of one buffer distribution
+    #
+    # The SDFG is executed self-timed:
+    # every Actor starts as soon as it has enough input tokens and
+    # enough free output buffer space, one invocation at a time.
+    # Input tokens are consumed and output space is claimed at the start,
+    # output tokens are produced and input space is released at the end.
+    # The execution state (tokens on each Edge and remaining execution time
+    # of each Actor) is memoized, so the periodic phase is detected
+    # when one state is reached again.
+    ##
+    # @param      self   The object
+    # @param      sizes  The buffer sizes, in the order of `sdfg.edges`
+    ##
+    # @return     (throughput, storage dependent Edge positions)
+    ##
+    def throughput(self, sizes):
+
+        sizes = tuple(sizes)
+        if sizes in self.throughputs:
+            return self.throughputs[sizes]
+
+        count = len(self.actors)
+        edge_count = len(self.edges)
+        src, dest = self.src, self.dest
+        produce, consume = self.produce, self.consume
+        execution_times = self.execution_times
+
+        incoming = [[] for _ in range(count)]
+        outgoing = [[] for _ in range(count)]
+        for i in range(edge_count):
+            incoming[dest[i]].append(i)
+            outgoing[src[i]].append(i)
+
+        tokens = list(self.delay)
+        space = [sizes[i] - self.delay[i] for i in range(edge_count)]
+        remaining = [0] * count
+
+        # the Actor with the lowest repetition count counts iterations
+        reference = min(range(count), key=lambda a: self.repetition_vector[a])
+        reference_firings = 0
+
+        visited = {}
+        blocked = []
+        time = 0
+
+        while True:
+
+            # start all enabled actors
+            waiting_for_space = set()
+            for a in range(count):
+                if remaining[a]:
+                    continue
+                if any(tokens[i] < consume[i] for i in incoming[a]):
+                    continue
+                full = [i for i in outgoing[a] if space[i] < produce[i]]
+                if full:
+                    waiting_for_space.update(full)
+                    continue
+                for i in incoming[a]:
+                    tokens[i] -= consume[i]
+                for i in outgoing[a]:
+                    space[i] -= produce[i]
+                remaining[a] = execution_times[a]
+                if a == reference:
+                    reference_firings += 1
+
+            state = (tuple(tokens), tuple(remaining))
+            if state in visited:
+                last_time, last_firings, last_step = visited[state]
+                iterations = Fraction(reference_firings - last_firings,
+                                      self.repetition_vector[reference])
+                result = iterations / (time - last_time)
+                dependencies = set()
+                for one_blocked in blocked[last_step:]:
+                    dependencies.update(one_blocked)
+                break
+            visited[state] = (time, reference_firings, len(blocked))
+            blocked.append(waiting_for_space)
+
+            busy = [r for r in remaining if r]
+            if not busy:
+                # deadlock
+                result = Fraction(0)
+                dependencies = waiting_for_space
+                break
+
+            # end the invocations finishing first
+            step = min(busy)
+            time += step
+            for a in range(count):
+                if remaining[a]:
+                    remaining[a] -= step
+                    if not remaining[a]:
+                        for i in outgoing[a]:
+                            tokens[i] += produce[i]
+                        for i in incoming[a]:
+                            space[i] += consume[i]
+
+        self.throughputs[sizes] = (result, sorted(dependencies))
+        return self.throughputs[sizes]
+
+    ##
+    # @brief      Explore the buffer size/throughput trade-off
+    #
+    # Buffer distributions are visited in increasing total size,
+    # starting from the lower bounds.
+    # A distribution is enlarged only on its storage dependent edges,
+    # one step per Edge, and never beyond the upper bounds.
+    # Visited distributions are memoized.
+    #
+    # The number of distributions grows exponentially with the number of
+    # storage dependent edges. After `max_distributions` distributions,
+    # the exploration continues greedily from the largest throughput found
+    # so far by enlarging all its storage dependent edges at once,
+    # so the later Pareto points may be larger than the optimal ones.
+    ##
+    # @param      self               The object
+    # @param      target_throughput  Stop when this throughput is reached.
+    # If not provided, stop at the maximum throughput under the upper bounds.
+    # @param      max_size           Maximum total buffer size to explore
+    # @param      max_distributions  Maximum number of distributions
+    # explored exactly
+    ##
+    # @return     Pareto list of BufferDistribution objects,
+    # with increasing size and increasing throughput
+    ##
+    def explore(self, target_throughput=None, max_size=None,
+                max_distributions=1000):
+
+        if not self.edges:
+            return [BufferDistribution([], self.throughput([])[0], [])]
+
+        maximum, _ = self.throughput(self.upper_bounds)
+        if target_throughput is None or target_throughput > maximum:
+            target_throughput = maximum
+
+        result = []
+
+        def add(sizes, throughput):
+            if result and result[-1].size == sum(sizes):
+                result.pop()
+            result.append(BufferDistribution(sizes, throughput, self.edges))
+
+        def enlarge(sizes, edges):
+            larger = list(sizes)
+            for i in edges:
+                larger[i] = min(larger[i] + self.steps[i], self.upper_bounds[i])
+            return tuple(larger)
+
+        start = tuple(self.lower_bounds)
+        queue = [(sum(start), start)]
+        queued = {start}
+        best = Fraction(-1)
+        best_sizes = start
+
+        while queue and len(queued) <= max_distributions:
+            size, sizes = heapq.heappop(queue)
+            if max_size is not None and size > max_size:
+                return result
+
+            throughput, dependencies = self.throughput(sizes)
+
+            if throughput > best:
+                add(sizes, throughput)
+                best, best_sizes = throughput, sizes
+                if best >= target_throughput:
+                    return result
+
+            for i in dependencies:
+                if sizes[i] + self.steps[i] > self.upper_bounds[i]:
+                    continue
+                larger = enlarge(sizes, [i])
+                if larger not in queued:
+                    queued.add(larger)
+                    heapq.heappush(queue, (size + self.steps[i], larger))
+
+        if not queue:
+            return result
+
+        # greedy exploration
+        sizes = best_sizes
+        while best < target_throughput:
+            larger = enlarge(sizes, self.throughput(sizes)[1])
+            if larger == sizes:
+                larger = enlarge(sizes, range(len(sizes)))
+            if larger == sizes:
+                break
+            if max_size is not None and sum(larger) > max_size:
+                break
+            sizes = larger
+            throughput, _ = self.throughput(sizes)
+            if throughput > best:
+                add(sizes, throughput)
+                best = throughput
+
+        return result
+
+    ##
+    # @brief      Find the smallest buffer distribution for a throughput
+    ##
+    # @param      self               The object
+    # @param      target_throughput  The required throughput,
+    # in system iterations per clock cycle
+    # @param      max_size           Maximum total buffer size to explore
+    ##
+    # @return     BufferDistribution object or None if the throughput
+    # cannot be reached
+    ##
+    def minimum(self, target_throughput, max_size=None):
+        for distribution in self.explore(target_throughput, max_size):
+            if distribution.throughput >= target_throughput:
+                return distribution
+        return None
+
+
+##
+# @brief      Get the size of the output buffer of one HSDFG actor
+# output port
+#
+# The HSDFG actor writes the `port.count` tokens of one invocation
+# into its own buffer, so the explored size of its SDFG output port
+# is only used if it is smaller.
+##
+# @param      actor         The HSDFG Actor, with the name of its SDFG Actor
+# @param      port          The output Port
+# @param      buffer_sizes  dictionary object from
+# BufferDistribution.get_port_sizes(), or None
+##
+# @return     The buffer size in number of tokens
+##
+def output_buffer_size(actor, port, buffer_sizes=None):
+    size = (buffer_sizes or {}).get((actor.name, port.name), port.count)
+    return max(1, min(port.count, size))
+
+
+##
+# @brief      Get the size of one output buffer shared by HSDFG actors
+#
+# The actors write their tokens one after another into one circular
+# buffer. The explored size of one SDFG output port holds all the tokens
+# of its edge, so it is used once for all the HSDFG actors of
+# that SDFG Actor, if it is smaller than their tokens.
+##
+# @param      actors        The HSDFG Actor objects sharing the buffer
+# @param      port          The output Port of the first actor
+# @param      buffer_sizes  dictionary object from
+# BufferDistribution.get_port_sizes(), or None
+##
+# @return     The buffer size in number of tokens
+##
+def shared_buffer_size(actors, port, buffer_sizes=None):
+    tokens = {}
+    for a in actors:
+        for p in a.output_ports:
+            if p.name == port.name:
+                key = (a.name, p.name)
+                tokens[key] = tokens.get(key, 0) + p.count
+    buffer_sizes = buffer_sizes or {}
+    return max(1, sum(min(count, buffer_sizes.get(key, count))
+                      for key, count in tokens.items()))
+
+
+##
+# @brief      Get the addresses of consecutive tokens in one circular buffer
+##
+# @param      count  The number of tokens
+# @param      size   The buffer size in number of tokens
+# @param      first  The index of the first token in the buffer
+##
+# @return     list of addresses
+##
+def buffer_addresses(count, size, first=0):
+    return [(first + i) % size for i in range(count)]
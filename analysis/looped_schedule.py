@@ -0,0 +1,494 @@
+##
+# \package sylva.analysis.looped_schedule
+#
+# Single appearance looped schedules for SDFG.
+#
+# A looped schedule is a compact representation of one system iteration,
+# e.g `(4 a)(2 (2 b) c)` means:
+# fire `a` 4 times, then repeat twice: fire `b` 2 times and `c` once.
+# In a single appearance schedule (SAS) each Actor appears only once.
+#
+# Two heuristics are provided:
+#
+# + APGAN, Acyclic Pairwise Grouping of Adjacent Nodes, bottom-up
+# + RPMC, Recursive Partitioning by Minimum Cuts, top-down
+#
+# Both only work with repetition counts and never enumerate
+# individual invocations, so the run time does not depend on how large
+# the repetition vector is.
+# More information can be found in
+# <https://doi.org/10.1023/A:1008052406396> (last checked 2026-10-19)
+##
+
+import heapq
+from math import gcd
+from functools import reduce
+
+from sylva.base.sylva_base import SYLVABase, Actor
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Class for one schedule loop.
+#
+# `(2 (2 b) c)` is a ScheduleLoop object with `count = 2`
+# and `body = [ScheduleLoop(2, [b]), c]`.
+##
+
+
+class ScheduleLoop(SYLVABase):
+
+    ##
+    # \var count
+    # The number of iterations of this loop.
+    ##
+    # \var body
+    # The list of Actor and ScheduleLoop objects executed
+    # in each iteration of this loop.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self   The object
+    # @param      count  \copydoc ScheduleLoop::count
+    # @param      body   \copydoc ScheduleLoop::body
+    ##
+    def __init__(self, count=1, body=[]):
+        self.count = count
+        self.body = list(body)
+
+    ##
+    # @brief      Returns a string representation of the loop,
+    # e.g `(2 (2 b) c)`
+    ##
+    # @param      self  The object
+    ##
+    # @return     String representation of the object.
+    ##
+    def __str__(self):
+        result = ''
+        for item in self.body:
+            one_item = item.name if isinstance(item, Actor) else str(item)
+            if result and not (result.endswith(')') and one_item.startswith('(')):
+                result += ' '
+            result += one_item
+        if self.count == 1:
+            return result
+        return f'({self.count} {result})'
+
+
+##
+# @brief      Create a loop with `count` iterations around a schedule item
+#
+# Loops with one iteration are not created.
+##
+# @param      count  The count
+# @param      item   Actor or ScheduleLoop object
+##
+# @return     Actor or ScheduleLoop object
+##
+def _loop(count, item):
+    if count == 1:
+        return item
+    if isinstance(item, ScheduleLoop) and item.count == 1:
+        return ScheduleLoop(count, item.body)
+    return ScheduleLoop(count, [item])
+
+
+##
+# @brief      Insert the body of each loop with one iteration
+# directly into its enclosing loop
+#
+# The loop tree is rewritten in place without recursion,
+# so deeply nested clusters are handled in linear time.
+##
+# @param      root  The outermost ScheduleLoop object
+##
+# @return     The outermost ScheduleLoop object
+##
+def _normalize(root):
+    stack = [root]
+    while stack:
+        loop = stack.pop()
+        body = []
+        pending = list(reversed(loop.body))
+        while pending:
+            item = pending.pop()
+            if isinstance(item, ScheduleLoop) and item.count == 1:
+                pending += reversed(item.body)
+            else:
+                body.append(item)
+                if isinstance(item, ScheduleLoop):
+                    stack.append(item)
+        loop.body = body
+    return root
+
+
+##
+# @brief      Class for looped schedule of one SDFG.
+##
+
+
+class LoopedSchedule(SYLVABase):
+
+    ##
+    # \var sdfg
+    # The scheduled SDFG
+    ##
+    # \var root
+    # The ScheduleLoop object with one iteration
+    # for the whole system iteration
+    ##
+    # \var repetition_vector
+    # The repetition vector of the SDFG, in the order of `sdfg.actors`
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self               The object
+    # @param      sdfg               \copydoc LoopedSchedule::sdfg
+    # @param      root               \copydoc LoopedSchedule::root
+    # @param      repetition_vector  \copydoc LoopedSchedule::repetition_vector
+    ##
+    def __init__(self, sdfg, root, repetition_vector):
+        self.sdfg = sdfg
+        self.root = root
+        self.repetition_vector = repetition_vector
+
+    def __str__(self):
+        return str(self.root)
+
+    ##
+    # @brief      Get the enclosing loops of each Actor
+    ##
+    # @param      self  The object
+    ##
+    # @return     dictionary object,
+    # the keys are Actor indexes,
+    # the values are lists of ScheduleLoop objects from the outermost loop.
+    ##
+    def get_enclosing_loops(self):
+        result = {}
+        stack = [(self.root, [self.root])]
+        while stack:
+            loop, path = stack.pop()
+            for item in loop.body:
+                if isinstance(item, Actor):
+                    result[item.index] = path
+                else:
+                    stack.append((item, path + [item]))
+        return result
+
+    ##
+    # @brief      Get the number of invocations of each Actor
+    #
+    # It is the product of the counts of all enclosing loops and
+    # it should be equal to the repetition vector for a valid schedule.
+    ##
+    # @param      self  The object
+    ##
+    # @return     list, in the order of `sdfg.actors`
+    ##
+    def get_firing_counts(self):
+        loops = self.get_enclosing_loops()
+        return [reduce(lambda x, l: x * l.count, loops[a.index], 1)
+                for a in self.sdfg.actors]
+
+    ##
+    # @brief      Get the buffer size of each Edge
+    #
+    # For an Edge `x -> y` in a single appearance schedule,
+    # the number of tokens produced in one iteration of the innermost loop
+    # enclosing both `x` and `y` are stored,
+    # plus the initial tokens on the Edge.
+    ##
+    # @param      self  The object
+    ##
+    # @return     list of number of tokens, in the order of `sdfg.edges`
+    ##
+    def get_buffer_sizes(self):
+        loops = self.get_enclosing_loops()
+        positions = {a.index: i for i, a in enumerate(self.sdfg.actors)}
+        result = []
+        for e in self.sdfg.edges:
+            src_loops = loops[e.src_actor.index]
+            dest_loops = loops[e.dest_actor.index]
+            common = 1
+            for src_loop, dest_loop in zip(src_loops, dest_loops):
+                if src_loop is not dest_loop:
+                    break
+                common *= src_loop.count
+            src = positions[e.src_actor.index]
+            tnse = self.repetition_vector[src] * e.src_port.count
+            result.append(tnse // common + (e.delay or 0))
+        return result
+
+    ##
+    # \var buffer_sizes
+    # \copybrief LoopedSchedule::get_buffer_sizes()
+    # \copydetails LoopedSchedule::get_buffer_sizes()
+    ##
+    buffer_sizes = property(get_buffer_sizes)
+
+    ##
+    # @brief      Get the total buffer memory of this schedule
+    ##
+    # @param      self  The object
+    # @param      bits  Count bits (token count * DataTokenType.size)
+    # instead of tokens
+    ##
+    # @return     The buffer memory.
+    ##
+    def get_buffer_memory(self, bits=False):
+        sizes = self.buffer_sizes
+        if bits:
+            return sum(s * e.src_port.dtype.size
+                       for s, e in zip(sizes, self.sdfg.edges))
+        return sum(sizes)
+
+    ##
+    # \var buffer_memory
+    # Total buffer memory in number of tokens
+    ##
+    buffer_memory = property(get_buffer_memory)
+
+
+##
+# @brief      Get the precedence constraints of one system iteration
+#
+# An Edge with at least as many initial tokens as the number of tokens
+# it carries in one system iteration does not constrain the order of
+# invocations and it is ignored.
+##
+# @param      sdfg               The sdfg
+# @param      repetition_vector  The repetition vector
+##
+# @return     (positions, edges),
+# positions is a dictionary from Actor indexes to positions in `sdfg.actors`,
+# edges is a list of (source position, destination position, tokens)
+##
+def _precedence_edges(sdfg, repetition_vector):
+    positions = {a.index: i for i, a in enumerate(sdfg.actors)}
+    edges = []
+    for e in sdfg.edges:
+        src = positions[e.src_actor.index]
+        dest = positions[e.dest_actor.index]
+        tnse = repetition_vector[src] * e.src_port.count
+        if (e.delay or 0) < tnse:
+            edges.append((src, dest, tnse))
+    return positions, edges
+
+
+##
+# @brief      Get one topological order of SDFG actors
+##
+# @param      count  The number of actors
+# @param      edges  The edges from _precedence_edges()
+##
+# @return     list of actor positions
+##
+def _topological_order(count, edges):
+    in_degree = [0] * count
+    successors = [[] for _ in range(count)]
+    for src, dest, _ in edges:
+        in_degree[dest] += 1
+        successors[src].append(dest)
+    ready = [a for a in range(count) if in_degree[a] == 0]
+    heapq.heapify(ready)
+    result = []
+    while ready:
+        a = heapq.heappop(ready)
+        result.append(a)
+        for b in successors[a]:
+            in_degree[b] -= 1
+            if in_degree[b] == 0:
+                heapq.heappush(ready, b)
+    if len(result) < count:
+        raise ValueError('no single appearance schedule, '
+                         'the SDFG has a cycle without enough delays.')
+    return result
+
+
+##
+# @brief      Create a single appearance schedule with APGAN
+#
+# Repeatedly cluster the two adjacent actors (or clusters)
+# with the largest greatest common divisor of their repetition counts,
+# as long as the clustering does not introduce a cycle.
+# A new cluster `c` of `x` and `y` has repetition count
+# `q(c) = gcd(q(x), q(y))` and schedule `(q(x)/q(c) x)(q(y)/q(c) y)`.
+#
+# A cycle is introduced when there is a path `x -> z -> ... -> y`
+# in the graph of clusters.
+# The actors reachable from each cluster are kept as one bit set
+# and updated on each clustering, so each check takes
+# O(out-degree) bit set operations and each clustering O(V) ones.
+# The remaining clusters are ordered topologically in this graph.
+##
+# @param      sdfg  The sdfg
+##
+# @return     LoopedSchedule object
+##
+def apgan(sdfg):
+
+    repetition_vector = sdfg.repetition_vector
+    count = len(sdfg.actors)
+    _, edges = _precedence_edges(sdfg, repetition_vector)
+    order = _topological_order(count, edges)
+    rank = [0] * count
+    for r, a in enumerate(order):
+        rank[a] = r
+
+    # one cluster per actor at the beginning,
+    # merged clusters get new ids
+    q = list(repetition_vector)
+    item = list(sdfg.actors)
+    min_rank = list(rank)
+    # the actors of each cluster and the actors reachable from it,
+    # as bit sets of actor positions
+    members = [1 << a for a in range(count)]
+    reachable = [0] * count
+    successors = [set() for _ in range(count)]
+    predecessors = [set() for _ in range(count)]
+    alive = [True] * count
+
+    heap = []
+
+    def push(x, y):
+        heapq.heappush(heap, (-gcd(q[x], q[y]), min_rank[x], x, y))
+
+    for src, dest, _ in edges:
+        if dest not in successors[src]:
+            successors[src].add(dest)
+            predecessors[dest].add(src)
+            push(src, dest)
+
+    for a in reversed(order):
+        for s in successors[a]:
+            reachable[a] |= members[s] | reachable[s]
+
+    def introduces_cycle(x, y):
+        return any(reachable[z] & members[y]
+                   for z in successors[x] if z != y)
+
+    while heap:
+        _, _, x, y = heapq.heappop(heap)
+        if not (alive[x] and alive[y] and y in successors[x]):
+            continue
+        if introduces_cycle(x, y):
+            continue
+
+        g = gcd(q[x], q[y])
+        c = len(q)
+        q.append(g)
+        item.append(ScheduleLoop(1, [_loop(q[x] // g, item[x]),
+                                     _loop(q[y] // g, item[y])]))
+        min_rank.append(min(min_rank[x], min_rank[y]))
+        members.append(members[x] | members[y])
+        reachable.append((reachable[x] | reachable[y]) & ~members[c])
+        # the clusters reaching x or y now reach all of c
+        for z in range(c):
+            if alive[z] and reachable[z] & members[c]:
+                reachable[z] |= members[c] | reachable[c]
+        successors.append((successors[x] | successors[y]) - {x, y})
+        predecessors.append((predecessors[x] | predecessors[y]) - {x, y})
+        alive.append(True)
+        alive[x] = alive[y] = False
+
+        for s in successors[c]:
+            predecessors[s] -= {x, y}
+            predecessors[s].add(c)
+            push(c, s)
+        for p in predecessors[c]:
+            successors[p] -= {x, y}
+            successors[p].add(c)
+            push(p, c)
+
+    # clusters with lower minimum rank first among the ready ones
+    in_degree = {c: len(predecessors[c]) for c in range(len(q)) if alive[c]}
+    ready = [(min_rank[c], c) for c, d in in_degree.items() if d == 0]
+    heapq.heapify(ready)
+    remaining = []
+    while ready:
+        _, c = heapq.heappop(ready)
+        remaining.append(c)
+        for s in successors[c]:
+            in_degree[s] -= 1
+            if in_degree[s] == 0:
+                heapq.heappush(ready, (min_rank[s], s))
+    root = ScheduleLoop(1, [_loop(q[c], item[c]) for c in remaining])
+    _normalize(root)
+    return LoopedSchedule(sdfg, root, repetition_vector)
+
+
+##
+# @brief      Create a single appearance schedule with RPMC
+#
+# The actors are split recursively into two sets,
+# where all precedence edges between the sets go from the first set
+# to the second set.
+# The split with the minimum number of tokens crossing it is chosen
+# among the prefixes of a topological order
+# that put at least a quarter of the actors on each side.
+# Each split is found in linear time, so the total run time is
+# O((V + E) log V) for balanced splits.
+##
+# @param      sdfg  The sdfg
+##
+# @return     LoopedSchedule object
+##
+def rpmc(sdfg):
+
+    repetition_vector = sdfg.repetition_vector
+    count = len(sdfg.actors)
+    _, edges = _precedence_edges(sdfg, repetition_vector)
+    order = _topological_order(count, edges)
+    rank = [0] * count
+    for r, a in enumerate(order):
+        rank[a] = r
+
+    # edges indexed by topological rank
+    outgoing = [[] for _ in range(count)]
+    incoming = [[] for _ in range(count)]
+    for src, dest, tnse in edges:
+        outgoing[rank[src]].append((rank[dest], tnse))
+        incoming[rank[dest]].append((rank[src], tnse))
+
+    def split(lo, hi):
+        n = hi - lo
+        margin = max(1, n // 4)
+        best_k, best_cost = None, None
+        cost = 0
+        for k in range(lo + 1, hi):
+            # move order[k - 1] to the left side
+            v = k - 1
+            cost += sum(t for d, t in outgoing[v] if d < hi)
+            cost -= sum(t for s, t in incoming[v] if s >= lo)
+            if k - lo < margin or hi - k < margin:
+                continue
+            balance = abs((k - lo) - (hi - k))
+            if best_cost is None or (cost, balance) < best_cost:
+                best_k, best_cost = k, (cost, balance)
+        return best_k
+
+    def build(lo, hi):
+        g = reduce(gcd, (repetition_vector[order[r]] for r in range(lo, hi)))
+        if hi - lo == 1:
+            return sdfg.actors[order[lo]], g
+        k = split(lo, hi)
+        left, left_g = build(lo, k)
+        right, right_g = build(k, hi)
+        body = [_loop(left_g // g, left), _loop(right_g // g, right)]
+        return ScheduleLoop(1, body), g
+
+    if count == 0:
+        return LoopedSchedule(sdfg, ScheduleLoop(1, []), repetition_vector)
+
+    top, g = build(0, count)
+    root = _normalize(ScheduleLoop(1, [_loop(g, top)]))
+    return LoopedSchedule(sdfg, root, repetition_vector)
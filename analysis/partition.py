@@ -0,0 +1,420 @@
+##
+# \package sylva.analysis.partition
+#
+# Multilevel k-way partitioning of HSDFGs.
+#
+# The graph is partitioned by recursive bisection.
+# Each bisection coarsens the graph with heavy edge matching,
+# bisects the coarsest graph by greedy graph growing
+# and refines the bisection at each level while uncoarsening.
+# The weight of one Edge is the number of bits sent per invocation,
+# i.e. `Port.count * DataTokenType.size`.
+# More information can be found in
+# <https://doi.org/10.1137/S1064827595287997> (last checked 2026-10-19)
+##
+
+import random
+
+from sylva.base.sylva_base import SYLVABase
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Get the weight of one Edge
+##
+# @param      edge  The Edge
+##
+# @return     number of bits sent per invocation
+##
+def edge_weight(edge):
+    dtype = edge.src_port.dtype
+    size = dtype.size if dtype is not None and dtype.size else 1
+    return edge.src_port.count * size
+
+
+##
+# @brief      Class for one partition of a DFG.
+##
+
+
+class Partition(SYLVABase):
+
+    ##
+    # \var dfg
+    # The partitioned DFG (HSDFG or SDFG)
+    ##
+    # \var k
+    # The number of parts
+    ##
+    # \var assignment
+    # The part of each Actor, in the order of `dfg.actors`
+    ##
+    # \var parts
+    # The Actor list of each part
+    ##
+    # \var cut_edges
+    # Edges whose actors are in different parts
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self        The object
+    # @param      dfg         \copydoc Partition::dfg
+    # @param      k           \copydoc Partition::k
+    # @param      assignment  \copydoc Partition::assignment
+    ##
+    def __init__(self, dfg, k, assignment):
+        self.dfg = dfg
+        self.k = k
+        self.assignment = list(assignment)
+        self.parts = [[] for _ in range(k)]
+        for a, part in zip(dfg.actors, self.assignment):
+            self.parts[part].append(a)
+
+        parts = {id(a): part for a, part in zip(dfg.actors, self.assignment)}
+        self.cut_edges = [e for e in dfg.edges
+                          if parts[id(e.src_actor)] != parts[id(e.dest_actor)]]
+
+    ##
+    # @brief      Get the part of one Actor
+    ##
+    # @param      self   The object
+    # @param      actor  The actor
+    ##
+    # @return     The part index
+    ##
+    def get_part(self, actor):
+        for a, part in zip(self.dfg.actors, self.assignment):
+            if a is actor:
+                return part
+        raise ValueError(f'{actor.name}_{actor.index} is not partitioned.')
+
+    ##
+    # @brief      Get the total weight of the cut edges
+    ##
+    # @param      self  The object
+    ##
+    # @return     The cut weight in bits
+    ##
+    def get_cut_weight(self):
+        return sum(edge_weight(e) for e in self.cut_edges)
+
+    ##
+    # \var cut_weight
+    # \copybrief Partition::get_cut_weight()
+    ##
+    cut_weight = property(get_cut_weight)
+
+    ##
+    # @brief      Get the imbalance of the parts
+    ##
+    # @param      self  The object
+    ##
+    # @return     largest part size divided by the average part size
+    ##
+    def get_imbalance(self):
+        return max(len(p) for p in self.parts) * self.k / len(self.dfg.actors)
+
+    ##
+    # \var imbalance
+    # \copybrief Partition::get_imbalance()
+    ##
+    imbalance = property(get_imbalance)
+
+    ##
+    # @brief      Get the edges inside one part
+    ##
+    # @param      self  The object
+    # @param      part  The part index
+    ##
+    # @return     Edge list
+    ##
+    def get_part_edges(self, part):
+        actors = {id(a) for a in self.parts[part]}
+        return [e for a in self.parts[part] for e in a.outgoing_edges
+                if id(e.dest_actor) in actors]
+
+    ##
+    # @brief      Get the interfaces of one part
+    #
+    # The interfaces are the cut edges entering and leaving the part.
+    # When parts are scheduled independently, each input interface Edge
+    # constrains the destination Actor to start after the source Actor
+    # in the other part produces its outputs.
+    ##
+    # @param      self  The object
+    # @param      part  The part index
+    ##
+    # @return     dictionary object with keys 'inputs' and 'outputs',
+    # the values are Edge lists
+    ##
+    def get_interfaces(self, part):
+        actors = {id(a) for a in self.parts[part]}
+        inputs = [e for e in self.cut_edges if id(e.dest_actor) in actors]
+        outputs = [e for e in self.cut_edges if id(e.src_actor) in actors]
+        return {'inputs': inputs, 'outputs': outputs}
+
+
+##
+# @brief      Coarsen one graph with heavy edge matching
+##
+# @param      weights    The vertex weights
+# @param      adjacency  The adjacency of each vertex, {neighbour: weight}
+# @param      rng        The random number generator
+##
+# @return     (coarse vertex of each vertex, coarse weights, coarse adjacency)
+##
+def _coarsen(weights, adjacency, rng):
+
+    count = len(weights)
+    order = list(range(count))
+    rng.shuffle(order)
+
+    match = [-1] * count
+    for v in order:
+        if match[v] != -1:
+            continue
+        best, best_weight = v, 0
+        for u, w in adjacency[v].items():
+            if match[u] == -1 and u != v and w > best_weight:
+                best, best_weight = u, w
+        match[v] = best
+        match[best] = v
+
+    coarse = [-1] * count
+    coarse_weights = []
+    for v in range(count):
+        if coarse[v] == -1:
+            coarse[v] = coarse[match[v]] = len(coarse_weights)
+            coarse_weights.append(weights[v] + (weights[match[v]]
+                                                if match[v] != v else 0))
+
+    coarse_adjacency = [{} for _ in coarse_weights]
+    for v in range(count):
+        cv = coarse[v]
+        for u, w in adjacency[v].items():
+            cu = coarse[u]
+            if cu != cv:
+                coarse_adjacency[cv][cu] = coarse_adjacency[cv].get(cu, 0) + w
+
+    return coarse, coarse_weights, coarse_adjacency
+
+
+##
+# @brief      Get the cut weight of one bisection
+##
+# @param      side       The side of each vertex, 0 or 1
+# @param      adjacency  The adjacency of each vertex
+##
+# @return     The cut weight
+##
+def _cut(side, adjacency):
+    return sum(w for v, neighbours in enumerate(adjacency)
+               for u, w in neighbours.items() if side[u] != side[v]) // 2
+
+
+##
+# @brief      Refine one bisection by moving vertices across the cut
+#
+# Vertices with the largest gains are moved first,
+# as long as the side limits are respected.
+# Vertices on an overweight side are moved out first.
+##
+# @param      side       The side of each vertex, modified in place
+# @param      weights    The vertex weights
+# @param      adjacency  The adjacency of each vertex
+# @param      limits     The maximum weight of each side
+# @param      passes     The maximum number of passes
+##
+def _refine(side, weights, adjacency, limits, passes=8):
+
+    side_weights = [0, 0]
+    for v, s in enumerate(side):
+        side_weights[s] += weights[v]
+
+    def gain(v):
+        result = 0
+        for u, w in adjacency[v].items():
+            result += w if side[u] != side[v] else -w
+        return result
+
+    for _ in range(passes):
+        moved = False
+        overweight = [side_weights[s] > limits[s] for s in (0, 1)]
+        boundary = [v for v in range(len(side))
+                    if overweight[side[v]] or
+                    any(side[u] != side[v] for u in adjacency[v])]
+        candidates = sorted(((gain(v), v) for v in boundary), reverse=True)
+        for _, v in candidates:
+            s = side[v]
+            g = gain(v)
+            if side_weights[1 - s] + weights[v] > limits[1 - s]:
+                continue
+            if g > 0 or side_weights[s] > limits[s]:
+                side[v] = 1 - s
+                side_weights[s] -= weights[v]
+                side_weights[1 - s] += weights[v]
+                moved = True
+        if not moved:
+            break
+
+
+##
+# @brief      Bisect the coarsest graph by greedy graph growing
+##
+# @param      weights    The vertex weights
+# @param      adjacency  The adjacency of each vertex
+# @param      target     The target weight of side 0
+# @param      limits     The maximum weight of each side
+# @param      rng        The random number generator
+# @param      tries      The number of seeds
+##
+# @return     The side of each vertex
+##
+def _initial_bisection(weights, adjacency, target, limits, rng, tries=4):
+
+    count = len(weights)
+    best, best_cut = None, None
+
+    for seed in rng.sample(range(count), min(tries, count)):
+        side = [1] * count
+        grown = 0
+        connection = {seed: 0}
+        while grown < target:
+            if connection:
+                v = max(connection, key=connection.get)
+                del connection[v]
+            else:
+                # the graph is disconnected
+                v = next(u for u in range(count) if side[u] == 1)
+            if grown + weights[v] > limits[0]:
+                break
+            side[v] = 0
+            grown += weights[v]
+            for u, w in adjacency[v].items():
+                if side[u] == 1:
+                    connection[u] = connection.get(u, 0) + w
+        _refine(side, weights, adjacency, limits)
+        cut = _cut(side, adjacency)
+        if best_cut is None or cut < best_cut:
+            best, best_cut = side, cut
+
+    return best
+
+
+##
+# @brief      Multilevel bisection of one graph
+##
+# @param      weights    The vertex weights
+# @param      adjacency  The adjacency of each vertex
+# @param      fraction   The target fraction of the weight on side 0
+# @param      imbalance  The allowed imbalance, e.g. 0.05
+# @param      rng        The random number generator
+# @param      threshold  The size of the coarsest graph
+##
+# @return     The side of each vertex
+##
+def _bisect(weights, adjacency, fraction, imbalance, rng, threshold=64):
+
+    total = sum(weights)
+    target = total * fraction
+    heaviest = max(weights)
+    limits = [max(target * (1 + imbalance), target + heaviest),
+              max((total - target) * (1 + imbalance),
+                  total - target + heaviest)]
+
+    levels = []
+    while len(weights) > threshold:
+        coarse, coarse_weights, coarse_adjacency = \
+            _coarsen(weights, adjacency, rng)
+        if len(coarse_weights) > 0.95 * len(weights):
+            break
+        levels.append((coarse, weights, adjacency))
+        weights, adjacency = coarse_weights, coarse_adjacency
+
+    side = _initial_bisection(weights, adjacency, target, limits, rng)
+
+    for coarse, weights, adjacency in reversed(levels):
+        side = [side[c] for c in coarse]
+        _refine(side, weights, adjacency, limits)
+
+    # strict limits on the finest level
+    limits = [max(target * (1 + imbalance), target + 1),
+              max((total - target) * (1 + imbalance), total - target + 1)]
+    _refine(side, weights, adjacency, limits)
+
+    return side
+
+
+##
+# @brief      Partition one DFG into k parts
+#
+# The parts have balanced numbers of actors and the total weight
+# of the edges between different parts is minimized.
+#
+# Usage:
+#
+#     result = partition(hsdfg, k=4)
+#     for part in range(result.k):
+#         interfaces = result.get_interfaces(part)
+##
+# @param      dfg        The DFG, e.g. an HSDFG
+# @param      k          The number of parts
+# @param      imbalance  The allowed imbalance,
+# each part has at most `(1 + imbalance) * len(dfg.actors) / k` actors
+# when possible
+# @param      seed       The random seed
+##
+# @return     Partition object
+##
+def partition(dfg, k=2, imbalance=0.05, seed=0):
+
+    if k < 1:
+        raise ValueError(f'cannot partition into {k} parts.')
+
+    actors = list(dfg.actors)
+    positions = {id(a): i for i, a in enumerate(actors)}
+    adjacency = [{} for _ in actors]
+    for e in dfg.edges:
+        src, dest = positions[id(e.src_actor)], positions[id(e.dest_actor)]
+        if src == dest:
+            continue
+        w = edge_weight(e)
+        adjacency[src][dest] = adjacency[src].get(dest, 0) + w
+        adjacency[dest][src] = adjacency[dest].get(src, 0) + w
+
+    rng = random.Random(seed)
+    assignment = [0] * len(actors)
+
+    # the imbalance compounds over the levels of recursive bisection
+    depth = max(1, (k - 1).bit_length())
+    imbalance = (1 + imbalance) ** (1 / depth) - 1
+
+    # recursive bisection: (vertices, first part, number of parts)
+    stack = [(list(range(len(actors))), 0, k)]
+    while stack:
+        vertices, first, parts = stack.pop()
+        if parts == 1 or not vertices:
+            for v in vertices:
+                assignment[v] = first
+            continue
+        if len(vertices) == 1:
+            assignment[vertices[0]] = first
+            continue
+
+        local = {v: i for i, v in enumerate(vertices)}
+        local_adjacency = [{local[u]: w for u, w in adjacency[v].items()
+                            if u in local} for v in vertices]
+        left = parts // 2
+        side = _bisect([1] * len(vertices), local_adjacency,
+                       left / parts, imbalance, rng)
+        stack.append(([v for v, s in zip(vertices, side) if s == 0],
+                      first, left))
+        stack.append(([v for v, s in zip(vertices, side) if s == 1],
+                      first + left, parts - left))
+
+    return Partition(dfg, k, assignment)
@@ -0,0 +1,423 @@
+##
+# \package sylva.analysis.simulator
+#
+# Token-level functional simulation of SDF graphs.
+#
+# Each SDFG Actor is executed by a user provided Python/NumPy kernel
+# following a static schedule computed once from the repetition vector.
+# Each SDFG Edge is a preallocated NumPy ring buffer,
+# so no memory is allocated for data tokens when actors fire.
+##
+
+import time
+from collections import deque
+
+import numpy
+
+from sylva.base.sylva_base import SYLVABase
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Get the NumPy data type of a DataTokenType object
+#
+# The name of the DataTokenType object is used when NumPy knows it,
+# e.g `int32` or `float64`, otherwise `default` is used.
+##
+# @param      dtype    The DataTokenType object
+# @param      default  The default NumPy data type
+##
+# @return     NumPy data type
+##
+def numpy_dtype(dtype, default=numpy.float64):
+    try:
+        return numpy.dtype(dtype.name)
+    except (TypeError, AttributeError):
+        return numpy.dtype(default)
+
+
+##
+# @brief      Class for ring buffer.
+#
+# A RingBuffer object is the first-in-first-out storage of one Edge.
+# The storage is allocated once and tokens are copied in and out of it.
+# It is a plain object (not a SYLVABase object) since it is accessed
+# for every actor invocation.
+##
+
+
+class RingBuffer(object):
+
+    __slots__ = ['data', 'capacity', 'delay', 'head', 'count', 'max_count']
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self      The object
+    # @param      capacity  The maximum number of tokens in the buffer
+    # @param      dtype     The NumPy data type of the tokens
+    # @param      delay     The number of initial tokens
+    ##
+    def __init__(self, capacity, dtype, delay=0):
+        self.data = numpy.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self.delay = delay
+        self.reset()
+
+    ##
+    # @brief      Reset the buffer to its initial state,
+    # only the initial tokens (with value 0) are in the buffer.
+    ##
+    # @param      self  The object
+    ##
+    def reset(self):
+        self.data[:] = 0
+        self.head = 0
+        self.count = self.delay
+        self.max_count = self.delay
+
+    ##
+    # @brief      Append `n` tokens from `tokens` to the buffer
+    ##
+    # @param      self    The object
+    # @param      tokens  The NumPy array holding the tokens
+    # @param      n       The number of tokens
+    ##
+    def write(self, tokens, n):
+        capacity = self.capacity
+        tail = self.head + self.count
+        if tail >= capacity:
+            tail -= capacity
+        end = tail + n
+        if end <= capacity:
+            self.data[tail:end] = tokens[:n]
+        else:
+            k = capacity - tail
+            self.data[tail:] = tokens[:k]
+            self.data[:n - k] = tokens[k:n]
+        self.count += n
+        if self.count > self.max_count:
+            self.max_count = self.count
+
+    ##
+    # @brief      Remove `n` tokens from the buffer and copy them to
+    # `tokens[offset:offset + n]`
+    ##
+    # @param      self    The object
+    # @param      tokens  The NumPy array receiving the tokens
+    # @param      offset  The offset in `tokens`
+    # @param      n       The number of tokens
+    ##
+    def read(self, tokens, offset, n):
+        capacity = self.capacity
+        head = self.head
+        end = head + n
+        if end <= capacity:
+            tokens[offset:offset + n] = self.data[head:end]
+        else:
+            k = capacity - head
+            tokens[offset:offset + k] = self.data[head:]
+            tokens[offset + k:offset + n] = self.data[:n - k]
+            end -= capacity
+        self.head = 0 if end == capacity else end
+        self.count -= n
+
+
+##
+# @brief      Class for SDFG simulator.
+#
+# Usage:
+#
+#     simulator = SDFSimulator(sdfg, kernels={'fir': fir, 'fft': fft})
+#     simulator.run(iterations=1000)
+#     print(simulator.report())
+#
+# A kernel is called as `kernel(inputs, outputs)` for each invocation,
+# where `inputs` and `outputs` are lists of NumPy arrays,
+# one array per input port and one array per output port,
+# in the order of `actor.input_ports` and `actor.output_ports`.
+# The length of each array is the token count of the port.
+# A kernel writes its results into `outputs` in place
+# (e.g `outputs[0][:] = inputs[0] * 2`)
+# or returns a sequence of arrays which will be copied to `outputs`.
+# Actors without a kernel emit zero tokens.
+##
+
+
+class SDFSimulator(SYLVABase):
+
+    ##
+    # \var sdfg
+    # The SDFG to simulate.
+    ##
+    # \var kernels
+    # Dictionary of kernels.
+    # The keys are Actor indexes or Actor names (function names).
+    ##
+    # \var repetition_vector
+    # The repetition vector of the SDFG, in the order of `sdfg.actors`.
+    ##
+    # \var schedule
+    # The static schedule of one system iteration.
+    # It is a list of positions of Actor objects in `sdfg.actors`.
+    ##
+    # \var buffers
+    # The list of RingBuffer objects, one per Edge in `sdfg.edges`.
+    ##
+    # \var firing_counts
+    # NumPy array of the number of invocations of each Actor.
+    ##
+    # \var iterations
+    # The number of simulated system iterations.
+    ##
+    # \var elapsed
+    # The simulation time in seconds.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self     The object
+    # @param      sdfg     \copydoc SDFSimulator::sdfg
+    # @param      kernels  \copydoc SDFSimulator::kernels
+    # @param      dtype    Default NumPy data type of the data tokens,
+    # used when the name of the DataTokenType is not known by NumPy
+    ##
+    def __init__(self, sdfg, kernels=None, dtype=numpy.float64):
+
+        self.sdfg = sdfg
+        self.kernels = dict(kernels or {})
+        self.dtype = dtype
+
+        self.actors = list(sdfg.actors)
+        self.edges = list(sdfg.edges)
+        self.repetition_vector = sdfg.repetition_vector
+
+        self.prepare_buffers()
+        self.prepare_firings()
+        self.prepare_schedule()
+
+        self.firing_counts = numpy.zeros(len(self.actors), dtype=numpy.int64)
+        self.iterations = 0
+        self.elapsed = 0.0
+
+    ##
+    # @brief      Get the position of an Actor object in `self.actors`
+    ##
+    # @param      self   The object
+    # @param      actor  The actor
+    ##
+    # @return     The position
+    ##
+    def position(self, actor):
+        return self._positions[actor.index]
+
+    ##
+    # @brief      Create one RingBuffer object for each Edge
+    #
+    # The capacity of each buffer is the number of tokens produced
+    # on the Edge in one system iteration plus its initial tokens,
+    # which is never exceeded by any static schedule.
+    ##
+    # @param      self  The object
+    ##
+    def prepare_buffers(self):
+
+        self._positions = {a.index: i for i, a in enumerate(self.actors)}
+
+        self.buffers = []
+        for edge in self.edges:
+            src = self.position(edge.src_actor)
+            delay = edge.delay or 0
+            capacity = self.repetition_vector[src] * edge.src_port.count
+            dtype = numpy_dtype(edge.src_port.dtype, self.dtype)
+            self.buffers.append(RingBuffer(capacity + delay, dtype, delay))
+
+    ##
+    # @brief      Prepare the kernel, the port arrays and the buffer
+    # operations of each Actor
+    #
+    # All port arrays are allocated here and reused by every invocation.
+    ##
+    # @param      self  The object
+    ##
+    def prepare_firings(self):
+
+        self._firings = []
+
+        for actor in self.actors:
+
+            kernel = self.kernels.get(actor.index, self.kernels.get(actor.name))
+
+            inputs = []
+            reads = []
+            for port in actor.input_ports:
+                edges = [i for i, e in enumerate(self.edges)
+                         if e.dest_actor == actor and e.dest_port == port]
+                size = sum(self.edges[i].dest_port.count for i in edges)
+                tokens = numpy.zeros(size or port.count,
+                                     dtype=numpy_dtype(port.dtype, self.dtype))
+                offset = 0
+                for i in edges:
+                    n = self.edges[i].dest_port.count
+                    reads.append((self.buffers[i], tokens, offset, n))
+                    offset += n
+                inputs.append(tokens)
+
+            outputs = []
+            writes = []
+            for port in actor.output_ports:
+                edges = [i for i, e in enumerate(self.edges)
+                         if e.src_actor == actor and e.src_port == port]
+                size = max([port.count] + [self.edges[i].src_port.count
+                                           for i in edges])
+                tokens = numpy.zeros(size,
+                                     dtype=numpy_dtype(port.dtype, self.dtype))
+                for i in edges:
+                    n = self.edges[i].src_port.count
+                    writes.append((self.buffers[i], tokens, n))
+                outputs.append(tokens)
+
+            self._firings.append((kernel, inputs, outputs, reads, writes))
+
+    ##
+    # @brief      Compute the static schedule of one system iteration
+    #
+    # Only token counts are simulated here.
+    # An Actor is fired as soon as it has enough tokens on all its
+    # incoming edges, until it has been fired as many times as
+    # required by the repetition vector.
+    # Only the fired Actor and its successors can become fireable,
+    # so each invocation is checked in O(degree).
+    ##
+    # @param      self  The object
+    ##
+    def prepare_schedule(self):
+
+        count = len(self.actors)
+        tokens = [e.delay or 0 for e in self.edges]
+        produce = [e.src_port.count for e in self.edges]
+        consume = [e.dest_port.count for e in self.edges]
+        incoming = [[] for _ in range(count)]
+        outgoing = [[] for _ in range(count)]
+        for i, e in enumerate(self.edges):
+            incoming[self.position(e.dest_actor)].append(i)
+            outgoing[self.position(e.src_actor)].append(i)
+
+        fired = [0] * count
+        repetition_vector = self.repetition_vector
+
+        def fireable(a):
+            return fired[a] < repetition_vector[a] and \
+                all(tokens[i] >= consume[i] for i in incoming[a])
+
+        queued = [fireable(a) for a in range(count)]
+        queue = deque(a for a in range(count) if queued[a])
+        self.schedule = []
+
+        while queue:
+            a = queue.popleft()
+            queued[a] = False
+            if not fireable(a):
+                continue
+            for i in incoming[a]:
+                tokens[i] -= consume[i]
+            for i in outgoing[a]:
+                tokens[i] += produce[i]
+            fired[a] += 1
+            self.schedule.append(a)
+            candidates = [a] + [self.position(self.edges[i].dest_actor)
+                                for i in outgoing[a]]
+            for b in candidates:
+                if not queued[b] and fireable(b):
+                    queued[b] = True
+                    queue.append(b)
+
+        if len(self.schedule) < sum(repetition_vector):
+            blocked = [f'{self.actors[a].name}_{self.actors[a].index}'
+                       for a in range(count) if fired[a] < repetition_vector[a]]
+            raise ValueError(f'deadlock, cannot fire {blocked}.')
+
+    ##
+    # @brief      Reset all buffers and counters
+    ##
+    # @param      self  The object
+    ##
+    def reset(self):
+        for one_buffer in self.buffers:
+            one_buffer.reset()
+        self.firing_counts[:] = 0
+        self.iterations = 0
+        self.elapsed = 0.0
+
+    ##
+    # @brief      Simulate a number of system iterations
+    ##
+    # @param      self        The object
+    # @param      iterations  The number of system iterations
+    ##
+    # @return     The total number of simulated system iterations
+    ##
+    def run(self, iterations=1):
+
+        firings = self._firings
+        schedule = self.schedule
+
+        start_time = time.time()
+
+        for _ in range(iterations):
+            for a in schedule:
+                kernel, inputs, outputs, reads, writes = firings[a]
+                for one_buffer, tokens, offset, n in reads:
+                    one_buffer.read(tokens, offset, n)
+                if kernel is not None:
+                    result = kernel(inputs, outputs)
+                    if result is not None:
+                        for tokens, value in zip(outputs, result):
+                            tokens[:] = value
+                for one_buffer, tokens, n in writes:
+                    one_buffer.write(tokens, n)
+
+        self.elapsed += time.time() - start_time
+        self.firing_counts += numpy.asarray(self.repetition_vector) * iterations
+        self.iterations += iterations
+
+        return self.iterations
+
+    ##
+    # @brief      Get the simulation report
+    ##
+    # @param      self  The object
+    ##
+    # @return     A dictionary object with the per-actor firing counts
+    # and the per-edge buffer occupancy
+    ##
+    def report(self):
+
+        if self.elapsed > 0:
+            speed = self.iterations / self.elapsed
+        else:
+            speed = 0.0
+
+        actors = [{'name': a.name,
+                   'index': a.index,
+                   'firings': int(self.firing_counts[i])}
+                  for i, a in enumerate(self.actors)]
+
+        edges = [{'src_actor': e.src_actor.name,
+                  'src_port': e.src_port.name,
+                  'dest_actor': e.dest_actor.name,
+                  'dest_port': e.dest_port.name,
+                  'capacity': b.capacity,
+                  'occupancy': b.count,
+                  'max_occupancy': b.max_count}
+                 for e, b in zip(self.edges, self.buffers)]
+
+        return {'iterations': self.iterations,
+                'elapsed': self.elapsed,
+                'iterations_per_second': speed,
+                'actors': actors,
+                'edges': edges}
@@ -0,0 +1,429 @@
+##
+# \package sylva.analysis.validator
+#
+# Validation of SDF graphs before synthesis.
+#
+# The structural checks run in O(V+E) on the SDFG:
+#
+# + port connectivity (every Edge uses ports of its actors,
+#   every input port is driven by exactly one Edge)
+# + data token type compatibility on each Edge
+# + rate consistency (a repetition vector exists)
+# + liveness (no cycle without initial tokens, found with
+#   Tarjan's strongly connected components)
+#
+# Each strongly connected component with initial tokens on all its
+# cycles is also executed symbolically for one iteration,
+# firing each actor as often as its tokens allow at once,
+# to find cycles with too few initial tokens.
+# The edges are assigned to their components once, so each round
+# of this execution is linear in the size of its component.
+##
+
+from functools import reduce
+from math import gcd
+
+from sylva.base.sylva_base import SYLVABase, SDFG
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Class for one validation issue.
+##
+
+
+class ValidationIssue(SYLVABase):
+
+    ##
+    # \var severity
+    # 'error' if the SDFG cannot be synthesized, 'warning' otherwise
+    ##
+    # \var kind
+    # 'port', 'type', 'consistency' or 'liveness'
+    ##
+    # \var message
+    # Human readable description
+    ##
+    # \var actors
+    # Names of the actors involved
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self      The object
+    # @param      severity  \copydoc ValidationIssue::severity
+    # @param      kind      \copydoc ValidationIssue::kind
+    # @param      message   \copydoc ValidationIssue::message
+    # @param      actors    \copydoc ValidationIssue::actors
+    ##
+    def __init__(self, severity='error', kind='port', message='', actors=[]):
+        self.severity = severity
+        self.kind = kind
+        self.message = message
+        self.actors = list(actors)
+
+    def __str__(self):
+        return f'{self.severity.upper()} [{self.kind}] {self.message}'
+
+
+##
+# @brief      Class for validation report.
+##
+
+
+class ValidationReport(SYLVABase):
+
+    ##
+    # \var issues
+    # List of ValidationIssue objects
+    ##
+    # \var repetition_vector
+    # The repetition vector, None if the SDFG is inconsistent
+    ##
+    # \var components
+    # Strongly connected components with more than one Actor or a self loop,
+    # as lists of Actor names
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self               The object
+    # @param      issues             \copydoc ValidationReport::issues
+    # @param      repetition_vector  \copydoc ValidationReport::repetition_vector
+    # @param      components         \copydoc ValidationReport::components
+    ##
+    def __init__(self, issues=[], repetition_vector=None, components=[]):
+        self.issues = list(issues)
+        self.repetition_vector = repetition_vector
+        self.components = list(components)
+
+    ##
+    # @brief      Get the errors
+    ##
+    # @param      self  The object
+    ##
+    # @return     ValidationIssue objects with severity 'error'
+    ##
+    def get_errors(self):
+        return [i for i in self.issues if i.severity == 'error']
+
+    ##
+    # \var errors
+    # \copybrief ValidationReport::get_errors()
+    ##
+    errors = property(get_errors)
+
+    ##
+    # @brief      Get the warnings
+    ##
+    # @param      self  The object
+    ##
+    # @return     ValidationIssue objects with severity 'warning'
+    ##
+    def get_warnings(self):
+        return [i for i in self.issues if i.severity == 'warning']
+
+    ##
+    # \var warnings
+    # \copybrief ValidationReport::get_warnings()
+    ##
+    warnings = property(get_warnings)
+
+    ##
+    # @brief      Check if the SDFG can be synthesized
+    ##
+    # @param      self  The object
+    ##
+    # @return     True if there is no error
+    ##
+    def is_valid(self):
+        return not self.errors
+
+    ##
+    # \var valid
+    # \copybrief ValidationReport::is_valid()
+    ##
+    valid = property(is_valid)
+
+    ##
+    # @brief      Get the report as text lines, for the SYLVA shell
+    ##
+    # @param      self  The object
+    ##
+    # @return     list of str
+    ##
+    def get_lines(self):
+        result = [f'SDFG validation: {len(self.errors)} error(s), '
+                  f'{len(self.warnings)} warning(s).']
+        if self.repetition_vector is not None:
+            result.append(f'Repetition vector: {self.repetition_vector}')
+        if self.components:
+            result.append(f'Cycles (strongly connected components): '
+                          f'{len(self.components)}')
+        result += [str(i) for i in self.issues]
+        return result
+
+    def __str__(self):
+        return '\n'.join(self.get_lines())
+
+
+##
+# @brief      Tarjan's strongly connected components
+##
+# @param      count       The number of vertices
+# @param      successors  The successors of each vertex
+##
+# @return     list of components, each one a list of vertices
+##
+def strongly_connected_components(count, successors):
+
+    index = [None] * count
+    low = [0] * count
+    on_stack = [False] * count
+    stack = []
+    result = []
+    counter = 0
+
+    for root in range(count):
+        if index[root] is not None:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter(successors[root]))]
+        while work:
+            v, children = work[-1]
+            for w in children:
+                if index[w] is None:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, iter(successors[w])))
+                    break
+                elif on_stack[w]:
+                    low[v] = min(low[v], index[w])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    result.append(component)
+
+    return result
+
+
+##
+# @brief      Execute one iteration of one strongly connected component
+# symbolically
+#
+# Each actor fires as many times as its input tokens allow at once,
+# until all actors reach their repetition counts or none can fire.
+##
+# @param      component          The actor positions of the component
+# @param      edges              The Edge objects between the actors of
+# the component
+# @param      positions          dictionary object,
+# the keys are `id()` of actors, the values are positions
+# @param      repetition_vector  The repetition vector
+##
+# @return     set of actor positions that cannot complete the iteration
+##
+def _blocked_actors(component, edges, positions, repetition_vector):
+
+    step = reduce(gcd, (repetition_vector[a] for a in component))
+    remaining = {a: repetition_vector[a] // step for a in component}
+    tokens = []
+    inputs = {a: [] for a in component}
+    outputs = {a: [] for a in component}
+    for e in edges:
+        src, dest = positions[id(e.src_actor)], positions[id(e.dest_actor)]
+        inputs[dest].append((len(tokens), e.dest_port.count))
+        outputs[src].append((len(tokens), e.src_port.count))
+        tokens.append(e.delay or 0)
+
+    progress = True
+    while progress:
+        progress = False
+        for a in component:
+            firings = min([remaining[a]] +
+                          [tokens[i] // n for i, n in inputs[a]])
+            if firings == 0:
+                continue
+            progress = True
+            remaining[a] -= firings
+            for i, n in inputs[a]:
+                tokens[i] -= firings * n
+            for i, n in outputs[a]:
+                tokens[i] += firings * n
+
+    return {a for a, r in remaining.items() if r}
+
+
+##
+# @brief      Validate one SDFG
+##
+# @param      sdfg  The SDFG
+##
+# @return     ValidationReport object
+##
+def validate(sdfg):
+
+    issues = []
+
+    def add(severity, kind, message, actors):
+        issues.append(ValidationIssue(severity, kind, message,
+                                      [a.name for a in actors]))
+
+    actors = list(sdfg.actors)
+    positions = {id(a): i for i, a in enumerate(actors)}
+    count = len(actors)
+
+    # port connectivity
+    edges = []
+    driven = {}
+    used = set()
+    for e in sdfg.edges:
+        src, dest = e.src_actor, e.dest_actor
+        if id(dest) not in positions:
+            add('error', 'port',
+                f'edge {src.name}.{e.src_port.name} -> '
+                f'{dest.name}.{e.dest_port.name} leaves the SDFG.', [src, dest])
+            continue
+        if not any(p is e.src_port for p in src.output_ports):
+            add('error', 'port',
+                f'{e.src_port.name} is not an output port of {src.name}.',
+                [src])
+            continue
+        if not any(p is e.dest_port for p in dest.input_ports):
+            add('error', 'port',
+                f'{e.dest_port.name} is not an input port of {dest.name}.',
+                [dest])
+            continue
+        if id(e.dest_port) in driven:
+            add('error', 'port',
+                f'{dest.name}.{e.dest_port.name} is driven by '
+                f'more than one edge.', [dest])
+        driven[id(e.dest_port)] = e
+        used.add(id(e.src_port))
+        if (e.delay or 0) < 0:
+            add('error', 'port',
+                f'edge {src.name}.{e.src_port.name} -> '
+                f'{dest.name}.{e.dest_port.name} has negative delay.',
+                [src, dest])
+        edges.append(e)
+
+    for a in actors:
+        for p in a.input_ports:
+            if id(p) not in driven:
+                add('error', 'port',
+                    f'{a.name}.{p.name} is not connected.', [a])
+        for p in a.output_ports:
+            if id(p) not in used:
+                add('warning', 'port',
+                    f'{a.name}.{p.name} is not connected.', [a])
+        for p in a.input_ports + a.output_ports:
+            if not isinstance(p.count, int) or p.count < 1:
+                add('error', 'consistency',
+                    f'{a.name}.{p.name} has invalid token count {p.count}.',
+                    [a])
+
+    # data token types
+    for e in edges:
+        src_type, dest_type = e.src_port.dtype, e.dest_port.dtype
+        if src_type is None or dest_type is None:
+            continue
+        name = (f'{e.src_actor.name}.{e.src_port.name} -> '
+                f'{e.dest_actor.name}.{e.dest_port.name}')
+        if src_type.size != dest_type.size:
+            add('error', 'type',
+                f'{name} connects {src_type.size} bits '
+                f'to {dest_type.size} bits.', [e.src_actor, e.dest_actor])
+        elif src_type.name != dest_type.name:
+            add('warning', 'type',
+                f'{name} connects {src_type.name} to {dest_type.name}.',
+                [e.src_actor, e.dest_actor])
+
+    edges = [e for e in edges
+             if isinstance(e.src_port.count, int) and e.src_port.count > 0 and
+             isinstance(e.dest_port.count, int) and e.dest_port.count > 0]
+
+    # rate consistency
+    repetition_vector, conflicts = SDFG.solve_balance_equations(
+        count,
+        [(positions[id(e.src_actor)], positions[id(e.dest_actor)],
+          e.src_port.count, e.dest_port.count) for e in edges])
+    for i, _ in conflicts:
+        e = edges[i]
+        add('error', 'consistency',
+            f'rates of {e.src_actor.name}.{e.src_port.name} -> '
+            f'{e.dest_actor.name}.{e.dest_port.name} '
+            f'({e.src_port.count}:{e.dest_port.count}) '
+            f'are inconsistent.', [e.src_actor, e.dest_actor])
+
+    # liveness
+    successors = [[] for _ in range(count)]
+    zero_delay_successors = [[] for _ in range(count)]
+    self_loops = set()
+    for e in edges:
+        src, dest = positions[id(e.src_actor)], positions[id(e.dest_actor)]
+        successors[src].append(dest)
+        if src == dest:
+            self_loops.add(src)
+        if not e.delay:
+            zero_delay_successors[src].append(dest)
+            if src == dest:
+                add('error', 'liveness',
+                    f'{actors[src].name} has a self loop without delay.',
+                    [actors[src]])
+
+    components = [c for c in strongly_connected_components(count, successors)
+                  if len(c) > 1 or c[0] in self_loops]
+    deadlocked = set(a for a in self_loops
+                     if a in zero_delay_successors[a])
+    for c in strongly_connected_components(count, zero_delay_successors):
+        if len(c) > 1:
+            deadlocked.update(c)
+            cycle = [actors[a] for a in sorted(c)]
+            add('error', 'liveness',
+                f'cycle without delay through '
+                f'{", ".join(a.name for a in cycle)} deadlocks.', cycle)
+
+    # the other cycles may still have too few initial tokens,
+    # only checked where the rates are consistent
+    component_of = {a: i for i, c in enumerate(components) for a in c}
+    component_edges = [[] for _ in components]
+    for e in edges:
+        src, dest = positions[id(e.src_actor)], positions[id(e.dest_actor)]
+        if src in component_of and \
+                component_of[src] == component_of.get(dest):
+            component_edges[component_of[src]].append(e)
+
+    for c, c_edges in zip(components, component_edges):
+        if conflicts or deadlocked.intersection(c):
+            continue
+        blocked = _blocked_actors(c, c_edges, positions, repetition_vector)
+        if blocked:
+            cycle = [actors[a] for a in sorted(blocked)]
+            add('error', 'liveness',
+                f'cycle through {", ".join(a.name for a in cycle)} '
+                f'deadlocks with its initial tokens.', cycle)
+
+    return ValidationReport(
+        issues,
+        None if conflicts else repetition_vector,
+        [[actors[a].name for a in sorted(c)] for c in components])
@@ -4,7 +4,7 @@
 ##
 
 from sylva.base.fimp import *
-from sylva.base.sylva_base import SYLVABase, SYLVAList, SYLVASVG
+from sylva.base.sylva_base import SYLVABase, SYLVASVG
 
 __author__ = 'Shuo Li <contact@shuol.li>'
 __version__ = '2017-05-18'
@@ -69,17 +69,15 @@ class CGRA(SYLVABase):
                  TC=1, TW=1,
                  fimp_instances=[], **otherkwargs):
 
+        self.name = name
         self.width = width
         self.height = height
         self.hop_x = hop_x
         self.hop_y = hop_y
         self.TC = TC
         self.TW = TW
-        self.fimp_instances = fimp_instances
-
-        SYLVABase.__init__(self, **SYLVABase._args(locals(), globals()))
-
-        self.fimp_instances = SYLVAList(self.fimp_instances)
+        self.fimp_instances = list(fimp_instances)
+        self.update(otherkwargs)
 
     ##
     # @brief      Adds a FIMPInstance to this CGRA
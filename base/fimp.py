@@ -417,3 +417,16 @@ class FIMPLibrary(SYLVABase):
                     self.add_fimp(fimp_cost)
                 print(f'WARNING: Updated FIMPCostSet {item.name}.')
         return True
+
+    ##
+    # @brief      Get the FIMPCost objects for one function
+    ##
+    # @param      self           The object
+    # @param      function_name  The function name
+    ##
+    # @return     list of FIMPCost objects
+    ##
+    def get_fimp_costs(self, function_name):
+        if function_name not in self.fimp_sets:
+            raise ValueError(f'cannot find actor {function_name}')
+        return self.fimp_sets[function_name].fimp_costs
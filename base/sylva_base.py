@@ -6,9 +6,10 @@
 import json
 import os
 import sys
+from fractions import Fraction
+from math import gcd
 
 import graphviz
-from ortools.constraint_solver import pywrapcp
 
 __author__ = 'Shuo Li <contact@shuol.li>'
 __version__ = '2017-05-26'
@@ -556,6 +557,10 @@ class Edge(SYLVABase):
     #
     # \var dest_port
     # The destination Port
+    #
+    # \var delay
+    # The number of initial data tokens on this Edge,
+    # e.g the tokens stored in a feedback loop before the first invocation.
     ##
 
     ##
@@ -566,13 +571,15 @@ class Edge(SYLVABase):
     # @param      src_port     \copydoc Edge::src_port
     # @param      dest_actor   \copydoc Edge::dest_actor
     # @param      dest_port    \copydoc Edge::dest_port
+    # @param      delay        \copydoc Edge::delay
     ##
-    def __init__(self, src_actor, src_port, dest_actor, dest_port):
+    def __init__(self, src_actor, src_port, dest_actor, dest_port, delay=0):
 
         self.src_actor = src_actor
         self.src_port = src_port
         self.dest_actor = dest_actor
         self.dest_port = dest_port
+        self.delay = delay
 
         self.src_actor.outgoing_edges.append(self)
         self.dest_actor.incoming_edges.append(self)
@@ -590,6 +597,8 @@ class Edge(SYLVABase):
             result['dest_actor'] = self.dest_actor.as_dict(actor_exclude)
         if 'dest_port' not in exclude:
             result['dest_port'] = self.dest_port.as_dict()
+        if 'delay' not in exclude:
+            result['delay'] = self.delay
 
         return result
 
@@ -599,7 +608,8 @@ class Edge(SYLVABase):
         src_port = Port.load(dict_obj.get('src_port', {}))
         dest_actor = Actor.load(dict_obj.get('dest_actor', {}))
         dest_port = Port.load(dict_obj.get('dest_port', {}))
-        return cls(src_actor, src_port, dest_actor, dest_port)
+        delay = int(dict_obj.get('delay', 0))
+        return cls(src_actor, src_port, dest_actor, dest_port, delay)
 
 ##
 # @brief      Class for Data Flow Graph.
@@ -853,6 +863,9 @@ class SDFG(HSDFG):
     #
     # More information about repetition vector,
     # check <https://goo.gl/5mcWew> (last check 2017-05-16)
+    #
+    # The balance equations (topology matrix * repetition vector = 0)
+    # are solved by SDFG.solve_balance_equations().
     ##
     # @param      self  The object
     ##
@@ -860,53 +873,87 @@ class SDFG(HSDFG):
     ##
     def _repetition_vector(self):
 
-        # create a constraint problem solver object from ortools
-        solver = pywrapcp.Solver('Get repetition vector')
-
-        topology_matrix = self.topology_matrix
-
-        # Repetition vector P
-        # Each element is the number of invocatios of each SDF actor
-        # in one system iteration.
-        # The value of each repetition can be from value `1`
-        # to value `sys.maxsize` (the maximum integer value of the system).
-        # e.g in 32-bit operating system, `sys.maxsize` = \f$2^{31}-1\f$
-        P = [solver.IntVar(1, sys.maxsize, f'repetition count {actor.index}')
-             for actor in self.actors]
-
-        # Add constraints
-        # sum of P element-wise multiply with
-        # one row (corresponding for one edge) in topology matrix
-        # should be zero.
-        # `ScalProd()` is a method in ortools,
-        # e.g A = [a0, a1, a2], B = [b0, b1, b2]
-        # ScalProd(A, B) = sum(a0*b0 + a1*b1 + a2*b2)
-        for row in topology_matrix:
-            each_row = solver.ScalProd(P, row)
-            # add a constraint that `each_row` should be 0
-            # to balance all the edges.
-            solver.Add(each_row == 0)
-
-        # Create a database for solver
-        db = solver.Phase(P,                            # variables to search
-                          solver.CHOOSE_FIRST_UNBOUND,  # Branching strategy
-                          solver.ASSIGN_MIN_VALUE)      # Assignment strategy
-
-        # Initialize a new search using the created database
-        solver.NewSearch(db)
-
-        # Perform one search and assign a value to the search variables
-        # For search variable `var`,
-        # use `var.Value()` to get its current assigned value
-        solver.NextSolution()
-
-        result = [int(var.Value()) for var in P]
-        # .Value() is for getting the current assigned value
-        # of the search variable.
-        # This method is from ortools
-
+        positions = {actor.index: i for i, actor in enumerate(self.actors)}
+        result, conflicts = self.solve_balance_equations(
+            len(self.actors),
+            [(positions[edge.src_actor.index],
+              positions[edge.dest_actor.index],
+              edge.src_port.count, edge.dest_port.count)
+             for edge in self.edges])
+        if conflicts:
+            actor = self.actors[conflicts[0][1]]
+            raise ValueError(f'inconsistent SDFG, '
+                             f'no repetition vector for '
+                             f'{actor.name}_{actor.index}.')
         return result
 
+    ##
+    # @brief      Solve the balance equations of one SDF graph
+    #
+    # The rational firing rates are propagated along the edges,
+    # one connected component at a time, in O(V + E).
+    # Each component is then scaled to its smallest integer solution.
+    ##
+    # @param      count  The number of actors
+    # @param      edges  list of (source position, destination position,
+    # produced token count, consumed token count)
+    ##
+    # @return     (repetition vector, conflicts),
+    # conflicts is a list of (edge position, actor position)
+    # for each edge whose rates conflict with the rate of that actor,
+    # the repetition vector is only meaningful without conflicts
+    ##
+    @staticmethod
+    def solve_balance_equations(count, edges):
+
+        # neighbours of each actor: (neighbour position, rate ratio, edge)
+        # if actor `a` fires r times, the neighbour fires r * ratio times
+        neighbours = [[] for _ in range(count)]
+        for i, (src, dest, produce, consume) in enumerate(edges):
+            neighbours[src].append((dest, Fraction(produce, consume), i))
+            neighbours[dest].append((src, Fraction(consume, produce), i))
+
+        rates = [None] * count
+        result = [0] * count
+        conflicts = []
+        conflicting_edges = set()
+
+        for first in range(count):
+
+            if rates[first] is not None:
+                continue
+
+            # one connected component
+            rates[first] = Fraction(1)
+            component = [first]
+            stack = [first]
+            while stack:
+                current = stack.pop()
+                for neighbour, ratio, i in neighbours[current]:
+                    rate = rates[current] * ratio
+                    if rates[neighbour] is None:
+                        rates[neighbour] = rate
+                        component.append(neighbour)
+                        stack.append(neighbour)
+                    elif rates[neighbour] != rate and \
+                            i not in conflicting_edges:
+                        conflicting_edges.add(i)
+                        conflicts.append((i, neighbour))
+
+            # smallest integer solution of the component
+            denominator = 1
+            for a in component:
+                d = rates[a].denominator
+                denominator = denominator * d // gcd(denominator, d)
+            numerator = 0
+            for a in component:
+                result[a] = int(rates[a] * denominator)
+                numerator = gcd(numerator, result[a])
+            for a in component:
+                result[a] //= numerator
+
+        return result, conflicts
+
     ##
     # \var repetition_vector
     # \copybrief SDFG::\_repetition\_vector()
@@ -33,6 +33,8 @@ from sylva.code_generation.vhdl_types import \
     integer as integer_DataTokenType, std_logic
 from sylva.code_generation.hsdf_to_vhdl import *
 import sylva.code_generation.sylva_fimp_lib as sflib
+from sylva.analysis.buffer_sizing import output_buffer_size, \
+    shared_buffer_size, buffer_addresses
 
 # All ABBs use the same type of counter.
 
@@ -138,9 +140,12 @@ class ActorAndPort(BassObject):
 
 # Each ABB has its own input selector type
 # sylva_input_selector_N, N = FIMP index
+# The read addresses wrap around the buffers of buffer_actors()
+# of the source FIMP instances, with the same buffer_sizes
 
 
-def input_selector_actor(fimp_instance, sample_interval, max_output=glic.IO, default_name='sylva_input_selector'):
+def input_selector_actor(fimp_instance, sample_interval, max_output=glic.IO, default_name='sylva_input_selector',
+                         buffer_sizes=None):
 
     input_ports = []
     output_ports = []
@@ -180,18 +185,18 @@ def input_selector_actor(fimp_instance, sample_interval, max_output=glic.IO, def
             source_actor = p.src_actor
             source_port = p.src_port
             extra_buffer = p.src_actor.fimp.extra_buffer == 1
-            source_actor_count = len(p.src_actor.fimp.actors)
 
             if extra_buffer == True:
-                addres_port_type = integer_DataTokenType(source_port.count)
+                buffer_size = output_buffer_size(source_actor, source_port, buffer_sizes)
+                addres_port_type = integer_DataTokenType(buffer_size)
                 address_port_name = '_'.join(['read_address',
                                               str(source_fimp.index),
                                               str(source_actor.index),
                                               str(source_port.index)])
 
             else:
-                addres_port_type = \
-                    integer_DataTokenType(source_port.count * source_actor_count)
+                buffer_size = shared_buffer_size(source_fimp.actors, source_port, buffer_sizes)
+                addres_port_type = integer_DataTokenType(buffer_size)
                 address_port_name = '_'.join(['read_address',
                                               str(source_fimp.index),
                                               'shared',
@@ -214,15 +219,17 @@ def input_selector_actor(fimp_instance, sample_interval, max_output=glic.IO, def
                 address_offset = previous_actions * p.dest_port.count
                 actions += [AddressPortAction(
                     cycle=input_start_time + token_index * cycles_step,
-                    address=address_offset + token_index)
-                    for token_index in xrange(p.dest_port.count)]
+                    address=address)
+                    for token_index, address in enumerate(
+                        buffer_addresses(p.dest_port.count, buffer_size, address_offset))]
             else:
                 actor_index = p.src_actor.abb.fimp.actors.index(p.src_actor)
                 address_offset = actor_index * p.src_port.count + previous_actions * p.dest_port.count
                 actions += [AddressPortAction(
                     cycle=input_start_time + token_index * cycles_step,
-                    address=address_offset + token_index)
-                    for token_index in xrange(p.dest_port.count)]
+                    address=address)
+                    for token_index, address in enumerate(
+                        buffer_addresses(p.dest_port.count, buffer_size, address_offset))]
 
     read_address_ports = read_address_ports.values()
     input_ports = control_ports + data_input_ports + [current_cycle_port]
@@ -311,16 +318,20 @@ def output_data_structure(actor):
     cycles_per_data_token = [int(math.ceil(float(output_cycles)/p.count)) for p in actor.output_ports]
     return output_cycles, cycles_per_data_token
 
+
 # Each ABB has its own buffer control type
 # since the number of HSDF actors are different
 # name = Name_FIMPIndex_HSDFActorIndex
 # One controller controls all the buffers
+# The address ports have the widths of the buffers of buffer_actors(),
+# with the same buffer_sizes, and the write addresses wrap around them
 
 
 def buffer_control_actor(controls, fimp_instance, max_cycle,
                          max_output=glic.IO,
                          default_name='sylva_buffer_control',
-                         read_write_signal='wr', extra_buffer=True):
+                         read_write_signal='wr', extra_buffer=True,
+                         buffer_sizes=None):
 
     control_ports, control_port_range = \
         get_control_ports('control_input', max_output, fimp_instance)
@@ -339,25 +350,26 @@ def buffer_control_actor(controls, fimp_instance, max_cycle,
             address_ports.append([])
             # each output port has one output buffer
             for port_index, port in enumerate(actor.output_ports):
+                size = output_buffer_size(actor, port, buffer_sizes)
                 address_ports[-1].append(
                     sdf.port(name='_'.join(['write_address', str(actor.index), str(port.index)]),
-                             type=integer_DataTokenType(port.count)))
+                             type=integer_DataTokenType(size)))
                 address_ports[-1][-1].actions = [
-                    (actor.output_start + token_index * cycles_per_data_token[port_index], token_index)
-                    for token_index in xrange(port.count)]
+                    (actor.output_start + token_index * cycles_per_data_token[port_index], address)
+                    for token_index, address in enumerate(buffer_addresses(port.count, size))]
     else:
-        actor_count = len(fimp_instance.actors)
         # all output ports of all actors share one output buffer
         for port_index, port in enumerate(fimp_instance.actors[0].output_ports):
+            size = shared_buffer_size(fimp_instance.actors, port, buffer_sizes)
             address_ports.append(
                 sdf.port(name='_'.join(['write_address', 'shared', str(port.index)]),
-                         type=integer_DataTokenType(port.count * actor_count)))
+                         type=integer_DataTokenType(size)))
             address_ports[-1].actions = []
             token_index = 0
             for actor_index, actor in enumerate(fimp_instance.actors):
-                for __ in xrange(port.count):
+                for address in buffer_addresses(port.count, size, token_index):
                     action = (actor.output_start + token_index * cycles_per_data_token[port_index],
-                              token_index)
+                              address)
                     token_index += 1
                     address_ports[-1].actions.append(action)
 
@@ -400,9 +412,25 @@ def fimp_actor(fimp_instance, fimp_enable_signal_name='en'):
     return result
 
 
+##
+# @brief      Create the output buffer actors of one FIMP instance
+##
+# @param      fimp_instance      The FIMP instance
+# @param      default_name       The name prefix of the buffer actors
+# @param      read_write_signal  The name prefix of the write enable ports
+# @param      buffer_sizes       dictionary object,
+# the keys are (actor name, output port name),
+# the values are buffer sizes in number of tokens,
+# e.g. from sylva.analysis.buffer_sizing.BufferDistribution.get_port_sizes(),
+# see sylva.analysis.buffer_sizing.output_buffer_size() and
+# sylva.analysis.buffer_sizing.shared_buffer_size().
+##
+# @return     The buffer actors
+##
 def buffer_actors(fimp_instance,
                   default_name='sylva_output_buffer',
-                  read_write_signal='wr'):
+                  read_write_signal='wr',
+                  buffer_sizes=None):
 
     fimp_index = str(fimp_instance.index)
     extra_buffer = fimp_instance.extra_buffer == 1
@@ -416,14 +444,15 @@ def buffer_actors(fimp_instance,
             # each output port has one output buffer
             for port in actor.output_ports:
                 name = '_'.join([default_name, str(fimp_index), str(actor_index), str(port.index)])
+                size = output_buffer_size(actor, port, buffer_sizes)
                 wr_port = sdf.port(name='_'.join([read_write_signal, str(actor.index), str(port.index)]),
                                    index=0, type=std_logic)
                 write_address_port = sdf.port(
                     name='_'.join(['write_address', str(actor_index), str(port.index)]),
-                    type=integer_DataTokenType(port.count))
+                    type=integer_DataTokenType(size))
                 read_address_port = sdf.port(
                     name='_'.join(['read_address', str(fimp_instance.index), str(actor_index), str(port.index)]),
-                    type=integer_DataTokenType(port.count))
+                    type=integer_DataTokenType(size))
                 data_input_port = sdf.port(
                     name='_'.join([port.name]),
                     type=port.type)
@@ -436,7 +465,7 @@ def buffer_actors(fimp_instance,
                 base_actor = sdf.actor(name=name, input_ports=input_ports, output_ports=output_ports)
                 one_buffer = sdf.actor(name=name, input_ports=input_ports, output_ports=output_ports,
                                        base_actor=base_actor)
-                one_buffer.buffer_size = port.count
+                one_buffer.buffer_size = size
                 one_buffer.wr_port = wr_port
                 one_buffer.write_address_port = write_address_port
                 one_buffer.read_address_port = read_address_port
@@ -446,17 +475,17 @@ def buffer_actors(fimp_instance,
 
     else:  # extra_buffer = False
 
-        actor_count = len(fimp_instance.actors)
         for port in fimp_instance.actors[0].output_ports:
             name = '_'.join([default_name, str(fimp_index), 'shared', str(port.index)])
+            size = shared_buffer_size(fimp_instance.actors, port, buffer_sizes)
             wr_port = sdf.port(name='_'.join([read_write_signal, 'shared', str(port.index)]),
                                index=0, type=std_logic)
             write_address_port = sdf.port(
                 name='_'.join(['write_address', 'shared', str(port.index)]),
-                type=integer_DataTokenType(port.count * actor_count))
+                type=integer_DataTokenType(size))
             read_address_port = sdf.port(
                 name='_'.join(['read_address', str(fimp_instance.index), 'shared', str(port.index)]),
-                type=integer_DataTokenType(port.count * actor_count))
+                type=integer_DataTokenType(size))
             data_input_port = sdf.port(
                 name='_'.join([port.name]),
                 type=port.type)
@@ -472,7 +501,7 @@ def buffer_actors(fimp_instance,
             base_actor = sdf.actor(name=name, input_ports=input_ports, output_ports=output_ports)
             one_buffer = sdf.actor(name=name, input_ports=input_ports, output_ports=output_ports,
                                    base_actor=base_actor)
-            one_buffer.buffer_size = port.count * len(fimp_instance.actors)
+            one_buffer.buffer_size = size
             one_buffer.wr_port = wr_port
             one_buffer.write_address_port = write_address_port
             one_buffer.read_address_port = read_address_port
@@ -484,19 +513,22 @@ def buffer_actors(fimp_instance,
     return result
 
 
-def create_abb_hsdf(one_abb, sample_interval):
+def create_abb_hsdf(one_abb, sample_interval, buffer_sizes=None):
 
     one_abb.abb_counter_actor = counter_actor(one_abb.fimp, sample_interval)
     one_abb.abb_control_fsm_actors = [
         actor_fsm_actor(control, sample_interval) for control in one_abb.actor_controls]
     if one_abb.fimp.actors[0].input_ports != []:
-        one_abb.abb_input_selector_actor = input_selector_actor(one_abb.fimp, sample_interval)
+        one_abb.abb_input_selector_actor = input_selector_actor(
+            one_abb.fimp, sample_interval, buffer_sizes=buffer_sizes)
     if one_abb.fimp.actors[0].output_ports != []:
         one_abb.abb_output_selector_actor = output_selector_actor(one_abb.fimp)
-        one_abb.abb_output_buffer_actors = buffer_actors(one_abb.fimp)
+        one_abb.abb_output_buffer_actors = buffer_actors(
+            one_abb.fimp, buffer_sizes=buffer_sizes)
         one_abb.abb_buffer_control_actor = buffer_control_actor(
             one_abb.actor_controls, one_abb.fimp, sample_interval,
-            extra_buffer=one_abb.fimp.extra_buffer == 1)
+            extra_buffer=one_abb.fimp.extra_buffer == 1,
+            buffer_sizes=buffer_sizes)
     one_abb.abb_fimp_control_actor = fimp_control_actor(
         one_abb.actor_controls, one_abb.fimp)
     one_abb.abb_fimp_actor = fimp_actor(one_abb.fimp)
@@ -721,7 +753,8 @@ def abb_to_vhdl(one_abb, sample_interval, sylva_lib):
     return status
 
 
-def air_to_vhdl(air, sample_interval, fimp_lib, output_dir, top_module_name):
+def air_to_vhdl(air, sample_interval, fimp_lib, output_dir, top_module_name,
+                buffer_sizes=None):
 
     cwd = os.getcwd()
     os.chdir(output_dir)
@@ -736,7 +769,7 @@ def air_to_vhdl(air, sample_interval, fimp_lib, output_dir, top_module_name):
             a.abb = one_abb
         one_abb.fimp.abb = one_abb
         sylva_lib = fimp.fimp_lib('FPGA')
-        create_abb_hsdf(one_abb, sample_interval)
+        create_abb_hsdf(one_abb, sample_interval, buffer_sizes)
 
         if 'create temporal fimp lib':
 
@@ -0,0 +1,293 @@
+##
+# \package sylva.dse.budget
+#
+# Adaptive solver time budgeting across schedules
+##
+# Instead of the same time limit for every schedule,
+# the solver time is given in slices under one global time budget.
+# Each schedule keeps its DSE engine between the slices,
+# and the engine continues from its best solution by `resolve()`.
+# The next slice goes to the schedule with the highest
+# upper confidence bound (UCB) of its objective improvement per second,
+# like a multi-armed bandit:
+# schedules which are improving get more slices,
+# and stalled schedules get fewer.
+# Schedules whose sylva.dse.dse.schedule_lower_bound() cannot improve
+# the best objective, and schedules whose search is complete,
+# get no more slices.
+##
+
+import math
+import sys
+import time
+
+from sylva.base.sylva_base import SYLVABase
+from sylva.dse.dse import one_search, some_schedules, ranked_schedules, \
+    create_dse_engine, annotate_solution, schedule_lower_bound, \
+    solution_objective, critical_path_bound
+from sylva.dse.dse_engine import assign_fimps
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Class for the search state of one schedule
+##
+
+
+class ScheduleArm(SYLVABase):
+
+    ##
+    # \var schedule_index
+    # The schedule index.
+    ##
+    # \var schedule
+    # The number of FIMPInstance objects of each SDFG Actor.
+    ##
+    # \var lower_bound
+    # The schedule_lower_bound() of the schedule.
+    ##
+    # \var engine
+    # The DSE engine, created by the first slice.
+    ##
+    # \var fimps
+    # The FIMPInstance objects of the DSE engine.
+    ##
+    # \var solutions
+    # The improving Solution objects.
+    ##
+    # \var best
+    # The best weighted objective value, sys.maxsize if no solution.
+    ##
+    # \var slices
+    # The number of slices given.
+    ##
+    # \var rate
+    # The moving average of the objective improvement per second.
+    ##
+    # \var complete
+    # True if the search of the schedule is complete.
+    ##
+    # \var time_limit
+    # The solver time of the next slice in ms,
+    # doubled after each slice until the first solution is found.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self            The object
+    # @param      schedule_index  \copydoc ScheduleArm::schedule_index
+    # @param      schedule        \copydoc ScheduleArm::schedule
+    # @param      lower_bound     \copydoc ScheduleArm::lower_bound
+    # @param      time_limit      \copydoc ScheduleArm::time_limit
+    ##
+    def __init__(self, schedule_index, schedule, lower_bound, time_limit):
+        self.schedule_index = schedule_index
+        self.schedule = schedule
+        self.lower_bound = lower_bound
+        self.engine = None
+        self.fimps = None
+        self.solutions = []
+        self.best = sys.maxsize
+        self.slices = 0
+        self.rate = 0
+        self.complete = False
+        self.time_limit = time_limit
+
+    ##
+    # @brief      Get the upper confidence bound of the improvement rate
+    ##
+    # @param      self         The object
+    # @param      total        The number of slices given to all the arms
+    # @param      exploration  The weight of the exploration term
+    ##
+    # @return     The score, infinity for arms without any slice
+    ##
+    def score(self, total, exploration):
+        if not self.slices:
+            return math.inf
+        return self.rate + \
+            exploration * math.sqrt(math.log(total) / self.slices)
+
+
+##
+# @brief      Class for adaptive time budgeting across schedules
+##
+
+
+class AdaptiveSearch(SYLVABase):
+
+    ##
+    # \var design
+    # The design specification.
+    ##
+    # \var option
+    # The solver option,
+    # `option.dse_engine` should provide `resolve()` and `is_complete()`.
+    ##
+    # \var hsdfg
+    # The HSDFG of `design.system.sdfg`.
+    ##
+    # \var arms
+    # The ScheduleArm objects, in the order of ranked_schedules().
+    ##
+    # \var slice_time
+    # The solver time of the first slice of each schedule in ms.
+    ##
+    # \var exploration
+    # The weight of the exploration term of the UCB score.
+    ##
+    # \var smoothing
+    # The weight of the last slice in the moving average of the
+    # improvement rate.
+    ##
+    # \var incumbent
+    # The best weighted objective value of all the schedules.
+    ##
+    # \var total_slices
+    # The number of slices given to all the schedules.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self         The object
+    # @param      design       \copydoc AdaptiveSearch::design
+    # @param      option       \copydoc AdaptiveSearch::option
+    # @param      slice_time   \copydoc AdaptiveSearch::slice_time
+    # @param      exploration  \copydoc AdaptiveSearch::exploration
+    # @param      smoothing    \copydoc AdaptiveSearch::smoothing
+    ##
+    def __init__(self, design, option, slice_time=1000, exploration=0.1,
+                 smoothing=0.5):
+
+        self.design = design
+        self.option = option
+        self.hsdfg = design.system.sdfg.get_hsdf()
+        self.slice_time = slice_time
+        self.exploration = exploration
+        self.smoothing = smoothing
+        self.incumbent = sys.maxsize
+        self.total_slices = 0
+
+        schedules = some_schedules(ranked_schedules(design, self.hsdfg),
+                                   option.effort)
+        critical_path = critical_path_bound(design, self.hsdfg)
+        self.arms = [ScheduleArm(i, s, schedule_lower_bound(
+            design, self.hsdfg, s, critical_path), slice_time)
+            for i, s in enumerate(schedules)]
+
+    ##
+    # @brief      Get the arms which can get more slices
+    ##
+    # @param      self  The object
+    ##
+    # @return     list of ScheduleArm objects
+    ##
+    def active_arms(self):
+        return [a for a in self.arms
+                if not a.complete and a.lower_bound < self.incumbent]
+
+    ##
+    # @brief      Search one schedule for one slice
+    ##
+    # @param      self        The object
+    # @param      arm         The ScheduleArm object
+    # @param      time_limit  The solver time in ms
+    ##
+    def run_slice(self, arm, time_limit):
+
+        start_time = time.time()
+        if arm.engine is None:
+            arm.fimps = assign_fimps(self.design.system.sdfg, arm.schedule)
+            arm.engine = create_dse_engine(self.design, self.option,
+                                           self.hsdfg, arm.fimps,
+                                           time_limit=time_limit)
+        else:
+            arm.engine.set_time_limit(time_limit)
+            arm.engine.resolve()
+
+        previous = arm.best
+        while True:
+            solution = one_search(arm.engine)
+            if solution is None:
+                break
+            objective = solution_objective(self.design, solution)
+            if objective < arm.best:
+                annotate_solution(solution, arm.schedule_index,
+                                  arm.schedule, arm.fimps)
+                arm.solutions.append(solution)
+                arm.best = objective
+
+        elapsed = max(time.time() - start_time, 1e-3)
+        arm.complete = arm.engine.is_complete()
+        arm.slices += 1
+        self.total_slices += 1
+        self.incumbent = min(self.incumbent, arm.best)
+
+        # the first solution counts as a full improvement
+        if arm.best < previous:
+            gain = 1 if previous == sys.maxsize else \
+                (previous - arm.best) / max(1, previous)
+        else:
+            gain = 0
+        # a slice may be too short to find the first solution,
+        # but stalled schedules do not get longer slices
+        if arm.solutions:
+            arm.time_limit = self.slice_time
+        else:
+            arm.time_limit *= 2
+        arm.rate = (1 - self.smoothing) * arm.rate + \
+            self.smoothing * gain / elapsed
+
+    ##
+    # @brief      Search the schedules within one time budget
+    #
+    # It can be called again to continue the search with more time.
+    ##
+    # @param      self         The object
+    # @param      time_budget  The wall-clock time budget in ms
+    # @param      log          The status_log object for progress
+    ##
+    # @return     list of Solution lists, one list per schedule
+    ##
+    def search(self, time_budget, log=None):
+
+        start_time = time.time()
+        while True:
+            remaining = time_budget - (time.time() - start_time) * 1000
+            arms = self.active_arms()
+            if remaining <= 0 or not arms:
+                break
+
+            arm = max(arms, key=lambda a: a.score(max(1, self.total_slices),
+                                                   self.exploration))
+            self.run_slice(arm, int(max(1, min(arm.time_limit, remaining))))
+
+            if log is not None:
+                log += ('Schedule %s %s: slice %s, best %s%s.'
+                        % (arm.schedule_index, arm.schedule, arm.slices,
+                           arm.best if arm.solutions else None,
+                           ', complete' if arm.complete else ''))
+                log.update()
+
+        return [list(a.solutions) for a in self.arms]
+
+
+##
+# @brief      Search the schedules of one design with adaptive time budgeting
+##
+# @param      design       The design specification
+# @param      option       The solver option
+# @param      time_budget  The wall-clock time budget in ms
+# @param      slice_time   The solver time of one slice in ms
+# @param      log          The status_log object for progress
+##
+# @return     (list of Solution lists, one list per schedule, the HSDFG)
+##
+def search_adaptive(design, option, time_budget, slice_time=1000, log=None):
+    search = AdaptiveSearch(design, option, slice_time)
+    return search.search(time_budget, log), search.hsdfg
@@ -0,0 +1,164 @@
+##
+# \package sylva.dse.cache
+#
+# Persistent cache of DSE results
+##
+# The results of sylva.dse.dse.search_all() are stored in one directory,
+# one JSON file per design, named by the hash of everything
+# the results depend on:
+# the SDFG structure (the HSDFG is derived from it),
+# the FIMPLibrary entries of its actors,
+# the system_constraint, the system_optimization_objective,
+# the CGRA if any, and the solver options changing the search.
+# The cache keeps at most `max_entries` files,
+# and the least recently used ones are removed first,
+# using the file modification time, which is updated on each hit.
+##
+
+import hashlib
+import json
+import os
+
+from sylva.base.sylva_base import SYLVABase
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Get the cache key of one design and solver option
+##
+# @param      design  The design specification
+# @param      option  The solver option
+##
+# @return     The SHA-256 hex digest
+##
+def design_key(design, option):
+
+    sdfg = design.system.sdfg
+    positions = {id(a): i for i, a in enumerate(sdfg.actors)}
+
+    def ports(port_list):
+        return [[p.name, p.count, p.dtype.name, p.dtype.size]
+                for p in port_list]
+
+    fimp_costs = {}
+    for one_actor in sdfg.actors:
+        fimp_costs[one_actor.name] = [
+            [c.fimp_type_name, c.width, c.height, c.area, c.energy,
+             c.computation_phase, c.input_phase, c.output_phase]
+            for c in design.fimp_lib.get_fimp_costs(one_actor.name)]
+
+    constraint = design.system.constraint
+    k = design.system.optimization_objective
+    dse_engine = option.dse_engine
+    if dse_engine is not None:
+        dse_engine = dse_engine.__module__ + '.' + dse_engine.__qualname__
+
+    key = {
+        'actors': [[a.name, ports(a.input_ports), ports(a.output_ports)]
+                   for a in sdfg.actors],
+        'edges': [[positions[id(e.src_actor)], e.src_port.name,
+                   positions[id(e.dest_actor)], e.dest_port.name, e.delay]
+                  for e in sdfg.edges],
+        'fimp_costs': fimp_costs,
+        'constraint': [constraint.tmax, constraint.rmax,
+                       constraint.amax, constraint.emax],
+        'optimization_objective': [k.ka, k.ke, k.kt, k.kr, k.kc or 0],
+        'option': [option.effort, option.solutions_per_schedule,
+                   option.time_limit, dse_engine,
+                   bool(option.shared_incumbent)]}
+    if design.cgra is not None:
+        key['cgra'] = [design.cgra.width, design.cgra.height,
+                       design.cgra.hop_x, design.cgra.hop_y,
+                       design.cgra.TC, design.cgra.TW]
+
+    return hashlib.sha256(
+        json.dumps(key, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+##
+# @brief      Class for the DSE result cache
+##
+
+
+class ResultCache(SYLVABase):
+
+    ##
+    # \var path
+    # The cache directory.
+    ##
+    # \var max_entries
+    # The maximum number of cached designs.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self         The object
+    # @param      path         \copydoc ResultCache::path
+    # @param      max_entries  \copydoc ResultCache::max_entries
+    ##
+    def __init__(self, path, max_entries=64):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(path, exist_ok=True)
+
+    ##
+    # @brief      Get the file name of one key
+    ##
+    # @param      self  The object
+    # @param      key   The key from design_key()
+    ##
+    # @return     The file name
+    ##
+    def file_name(self, key):
+        return os.path.join(self.path, key + '.json')
+
+    ##
+    # @brief      Get the results of one key
+    ##
+    # @param      self  The object
+    # @param      key   The key from design_key()
+    ##
+    # @return     list of solution dictionary lists, one list per schedule,
+    # or None if the key is not cached
+    ##
+    def get_results(self, key):
+
+        file_name = self.file_name(key)
+        try:
+            with open(file_name, 'r') as fp:
+                results = json.load(fp)
+        except (OSError, ValueError):
+            return None
+
+        # the most recently used
+        os.utime(file_name)
+
+        return results
+
+    ##
+    # @brief      Store the results of one key
+    #
+    # The least recently used files are removed
+    # if there are more than `max_entries` files.
+    ##
+    # @param      self     The object
+    # @param      key      The key from design_key()
+    # @param      results  list of Solution lists, one list per schedule
+    ##
+    def put_results(self, key, results):
+
+        file_name = self.file_name(key)
+        temporary_file_name = file_name + '.tmp'
+        with open(temporary_file_name, 'w') as fp:
+            json.dump([[dict(s) for s in result] for result in results], fp)
+        os.replace(temporary_file_name, file_name)
+
+        entries = sorted(
+            (os.path.getmtime(os.path.join(self.path, n)), n)
+            for n in os.listdir(self.path) if n.endswith('.json'))
+        for _, n in entries[:max(0, len(entries) - self.max_entries)]:
+            os.remove(os.path.join(self.path, n))
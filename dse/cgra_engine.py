@@ -0,0 +1,335 @@
+##
+# \package sylva.dse.cgra_engine
+#
+# Design Space Exploration (DSE) Engine scheduling and floorplanning
+# one CGRA at once
+##
+# The CSOP of sylva.dse.cpsat_engine.CPSATEngine is extended
+# with the position of each FIMPInstance on the CGRA fabric,
+# so the FIMP types, start times and positions are decided
+# in one CP-SAT search.
+# The width and height of one FIMPInstance are the ones of its selected
+# FIMP type, at least one CGRA element,
+# and the FIMPInstance objects cannot overlap on the fabric.
+# As in sylva.code_generation.floorplanner, the output port of one
+# FIMPInstance is at its top-right element and the input port
+# at its top-left element.
+# One sliding window reaches `hop_x` elements on the x-axis and
+# `hop_y` elements on the y-axis, so the data of one HSDFG edge passes
+#
+#     routing points = max(ceil(x distance / hop_x),
+#                          ceil(y distance / hop_y)) - 1
+#
+# and it takes `routing points * (TC + TW) + TW` clock cycles,
+# between the end of the source actor and the start of
+# the destination actor.
+# The HSDFG edges between actors of one FIMPInstance take no time.
+# The communication cost is the Manhattan distance times the data size
+# of each HSDFG edge, see sylva.analysis.partition.edge_weight(),
+# weighted by KC in the objective,
+# while the communication time is already in the latency
+# and sample interval.
+##
+
+from sylva.analysis.partition import edge_weight
+from sylva.dse.cpsat_engine import CPSATEngine
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Class for joint scheduling and floorplanning DSE engine
+#
+# It can replace sylva.dse.dse_engine.DSEEngine in sylva.dse.one_search,
+# and sylva.dse.dse.create_dse_engine() gives it `design.cgra`.
+# The result also has the position of each FIMPInstance,
+# `x` and `y`, the total number of routing points
+# and the communication cost.
+##
+
+
+class CGRAEngine(CPSATEngine):
+
+    ##
+    # \var cgra
+    # The sylva.base.cgra.CGRA object.
+    ##
+    # \var KC
+    # Weight factor for communication cost.
+    ##
+    # \var fimp_width
+    # The width variable of each FIMPInstance.
+    ##
+    # \var x
+    # The x position variable of each FIMPInstance.
+    ##
+    # \var y
+    # The y position variable of each FIMPInstance.
+    ##
+    # \var routing_points
+    # The (routing point variable, Manhattan distance expression)
+    # of each pair of FIMPInstance positions with HSDFG edges,
+    # by (source, destination).
+    ##
+    # \var communication_cost
+    # The communication cost variable.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self            The object
+    # @param      hsdfg           The HSDFG object
+    # @param      fimp_library    The FIMPLibrary
+    # @param      fimp_instances  The list of FIMPInstance objects
+    # @param      cgra            \copydoc CGRAEngine::cgra
+    # @param      KC              \copydoc CGRAEngine::KC
+    # @param      kwargs          The other arguments of
+    # sylva.dse.cpsat_engine.CPSATEngine
+    ##
+    def __init__(self, hsdfg, fimp_library, fimp_instances, cgra=None, KC=0,
+                 **kwargs):
+
+        if cgra is None:
+            raise ValueError('CGRAEngine needs a CGRA.')
+
+        # used by the CSOP generation of CPSATEngine.__init__()
+        self.cgra = cgra
+        self.KC = KC
+
+        super().__init__(hsdfg, fimp_library, fimp_instances, **kwargs)
+
+    ##
+    # @brief      Get the size of one FIMP type on the CGRA fabric
+    ##
+    # @param      self  The object
+    # @param      cost  The FIMPCost object
+    ##
+    # @return     (width, height)
+    ##
+    def fimp_size(self, cost):
+        return max(1, int(cost.width or 0)), max(1, int(cost.height or 0))
+
+    ##
+    # @brief      Get the routing points of one distance
+    ##
+    # @param      self        The object
+    # @param      x_distance  The distance on the x-axis
+    # @param      y_distance  The distance on the y-axis
+    ##
+    # @return     int
+    ##
+    def count_routing_points(self, x_distance, y_distance):
+        windows = max(-(-x_distance // self.cgra.hop_x),
+                      -(-y_distance // self.cgra.hop_y))
+        return max(0, windows - 1)
+
+    ##
+    # @brief      Prepare FIMP selection variable
+    #
+    # The horizon and bound of CPSATEngine are extended by
+    # the longest communication time of each HSDFG Actor.
+    ##
+    # @param      self  The object
+    ##
+    def prepare_fimp_selection_variable(self):
+
+        super().prepare_fimp_selection_variable()
+
+        max_time = self.count_routing_points(
+            self.cgra.width - 1, self.cgra.height - 1) * \
+            (self.cgra.TC + self.cgra.TW) + self.cgra.TW
+        self.horizon += max_time * len(self.actors)
+        self.bound += max_time * len(self.actors)
+
+    ##
+    # @brief      Prepare the position variables of the FIMPInstance objects,
+    # which cannot overlap on the CGRA fabric
+    ##
+    # @param      self  The object
+    ##
+    def prepare_position_variables(self):
+
+        self.x = []
+        self.y = []
+        self.fimp_width = []
+        x_intervals = []
+        y_intervals = []
+        for f, fimp_costs in enumerate(self.fimp_matrix):
+            sizes = [self.fimp_size(c) for c in fimp_costs]
+            width = self.model.NewIntVar(
+                min(w for w, _ in sizes), max(w for w, _ in sizes),
+                f'width {f}')
+            self.model.Add(width == self.selected(
+                f, lambda c: self.fimp_size(c)[0]))
+            height = self.model.NewIntVar(
+                min(h for _, h in sizes), max(h for _, h in sizes),
+                f'height {f}')
+            self.model.Add(height == self.selected(
+                f, lambda c: self.fimp_size(c)[1]))
+            x = self.model.NewIntVar(0, self.cgra.width - 1, f'x {f}')
+            y = self.model.NewIntVar(0, self.cgra.height - 1, f'y {f}')
+            x_end = self.model.NewIntVar(1, self.cgra.width, f'x end {f}')
+            y_end = self.model.NewIntVar(1, self.cgra.height, f'y end {f}')
+            x_intervals.append(self.model.NewIntervalVar(
+                x, width, x_end, f'x interval {f}'))
+            y_intervals.append(self.model.NewIntervalVar(
+                y, height, y_end, f'y interval {f}'))
+            self.x.append(x)
+            self.y.append(y)
+            self.fimp_width.append(width)
+
+        self.model.AddNoOverlap2D(x_intervals, y_intervals)
+
+    ##
+    # @brief      Prepare the routing point variables of one pair of
+    # FIMPInstance objects
+    ##
+    # @param      self  The object
+    # @param      src   The source FIMPInstance position
+    # @param      dest  The destination FIMPInstance position
+    ##
+    # @return     (routing point variable, Manhattan distance expression)
+    ##
+    def prepare_routing_variables(self, src, dest):
+
+        distances = []
+        windows = []
+        for src_position, dest_position, size, hop, axis in [
+                (self.x[src] + self.fimp_width[src] - 1, self.x[dest],
+                 self.cgra.width, self.cgra.hop_x, 'x'),
+                (self.y[src], self.y[dest],
+                 self.cgra.height, self.cgra.hop_y, 'y')]:
+            distance = self.model.NewIntVar(
+                0, size - 1, f'{axis} distance {src} {dest}')
+            self.model.AddAbsEquality(distance, src_position - dest_position)
+            # the number of sliding windows, ceil(distance / hop)
+            window = self.model.NewIntVar(
+                0, size, f'{axis} windows {src} {dest}')
+            self.model.AddDivisionEquality(window, distance + hop - 1, hop)
+            distances.append(distance)
+            windows.append(window)
+
+        max_windows = self.model.NewIntVar(
+            0, max(self.cgra.width, self.cgra.height),
+            f'windows {src} {dest}')
+        self.model.AddMaxEquality(max_windows, windows)
+        routing_points = self.model.NewIntVar(
+            0, max(self.cgra.width, self.cgra.height),
+            f'routing points {src} {dest}')
+        self.model.AddMaxEquality(routing_points, [max_windows - 1, 0])
+
+        return routing_points, sum(distances)
+
+    ##
+    # @brief      Add the data dependency constraints with
+    # the communication time on the CGRA
+    ##
+    # @param      self  The object
+    ##
+    def add_data_dependency_constraints(self):
+
+        self.prepare_position_variables()
+
+        positions = {id(a): i for i, a in enumerate(self.actors)}
+        self.routing_points = {}
+        communication_cost = []
+        max_communication_cost = 0
+        for e in self.hsdfg.edges:
+            if e.delay:
+                continue
+            a, d = positions[id(e.src_actor)], positions[id(e.dest_actor)]
+            src, dest = self.actor_fimps[a], self.actor_fimps[d]
+            if src == dest:
+                self.model.Add(self.start[d] > self.end[a])
+                continue
+
+            if (src, dest) not in self.routing_points:
+                self.routing_points[(src, dest)] = \
+                    self.prepare_routing_variables(src, dest)
+            routing_points, distance = self.routing_points[(src, dest)]
+
+            self.model.Add(self.start[d] > self.end[a] + self.cgra.TW +
+                           routing_points * (self.cgra.TC + self.cgra.TW))
+            tokens = edge_weight(e)
+            communication_cost.append(distance * tokens)
+            max_communication_cost += \
+                (self.cgra.width + self.cgra.height) * tokens
+
+        self.communication_cost = self.model.NewIntVar(
+            0, max_communication_cost, 'communication cost')
+        self.model.Add(self.communication_cost == sum(communication_cost))
+
+    ##
+    # @brief      Prepare optimization objective
+    #
+    # The communication cost is weighted by KC,
+    # and the number of extra buffers is minimized with the lowest priority.
+    ##
+    # @param      self  The object
+    # @param      KA    Weight factor for area
+    # @param      KE    Weight factor for energy
+    # @param      KT    Weight factor for latency
+    # @param      KR    Weight factor for sample interval
+    ##
+    def prepare_optimization_objective(self, KA, KE, KT, KR):
+        self.weights = (KA, KE, KT, KR)
+        self.objective = KA * self.area + KE * self.energy + \
+            KT * self.latency + KR * self.sample_interval + \
+            self.KC * self.communication_cost
+        self.model.Minimize(
+            self.objective * (len(self.actors) + 1) + sum(self.extra_buffer))
+
+    ##
+    # @brief      Get the weighted objective value of one result
+    ##
+    # @param      self    The object
+    # @param      result  dictionary object with the fields used by
+    # sylva.dse.dse.one_search
+    ##
+    # @return     int, or None if the communication cost is weighted
+    # and the result does not have it, e.g. from the other DSE engines
+    ##
+    def result_objective(self, result):
+        objective = super().result_objective(result)
+        if not self.KC:
+            return objective
+        if result.get('communication_cost') is None:
+            return None
+        return objective + self.KC * result['communication_cost']
+
+    ##
+    # @brief      Use one solution as solution hint and upper bound
+    #
+    # The FIMPInstance positions are also hints if the solution has them.
+    ##
+    # @param      self    The object
+    # @param      result  dictionary object with the fields used by
+    # sylva.dse.dse.one_search
+    ##
+    def add_solution_hint(self, result):
+        super().add_solution_hint(result)
+        for name in ['x', 'y']:
+            if result.get(name) is not None:
+                for variable, value in zip(self[name], result[name]):
+                    self.model.AddHint(variable, value)
+
+    ##
+    # @brief      Get the result fields of one solution
+    ##
+    # @param      self   The object
+    # @param      value  The function giving the value of one variable
+    ##
+    # @return     dictionary object with the fields used by
+    # sylva.dse.dse.one_search
+    ##
+    def get_result(self, value):
+        result = super().get_result(value)
+        result['x'] = [int(value(v)) for v in self.x]
+        result['y'] = [int(value(v)) for v in self.y]
+        result['routing_points'] = sum(
+            int(value(v)) for v, _ in self.routing_points.values())
+        result['communication_cost'] = int(value(self.communication_cost))
+        return result
@@ -0,0 +1,185 @@
+##
+# \package sylva.dse.cost_tensor
+#
+# FIMP cost tensors of one schedule for pruning before the CP search
+##
+# The FIMPCost fields of the FIMP types of all the FIMPInstance objects
+# are kept in NumPy arrays, one row per FIMPInstance and
+# one column per FIMP type, padded for the FIMPInstance objects
+# with fewer FIMP types.
+# For each FIMP type of each FIMPInstance, a lower bound of the area,
+# energy, latency and sample interval of any FIMP type selection
+# with it is evaluated for all the FIMP types at once,
+# taking the cheapest allowed FIMP type of the other FIMPInstance objects.
+# FIMP types whose lower bound violates one of the constraints
+# can never be selected, and they are pruned until no more FIMP type
+# can be pruned, as pruning raises the lower bounds of the others.
+##
+
+import numpy
+
+from sylva.base.sylva_base import SYLVABase
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Class for the FIMP cost tensors of FIMPInstance objects
+##
+
+
+class FIMPCostTensor(SYLVABase):
+
+    ##
+    # \var type_counts
+    # The number of FIMP types of each FIMPInstance.
+    ##
+    # \var actor_counts
+    # The number of HSDFG actors of each FIMPInstance.
+    ##
+    # \var valid
+    # The boolean matrix of the FIMP types which exist,
+    # False in the padding.
+    ##
+    # \var area
+    # The area matrix.
+    ##
+    # \var energy
+    # The energy matrix, of one HSDFG actor.
+    ##
+    # \var computation_phase
+    # The computation phase matrix.
+    ##
+    # \var input_end_time
+    # The input end time matrix.
+    ##
+    # \var output_start_time
+    # The output start time matrix.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self            The object
+    # @param      fimp_library    The FIMPLibrary
+    # @param      fimp_instances  The list of FIMPInstance objects
+    ##
+    def __init__(self, fimp_library, fimp_instances):
+
+        fimp_matrix = [fimp_library.get_fimp_costs(f.function_name)
+                       for f in fimp_instances]
+
+        self.type_counts = numpy.array([len(row) for row in fimp_matrix],
+                                       dtype=numpy.int64)
+        self.actor_counts = numpy.array([len(f.actors) for f in fimp_instances],
+                                        dtype=numpy.int64)
+
+        shape = (len(fimp_matrix), max(self.type_counts, default=0))
+        self.valid = numpy.arange(shape[1]) < self.type_counts[:, None]
+
+        def tensor(cost):
+            result = numpy.zeros(shape, dtype=numpy.int64)
+            for f, row in enumerate(fimp_matrix):
+                result[f, :len(row)] = [cost(c) for c in row]
+            return result
+
+        self.area = tensor(lambda c: c.area)
+        self.energy = tensor(lambda c: c.energy)
+        self.computation_phase = tensor(lambda c: c.computation_phase)
+        self.input_end_time = tensor(lambda c: c.input_end_time)
+        self.output_start_time = tensor(lambda c: c.output_start_time)
+
+    ##
+    # @brief      Get the cost row of one FIMPInstance without padding
+    ##
+    # @param      self    The object
+    # @param      matrix  The cost matrix
+    # @param      f       The FIMPInstance position
+    ##
+    # @return     list of int
+    ##
+    def row(self, matrix, f):
+        return [int(v) for v in matrix[f, :self.type_counts[f]]]
+
+    ##
+    # @brief      Get the lower bounds of the FIMP types
+    #
+    # Each element is the lower bound of the FIMP type selections
+    # where the FIMPInstance has the FIMP type,
+    # and the other FIMPInstance objects have their cheapest allowed
+    # FIMP types.
+    # The latency and sample interval bounds are the sequential
+    # computation of the HSDFG actors of the FIMPInstance.
+    ##
+    # @param      self     The object
+    # @param      allowed  The boolean matrix of the allowed FIMP types
+    ##
+    # @return     (area, energy, sequential computation) matrices
+    ##
+    def type_lower_bounds(self, allowed):
+
+        energy = self.energy * self.actor_counts[:, None]
+
+        def with_cheapest_others(cost):
+            maximum = numpy.iinfo(numpy.int64).max
+            cheapest = numpy.where(allowed, cost, maximum).min(
+                axis=1, initial=maximum)
+            # FIMPInstance objects without allowed FIMP types add nothing
+            cheapest[~allowed.any(axis=1)] = 0
+            return cost + (cheapest.sum() - cheapest)[:, None]
+
+        serial = self.computation_phase * self.actor_counts[:, None] - 1
+
+        return with_cheapest_others(self.area), \
+            with_cheapest_others(energy), serial
+
+    ##
+    # @brief      Get the FIMP types which can meet the constraints
+    #
+    # All the constraints are strict, as in the DSE engines.
+    ##
+    # @param      self                 The object
+    # @param      max_area             The maximum area
+    # @param      max_energy           The maximum energy
+    # @param      max_latency          The maximum latency
+    # @param      max_sample_interval  The maximum sample interval
+    ##
+    # @return     The boolean matrix of the allowed FIMP types
+    ##
+    def prune(self, max_area, max_energy, max_latency, max_sample_interval):
+
+        allowed = self.valid.copy()
+        while True:
+            area, energy, serial = self.type_lower_bounds(allowed)
+            fits = allowed & (area < max_area) & (energy < max_energy) & \
+                (serial < min(max_latency, max_sample_interval))
+            if (fits == allowed).all():
+                return allowed
+            allowed = fits
+
+    ##
+    # @brief      Evaluate the bounds of FIMP type selections
+    ##
+    # @param      self        The object
+    # @param      selections  The FIMP type index of each FIMPInstance,
+    # an array with one row per selection
+    ##
+    # @return     (area, energy, latency lower bound, latency of
+    # the sequential execution), arrays with one element per selection
+    ##
+    def evaluate(self, selections):
+
+        selections = numpy.asarray(selections, dtype=numpy.int64)
+        rows = numpy.arange(len(self.type_counts))
+
+        def selected(cost):
+            return cost[rows, selections]
+
+        computation = selected(self.computation_phase) * self.actor_counts
+
+        return selected(self.area).sum(axis=1), \
+            (selected(self.energy) * self.actor_counts).sum(axis=1), \
+            computation.max(axis=1, initial=0) - 1, \
+            computation.sum(axis=1) - 1
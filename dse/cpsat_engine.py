@@ -0,0 +1,761 @@
+##
+# \package sylva.dse.cpsat_engine
+#
+# Design Space Exploration (DSE) Engine based on the CP-SAT solver
+##
+# The CSOP is the same as the one of sylva.dse.dse_engine.DSEEngine.
+# Each HSDFG Actor has one optional interval variable per FIMP type
+# of its FIMPInstance, and only the interval of the selected FIMP type
+# is present.
+# Actors sharing one FIMPInstance cannot overlap in computation,
+# and actors without extra output buffer cannot overlap
+# in output buffer usage.
+##
+
+import os
+import queue
+import sys
+import threading
+
+from ortools.sat.python import cp_model
+
+from sylva.base.sylva_base import SYLVABase
+from sylva.dse.cost_tensor import FIMPCostTensor
+from sylva.dse.dse_engine import find_symmetries
+from sylva.dse.timing import TimingAnalysis
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Class for collecting the improving solutions found by CP-SAT
+#
+# Each solution is put into a queue once it is found,
+# while the solver keeps searching.
+##
+
+
+class CPSATSolutionCollector(cp_model.CpSolverSolutionCallback):
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self       The object
+    # @param      engine     The CPSATEngine object
+    # @param      solutions  The queue.Queue object of the results
+    ##
+    def __init__(self, engine, solutions):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.engine = engine
+        self.solutions = solutions
+
+    def OnSolutionCallback(self):
+        result = self.engine.get_result(self.Value)
+        result['search_time'] = self.WallTime()
+        result['branches'] = self.NumBranches()
+        result['failures'] = self.NumConflicts()
+        objective = self.Value(self.engine.objective)
+        result['objective'] = objective
+        result['objective_bound'] = self.engine.objective_lower_bound(
+            self.BestObjectiveBound())
+        self.solutions.put(result)
+
+        incumbent = self.engine.incumbent
+        if incumbent is not None:
+            with incumbent.get_lock():
+                if objective < incumbent.value:
+                    incumbent.value = objective
+            self.engine.check_bound(self.BestObjectiveBound())
+
+
+##
+# @brief      Class for CP-SAT based DSE engine
+#
+# It can replace sylva.dse.dse_engine.DSEEngine in sylva.dse.one_search.
+# The search runs once with all the CPU cores in a background thread,
+# and each call of `next_solution()` returns the next improving solution
+# as soon as the solver finds it.
+##
+
+
+class CPSATEngine(SYLVABase):
+
+    ##
+    # \var model
+    # The CP-SAT model in Ortools.
+    # Check <https://developers.google.com/optimization/> for more information.
+    # last checked 2026-10-19.
+    ##
+    # \var solver
+    # The CP-SAT solver
+    ##
+    # \var hsdfg
+    # The HSDFG object.
+    # It has all the HSDFG actors and edges to be used for CSOP generation.
+    ##
+    # \var fimp_library
+    # The FIMPLibrary.
+    # It has all the FIMPCost objects to be used for CSOP generation.
+    ##
+    # \var fimp_instances
+    # The list of FIMPInstance objects.
+    # It has all the FIMPInstance objects to be used for CSOP generation.
+    ##
+    # \var num_search_workers
+    # The number of parallel search workers
+    ##
+    # \var bounds
+    # The maximum area, energy, latency and sample interval
+    # given to the constructor, by name.
+    ##
+    # \var removable_bounds
+    # The constraints added by add_bound(), removed by resolve().
+    ##
+    # \var incumbent
+    # The best weighted objective value shared by concurrent searches,
+    # a multiprocessing.Value object.
+    # It is updated with each solution, and the search stops
+    # when its objective lower bound reaches the incumbent.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self                 The object
+    # @param      hsdfg                \copydoc CPSATEngine::hsdfg
+    # @param      fimp_library         \copydoc CPSATEngine::fimp_library
+    # @param      fimp_instances       \copydoc CPSATEngine::fimp_instances
+    # @param      time_limit           The time limit for solver
+    # in milliseconds
+    # @param      max_area             The maximum area
+    # @param      max_energy           The maximum energy
+    # @param      max_latency          The maximum latency
+    # @param      max_sample_interval  The maximum sample interval
+    # @param      KA                   Weight factor for area
+    # @param      KE                   Weight factor for energy
+    # @param      KT                   Weight factor for latency
+    # @param      KR                   Weight factor for sample interval
+    # @param      num_search_workers   \copydoc CPSATEngine::num_search_workers,
+    # all CPU cores if not provided
+    # @param      hint                 One solution used as solution hint
+    # and objective upper bound,
+    # e.g. from sylva.dse.list_engine.ListSchedulingEngine
+    # @param      upper_bound          Only solutions with a weighted
+    # objective lower than this value are searched, 0 for no bound
+    # @param      incumbent            \copydoc CPSATEngine::incumbent
+    # @param      symmetry_breaking    Order the interchangeable
+    # HSDFG actors and FIMPInstance objects,
+    # see sylva.dse.dse_engine.find_symmetries()
+    ##
+    def __init__(self, hsdfg, fimp_library, fimp_instances,
+                 time_limit=0,
+                 max_area=0, max_energy=0, max_latency=0,
+                 max_sample_interval=0,
+                 KA=0, KE=0, KT=1, KR=0,
+                 num_search_workers=0, hint=None,
+                 upper_bound=0, incumbent=None,
+                 symmetry_breaking=True):
+
+        self.model = cp_model.CpModel()
+        self.solver = cp_model.CpSolver()
+
+        # take inputs
+        self.hsdfg = hsdfg
+        self.fimp_library = fimp_library
+        self.fimp_instances = fimp_instances
+
+        self.actors = list(hsdfg.actors)
+        self.fimps = list(fimp_instances)
+
+        self.max_area = max_area if max_area > 0 else sys.maxsize
+        self.max_energy = max_energy if max_energy > 0 else sys.maxsize
+        self.max_latency = max_latency if max_latency > 0 else sys.maxsize
+        self.max_sample_interval = max_sample_interval \
+            if max_sample_interval > 0 else sys.maxsize
+        # the bounds given to the constructor, never relaxed by resolve()
+        self.bounds = {'area': self.max_area,
+                       'energy': self.max_energy,
+                       'latency': self.max_latency,
+                       'sample_interval': self.max_sample_interval}
+
+        self.time_limit = time_limit
+        self.incumbent = incumbent
+        self.num_search_workers = num_search_workers or os.cpu_count() or 1
+
+        self.prepare_actor_fimps()
+
+        # prepare variables
+        self.prepare_fimp_selection_variable()
+        self.prepare_area_and_energy_variables()
+        self.prepare_time_variables()
+        self.prepare_buffer_end_time_variable()
+        self.prepare_extra_buffer_variable()
+        self.prepare_latency_and_sample_interval_variables()
+
+        # create constraints
+        self.add_resource_dependency_constraints()
+        self.add_data_dependency_constraints()
+        if symmetry_breaking:
+            self.add_symmetry_breaking_constraints()
+
+        for variable, maximum in [(self.latency, self.max_latency),
+                                  (self.area, self.max_area),
+                                  (self.energy, self.max_energy),
+                                  (self.sample_interval,
+                                   self.max_sample_interval)]:
+            if maximum < sys.maxsize:
+                self.model.Add(variable < maximum)
+
+        self.prepare_optimization_objective(KA, KE, KT, KR)
+
+        self.removable_bounds = []
+        if hint is not None:
+            self.add_solution_hint(hint)
+
+        if upper_bound > 0:
+            self.add_bound(self.objective < upper_bound)
+
+        self.solver.parameters.num_search_workers = self.num_search_workers
+        self.set_time_limit(self.time_limit)
+
+        self.solutions = None
+        self.best = None
+        self.status = None
+        self.thread = None
+        self.error = None
+
+    ##
+    # @brief      Map each HSDFG Actor to its FIMPInstance
+    #
+    # `actor_fimps[i]` is the position in `fimps` of the FIMPInstance
+    # executing `actors[i]`.
+    ##
+    # @param      self  The object
+    ##
+    def prepare_actor_fimps(self):
+
+        positions = {id(a): i for i, a in enumerate(self.actors)}
+        self.actor_fimps = [None] * len(self.actors)
+        self.fimp_actors = []
+        for f, one_fimp in enumerate(self.fimps):
+            self.fimp_actors.append([positions[id(a)] for a in one_fimp.actors])
+            for a in self.fimp_actors[-1]:
+                self.actor_fimps[a] = f
+
+        for a, f in enumerate(self.actor_fimps):
+            if f is None:
+                one_actor = self.actors[a]
+                raise ValueError(f'no FIMPInstance for actor '
+                                 f'{one_actor.name}_{one_actor.index}.')
+
+        self.successors = [[] for _ in self.actors]
+        for e in self.hsdfg.edges:
+            if not e.delay:
+                self.successors[positions[id(e.src_actor)]].append(
+                    positions[id(e.dest_actor)])
+
+    ##
+    # @brief      Prepare FIMP selection variable
+    #
+    # The FIMP types which can never meet the constraints,
+    # see sylva.dse.cost_tensor.FIMPCostTensor.prune(),
+    # are not selected.
+    ##
+    # @param      self  The object
+    ##
+    def prepare_fimp_selection_variable(self):
+
+        # Each row has the FIMPCost objects of one FIMPInstance
+        self.fimp_matrix = [self.fimp_library.get_fimp_costs(f.function_name)
+                            for f in self.fimps]
+
+        self.fimp_selection_variable = []
+        for f, fimp_costs in enumerate(self.fimp_matrix):
+            if not fimp_costs:
+                raise ValueError(f'no FIMP for {self.fimps[f].function_name}.')
+            self.fimp_selection_variable.append(
+                [self.model.NewBoolVar(f'FIMP selection {f} {i}')
+                 for i in range(len(fimp_costs))])
+            self.model.AddExactlyOne(self.fimp_selection_variable[f])
+
+        self.cost_tensor = FIMPCostTensor(self.fimp_library, self.fimps)
+        self.fimp_type_allowed = self.cost_tensor.prune(
+            self.max_area, self.max_energy,
+            self.max_latency, self.max_sample_interval)
+        for f, row in enumerate(self.fimp_selection_variable):
+            for i, x in enumerate(row):
+                if not self.fimp_type_allowed[f, i]:
+                    self.model.Add(x == 0)
+
+        # the longest possible sequential execution
+        self.horizon = sum(
+            max(c.computation_phase for c in self.fimp_matrix[f])
+            for f in self.actor_fimps)
+        self.bound = self.horizon + max(
+            c.computation_phase + c.input_phase + c.output_phase
+            for row in self.fimp_matrix for c in row)
+
+    ##
+    # @brief      Get the linear expression of one FIMPCost field
+    ##
+    # @param      self  The object
+    # @param      f     The FIMPInstance position
+    # @param      cost  The function of one FIMPCost object
+    ##
+    # @return     linear expression
+    ##
+    def selected(self, f, cost):
+        return sum(int(cost(c)) * x for c, x in
+                   zip(self.fimp_matrix[f], self.fimp_selection_variable[f]))
+
+    def prepare_area_and_energy_variables(self):
+
+        max_area = sum(max(int(c.area) for c in row)
+                       for row in self.fimp_matrix)
+        self.area = self.model.NewIntVar(0, max_area, 'area')
+        self.model.Add(self.area == sum(
+            self.selected(f, lambda c: c.area)
+            for f in range(len(self.fimps))))
+
+        max_energy = sum(max(int(c.energy) for c in self.fimp_matrix[f])
+                         for f in self.actor_fimps)
+        self.energy = self.model.NewIntVar(0, max_energy, 'energy')
+        self.model.Add(self.energy == sum(
+            self.selected(f, lambda c: c.energy)
+            for f in self.actor_fimps))
+
+    ##
+    # @brief      Prepare time variables
+    #
+    # The start time domains are from sylva.dse.timing.TimingAnalysis,
+    # within the sequential execution horizon.
+    ##
+    # @param      self  The object
+    ##
+    def prepare_time_variables(self):
+
+        self.timing = TimingAnalysis(
+            self.hsdfg, self.fimp_library, self.fimps,
+            self.max_latency if self.max_latency < sys.maxsize else 0)
+
+        self.start = []
+        self.end = []
+        self.input_end = []
+        self.output_start = []
+        self.intervals = []
+
+        for a, f in enumerate(self.actor_fimps):
+            lower, upper = self.timing.get_start_domain(a)
+            upper = max(lower, min(upper, self.horizon))
+            start = self.model.NewIntVar(lower, upper, f'start time {a}')
+            end = self.model.NewIntVar(0, self.bound, f'end time {a}')
+            input_end = self.model.NewIntVar(
+                0, self.bound, f'input end time {a}')
+            output_start = self.model.NewIntVar(
+                0, self.bound, f'output start time {a}')
+
+            self.model.Add(end == start + self.selected(
+                f, lambda c: c.computation_phase - 1))
+            self.model.Add(input_end == start + self.selected(
+                f, lambda c: c.input_end_time))
+            self.model.Add(output_start == start + self.selected(
+                f, lambda c: c.output_start_time))
+
+            # one optional interval per FIMP type
+            self.intervals.append([
+                self.model.NewOptionalFixedSizeIntervalVar(
+                    start, c.computation_phase, x, f'computation {a} {i}')
+                for i, (c, x) in enumerate(zip(self.fimp_matrix[f],
+                                               self.fimp_selection_variable[f]))])
+
+            self.start.append(start)
+            self.end.append(end)
+            self.input_end.append(input_end)
+            self.output_start.append(output_start)
+
+    def prepare_buffer_end_time_variable(self):
+
+        # buffer end time = max(input end times, end time)
+        self.buffer_end = []
+        for a in range(len(self.actors)):
+            buffer_end = self.model.NewIntVar(0, self.bound, f'buffer end {a}')
+            self.model.AddMaxEquality(
+                buffer_end,
+                [self.end[a]] + [self.input_end[d] for d in self.successors[a]])
+            self.buffer_end.append(buffer_end)
+
+    def prepare_extra_buffer_variable(self):
+
+        self.extra_buffer = [self.model.NewBoolVar(f'eb_{a}')
+                             for a in range(len(self.actors))]
+
+        # the output buffer is used from output start to buffer end,
+        # unless an extra buffer is presented
+        self.buffer_intervals = []
+        for a in range(len(self.actors)):
+            buffer_stop = self.model.NewIntVar(
+                0, self.bound + 1, f'buffer stop {a}')
+            self.model.AddMaxEquality(
+                buffer_stop, [self.buffer_end[a] + 1, self.output_start[a]])
+            size = self.model.NewIntVar(0, self.bound + 1, f'buffer size {a}')
+            self.buffer_intervals.append(self.model.NewOptionalIntervalVar(
+                self.output_start[a], size, buffer_stop,
+                self.extra_buffer[a].Not(), f'buffer {a}'))
+
+    def add_resource_dependency_constraints(self):
+
+        for actors in self.fimp_actors:
+            # computation
+            self.model.AddNoOverlap(
+                [i for a in actors for i in self.intervals[a]])
+            # output buffer
+            self.model.AddNoOverlap([self.buffer_intervals[a] for a in actors])
+
+    def add_data_dependency_constraints(self):
+
+        # start time > end time
+        for a, successors in enumerate(self.successors):
+            for d in successors:
+                self.model.Add(self.start[d] > self.end[a])
+
+    ##
+    # @brief      Order the interchangeable actors and FIMPInstance objects
+    #
+    # Twin actors sharing one FIMPInstance start in their list order.
+    # Twin FIMPInstance objects are ordered lexicographically by
+    # their FIMP type and the start time of their first actor.
+    ##
+    # @param      self  The object
+    ##
+    def add_symmetry_breaking_constraints(self):
+
+        twin_actors, twin_fimps = find_symmetries(self.hsdfg, self.fimps)
+
+        for a, b in twin_actors:
+            self.model.Add(self.start[a] < self.start[b])
+
+        def order(f):
+            fimp_type = sum(i * v for i, v in
+                            enumerate(self.fimp_selection_variable[f]))
+            return fimp_type * (self.bound + 1) + \
+                self.start[self.fimp_actors[f][0]]
+
+        for f, g in twin_fimps:
+            self.model.Add(order(f) <= order(g))
+
+    def prepare_latency_and_sample_interval_variables(self):
+
+        self.latency = self.model.NewIntVar(0, self.bound, 'latency')
+        self.model.AddMaxEquality(self.latency, self.end)
+
+        intervals = []
+        for f, actors in enumerate(self.fimp_actors):
+            if not actors:
+                continue
+            first_start = self.model.NewIntVar(0, self.bound, f'first start {f}')
+            self.model.AddMinEquality(first_start,
+                                      [self.start[a] for a in actors])
+            last_end = self.model.NewIntVar(0, self.bound, f'last end {f}')
+            self.model.AddMaxEquality(last_end, [self.end[a] for a in actors])
+            first_output = self.model.NewIntVar(
+                0, self.bound, f'first output start {f}')
+            self.model.AddMinEquality(first_output,
+                                      [self.output_start[a] for a in actors])
+            last_buffer = self.model.NewIntVar(
+                0, self.bound, f'last buffer end {f}')
+            self.model.AddMaxEquality(last_buffer,
+                                      [self.buffer_end[a] for a in actors])
+            intervals.append(last_end - first_start)
+            intervals.append(last_buffer - first_output)
+
+        self.sample_interval = self.model.NewIntVar(
+            -self.bound, self.bound, 'sample interval')
+        self.model.AddMaxEquality(self.sample_interval, intervals)
+
+    ##
+    # @brief      Prepare optimization objective
+    #
+    # The number of extra buffers is minimized with the lowest priority.
+    ##
+    # @param      self  The object
+    # @param      KA    Weight factor for area
+    # @param      KE    Weight factor for energy
+    # @param      KT    Weight factor for latency
+    # @param      KR    Weight factor for sample interval
+    ##
+    def prepare_optimization_objective(self, KA, KE, KT, KR):
+        self.weights = (KA, KE, KT, KR)
+        self.objective = KA * self.area + KE * self.energy + \
+            KT * self.latency + KR * self.sample_interval
+        self.model.Minimize(
+            self.objective * (len(self.actors) + 1) + sum(self.extra_buffer))
+
+    ##
+    # @brief      Add one bound which can be removed by resolve()
+    #
+    # The bound is not added to the model itself but to the copy
+    # of the model solved by solve(), as a hard constraint.
+    # CP-SAT searches with one worker only if it is given assumptions,
+    # so they are not used for removable bounds.
+    ##
+    # @param      self        The object
+    # @param      constraint  The bounded linear expression
+    ##
+    def add_bound(self, constraint):
+        self.removable_bounds.append(constraint)
+
+    ##
+    # @brief      Get the model to be solved, with the removable bounds
+    ##
+    # @param      self  The object
+    ##
+    # @return     cp_model.CpModel object
+    ##
+    def bounded_model(self):
+        if not self.removable_bounds:
+            return self.model
+        model = self.model.Clone()
+        for constraint in self.removable_bounds:
+            model.Add(constraint)
+        return model
+
+    ##
+    # @brief      Use one solution as solution hint and upper bound
+    #
+    # The FIMP types, start times and extra buffers of the solution
+    # are given to CP-SAT as hints.
+    # If the solution meets the constraints,
+    # its objective value is also an upper bound of the search.
+    ##
+    # @param      self    The object
+    # @param      result  dictionary object with the fields used by
+    # sylva.dse.dse.one_search
+    ##
+    def add_solution_hint(self, result):
+
+        self.model.ClearHints()
+        for row, fimp_type in zip(self.fimp_selection_variable,
+                                  result['fimp_types']):
+            for i, x in enumerate(row):
+                self.model.AddHint(x, int(i == fimp_type))
+        for name in ['start', 'extra_buffer']:
+            for variable, value in zip(self[name], result[name]):
+                self.model.AddHint(variable, value)
+
+        objective = self.result_objective(result)
+        if objective is not None and \
+                result['latency'] < self.max_latency and \
+                result['area'] < self.max_area and \
+                result['energy'] < self.max_energy and \
+                result['sample_interval'] < self.max_sample_interval:
+            self.add_bound(self.objective <= objective)
+
+    ##
+    # @brief      Get the weighted objective value of one result
+    ##
+    # @param      self    The object
+    # @param      result  dictionary object with the fields used by
+    # sylva.dse.dse.one_search
+    ##
+    # @return     int, or None if the result does not have
+    # all the fields of the objective
+    ##
+    def result_objective(self, result):
+        KA, KE, KT, KR = self.weights
+        return KA * result['area'] + KE * result['energy'] + \
+            KT * result['latency'] + KR * result['sample_interval']
+
+    ##
+    # @brief      Prepare the model to be solved again
+    #
+    # The variables and constraints are kept.
+    # The objective weights are replaced and the bounds are
+    # changed, where a bound can only be tighter than the one
+    # given to the constructor.
+    # The bounds from the previous solve, e.g. the upper bound,
+    # are removed, and the last solution of the previous solve is
+    # the solution hint and upper bound of the next solve.
+    # The solutions are given by next_solution() again.
+    ##
+    # @param      self                 The object
+    # @param      KA                   Weight factor for area,
+    # None for the current one
+    # @param      KE                   Weight factor for energy
+    # @param      KT                   Weight factor for latency
+    # @param      KR                   Weight factor for sample interval
+    # @param      max_area             The maximum area,
+    # None for the current one, 0 for the one given to the constructor
+    # @param      max_energy           The maximum energy
+    # @param      max_latency          The maximum latency
+    # @param      max_sample_interval  The maximum sample interval
+    ##
+    # @return     The object
+    ##
+    def resolve(self, KA=None, KE=None, KT=None, KR=None,
+                max_area=None, max_energy=None, max_latency=None,
+                max_sample_interval=None):
+
+        self.stop_search()
+
+        weights = [w if w is not None else old
+                   for w, old in zip([KA, KE, KT, KR], self.weights)]
+        self.prepare_optimization_objective(*weights)
+
+        self.removable_bounds = []
+        for name, maximum in [('area', max_area), ('energy', max_energy),
+                              ('latency', max_latency),
+                              ('sample_interval', max_sample_interval)]:
+            if maximum is not None:
+                self['max_' + name] = min(maximum or sys.maxsize,
+                                          self.bounds[name])
+            if self['max_' + name] < self.bounds[name]:
+                self.add_bound(self[name] < self['max_' + name])
+
+        if self.best is not None:
+            self.add_solution_hint(self.best)
+
+        self.solutions = None
+        return self
+
+    ##
+    # @brief      Get the result fields of one solution
+    ##
+    # @param      self   The object
+    # @param      value  The function giving the value of one variable
+    ##
+    # @return     dictionary object with the fields used by
+    # sylva.dse.dse.one_search
+    ##
+    def get_result(self, value):
+        result = {
+            'fimps': len(self.fimps),
+            'area': value(self.area),
+            'latency': value(self.latency),
+            'energy': value(self.energy),
+            'sample_interval': value(self.sample_interval)}
+        for name in ['start', 'end', 'input_end', 'output_start',
+                     'buffer_end', 'extra_buffer']:
+            result[name] = [int(value(v)) for v in self[name]]
+        result['fimp_types'] = [
+            next(i for i, x in enumerate(row) if value(x))
+            for row in self.fimp_selection_variable]
+        return result
+
+    ##
+    # @brief      Get the lower bound of the weighted objective value
+    ##
+    # @param      self   The object
+    # @param      bound  The lower bound of the CP-SAT objective,
+    # which includes the extra buffer count
+    ##
+    # @return     int
+    ##
+    def objective_lower_bound(self, bound):
+        # CP-SAT objective = objective * (actor count + 1) + extra buffers
+        scale = len(self.actors) + 1
+        return -((len(self.actors) - int(bound)) // scale)
+
+    ##
+    # @brief      Stop the search if it cannot improve the incumbent
+    ##
+    # @param      self   The object
+    # @param      bound  The lower bound of the CP-SAT objective,
+    # which includes the extra buffer count
+    ##
+    def check_bound(self, bound):
+        if self.incumbent is None:
+            return
+        if self.objective_lower_bound(bound) >= self.incumbent.value:
+            self.solver.StopSearch()
+
+    ##
+    # @brief      Solve the model, in the background thread
+    ##
+    # @param      self  The object
+    ##
+    def solve(self):
+        try:
+            collector = CPSATSolutionCollector(self, self.solutions)
+            self.status = self.solver.Solve(self.bounded_model(), collector)
+        except BaseException as e:
+            self.error = e
+        finally:
+            # no more solution
+            self.solutions.put(None)
+
+    ##
+    # @brief      Get the next improving solution
+    #
+    # The first call starts the search in a background thread,
+    # and each call waits for the next solution found by the solver.
+    ##
+    # @param      self  The object
+    ##
+    # @return     dictionary object with the fields used by
+    # sylva.dse.dse.one_search, or None if there is no more solution
+    ##
+    def next_solution(self):
+        if self.solutions is None:
+            if self.incumbent is not None:
+                self.solver.best_bound_callback = self.check_bound
+            self.solutions = queue.Queue()
+            self.status = None
+            self.error = None
+            self.thread = threading.Thread(target=self.solve, daemon=True)
+            self.thread.start()
+
+        result = self.solutions.get()
+        if result is None:
+            self.solutions.put(None)
+            self.thread.join()
+            if self.error is not None:
+                error, self.error = self.error, None
+                raise error
+            return None
+        self.best = dict(result)
+        return result
+
+    ##
+    # @brief      Stop the running search, if any,
+    # and wait for the background thread
+    ##
+    # @param      self  The object
+    ##
+    def stop_search(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.solver.StopSearch()
+            self.thread.join()
+
+    ##
+    # @brief      Check if the last solution is proven optimal
+    ##
+    # @param      self  The object
+    ##
+    # @return     True or False
+    ##
+    def is_optimal(self):
+        return self.status == cp_model.OPTIMAL
+
+    ##
+    # @brief      Check if the last solve has found all the
+    # improving solutions, instead of being stopped by the time limit
+    ##
+    # @param      self  The object
+    ##
+    # @return     True or False
+    ##
+    def is_complete(self):
+        return self.status in [cp_model.OPTIMAL, cp_model.INFEASIBLE]
+
+    ##
+    # @brief      Set the time limit of the next solves
+    ##
+    # @param      self        The object
+    # @param      time_limit  The time limit in ms, 0 for no limit
+    ##
+    def set_time_limit(self, time_limit):
+        self.time_limit = time_limit
+        self.solver.parameters.max_time_in_seconds = \
+            time_limit / 1000 if time_limit else float('inf')
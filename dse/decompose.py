@@ -0,0 +1,337 @@
+##
+# \package sylva.dse.decompose
+#
+# Decomposed Design Space Exploration of pipelines of loosely coupled stages
+##
+# The SDFG is split into stages, either its strongly connected components
+# or its actor layers from `get_actor_layers()`,
+# in topological order.
+# One stage has the HSDFG actors of its SDFG actors,
+# so every FIMPInstance of one schedule is in one stage,
+# and the stages are searched independently by worker processes.
+# The partial schedules are stitched in the stage order:
+# each stage starts at the earliest offset where all its actors start
+# after their predecessors in the earlier stages end.
+# The optional polish pass searches the whole HSDFG with CP-SAT,
+# where the actors without data dependencies to the other stages
+# keep their start times relative to one offset variable per stage,
+# and only the boundary actors and the offsets are free.
+##
+
+import multiprocessing
+import os
+import time
+
+from sylva.analysis.validator import strongly_connected_components
+from sylva.base.sylva_base import SYLVABase
+from sylva.dse.cpsat_engine import CPSATEngine
+from sylva.dse.dse import Solution, solver_option, create_dse_engine, \
+    one_search, some_schedules, ranked_schedules, annotate_solution, \
+    solution_objective, _init_worker, _reporter
+from sylva.dse.dse_engine import DSEEngine, assign_fimps
+from sylva.dse.list_engine import ListSchedulingEngine
+from sylva.dse.telemetry import TelemetryRecord
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Split one SDFG into stages
+##
+# @param      sdfg       The SDFG
+# @param      by_layers  Use the actor layers instead of the
+# strongly connected components
+##
+# @return     list of SDFG Actor lists, in topological order
+##
+def find_stages(sdfg, by_layers=False):
+
+    if by_layers:
+        result = sdfg.get_actor_layers()
+        if sum(len(layer) for layer in result) != len(sdfg.actors):
+            raise ValueError('the SDFG has a cycle, '
+                             'its actor layers do not have all the actors.')
+        return result
+
+    positions = {id(a): i for i, a in enumerate(sdfg.actors)}
+    successors = [[] for _ in sdfg.actors]
+    for e in sdfg.edges:
+        successors[positions[id(e.src_actor)]].append(
+            positions[id(e.dest_actor)])
+
+    # Tarjan's algorithm finds the components in reverse topological order
+    components = strongly_connected_components(len(sdfg.actors), successors)
+    return [[sdfg.actors[a] for a in sorted(c)] for c in reversed(components)]
+
+
+##
+# @brief      Class for one stage of the HSDFG
+#
+# It can replace the HSDFG in the DSE engines identifying actors
+# by their positions, i.e. all but sylva.dse.dse_engine.DSEEngine.
+##
+
+
+class Stage(SYLVABase):
+
+    ##
+    # \var sdfg_actors
+    # The SDFG actors of the stage.
+    ##
+    # \var actors
+    # The HSDFG actors of the SDFG actors.
+    ##
+    # \var edges
+    # The HSDFG edges between the actors of the stage.
+    ##
+    # \var fimps
+    # The FIMPInstance objects of the SDFG actors.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self         The object
+    # @param      sdfg_actors  \copydoc Stage::sdfg_actors
+    # @param      fimps        The FIMPInstance objects of one schedule
+    ##
+    def __init__(self, sdfg_actors, fimps):
+        self.sdfg_actors = list(sdfg_actors)
+        self.actors = [a for s in self.sdfg_actors for a in s.child_actors]
+        members = {id(a) for a in self.actors}
+        self.edges = [e for a in self.actors for e in a.outgoing_edges
+                      if id(e.dest_actor) in members]
+        names = {s.name for s in self.sdfg_actors}
+        self.fimps = [f for f in fimps if f.function_name in names]
+
+
+##
+# @brief      Search one stage
+#
+# This function runs in the worker processes of search_decomposed().
+##
+# @param      design  The design specification
+# @param      option  The solver option
+# @param      stage   The Stage object
+##
+# @return     The result of the last solution, or None
+##
+def search_stage(design, option, stage):
+
+    dse = create_dse_engine(design, option, stage, stage.fimps)
+
+    result = None
+    while True:
+        solution = one_search(dse)
+        if solution is None:
+            return result
+        result = solution
+
+
+def _search_stage_task(args):
+    return args[0], args[1], search_stage(*args[2:])
+
+
+##
+# @brief      Stitch the partial schedules of the stages
+##
+# @param      design   The design specification
+# @param      hsdfg    The HSDFG of `design.system.sdfg`
+# @param      fimps    The FIMPInstance objects of the schedule
+# @param      stages   The Stage objects, in topological order
+# @param      results  The result of each stage
+##
+# @return     (dictionary object with the fields used by
+# sylva.dse.dse.one_search, the start time offset of each stage,
+# True if the result meets the constraints)
+##
+def stitch(design, hsdfg, fimps, stages, results):
+
+    evaluator = create_dse_engine(
+        design, solver_option(dse_engine=ListSchedulingEngine), hsdfg, fimps)
+    positions = {id(a): i for i, a in enumerate(hsdfg.actors)}
+    fimp_positions = {id(f): i for i, f in enumerate(fimps)}
+
+    start = [0] * len(hsdfg.actors)
+    end = [0] * len(hsdfg.actors)
+    fimp_types = [0] * len(fimps)
+    offsets = []
+    for stage, result in zip(stages, results):
+
+        for f, one_fimp in enumerate(stage.fimps):
+            fimp_types[fimp_positions[id(one_fimp)]] = result.fimp_types[f]
+
+        actors = [positions[id(a)] for a in stage.actors]
+        members = set(actors)
+        offset = 0
+        for a, local_start in zip(actors, result.start):
+            for p in evaluator.predecessors[a]:
+                if p not in members:
+                    offset = max(offset, end[p] + 1 - local_start)
+        offsets.append(offset)
+
+        for a, local_start in zip(actors, result.start):
+            cost = evaluator.fimp_matrix[evaluator.actor_fimps[a]][
+                fimp_types[evaluator.actor_fimps[a]]]
+            start[a] = offset + local_start
+            end[a] = start[a] + cost.computation_phase - 1
+
+    result = evaluator.get_result(fimp_types, start)
+    return result, offsets, evaluator.is_feasible(result)
+
+
+##
+# @brief      Polish one stitched schedule on the boundary actors
+##
+# @param      design    The design specification
+# @param      option    The solver option,
+# `option.time_limit` is the time limit of the polish pass
+# @param      hsdfg     The HSDFG of `design.system.sdfg`
+# @param      fimps     The FIMPInstance objects of the schedule
+# @param      stages    The Stage objects, in topological order
+# @param      results   The result of each stage
+# @param      stitched  The result of stitch(), the solution hint
+# @param      offsets   The start time offset of each stage
+##
+# @return     The result of the last improving solution, or None
+##
+def polish(design, option, hsdfg, fimps, stages, results, stitched, offsets):
+
+    engine = create_dse_engine(
+        design, solver_option(time_limit=option.time_limit,
+                              dse_engine=CPSATEngine),
+        hsdfg, fimps, hint=stitched)
+
+    positions = {id(a): i for i, a in enumerate(hsdfg.actors)}
+    fimp_positions = {id(f): i for i, f in enumerate(fimps)}
+    stage_of = [None] * len(hsdfg.actors)
+    for s, stage in enumerate(stages):
+        for one_actor in stage.actors:
+            stage_of[positions[id(one_actor)]] = s
+    boundary = set()
+    for e in hsdfg.edges:
+        src, dest = positions[id(e.src_actor)], positions[id(e.dest_actor)]
+        if not e.delay and stage_of[src] != stage_of[dest]:
+            boundary.update([src, dest])
+
+    for s, (stage, result) in enumerate(zip(stages, results)):
+        offset = engine.model.NewIntVar(0, engine.bound, f'offset {s}')
+        engine.model.AddHint(offset, offsets[s])
+        for one_actor, local_start in zip(stage.actors, result.start):
+            a = positions[id(one_actor)]
+            if a not in boundary:
+                engine.model.Add(engine.start[a] == offset + local_start)
+        for one_fimp, fimp_type in zip(stage.fimps, result.fimp_types):
+            if not any(positions[id(a)] in boundary for a in one_fimp.actors):
+                row = engine.fimp_selection_variable[
+                    fimp_positions[id(one_fimp)]]
+                engine.model.Add(row[fimp_type] == 1)
+
+    result = None
+    while True:
+        solution = engine.next_solution()
+        if solution is None:
+            return result
+        result = solution
+
+
+##
+# @brief      Search the schedules of one design by stages
+#
+# The stages of all the schedules are searched by `option.workers`
+# processes (all CPU cores if 0), with `option.dse_engine`
+# or CPSATEngine.
+# Each schedule gets the stitched solution if it meets the constraints,
+# and the polished solution if it is better.
+##
+# @param      design        The design specification
+# @param      option        The solver option
+# @param      by_layers     Split the SDFG by its actor layers
+# instead of its strongly connected components
+# @param      polish_pass   Run the polish pass
+# @param      log           The status_log object for details
+# @param      critical_log  The status_log object for progress
+##
+# @return     (list of Solution lists, one list per schedule, the HSDFG)
+##
+def search_decomposed(design, option, by_layers=False, polish_pass=True,
+                      log=None, critical_log=None):
+
+    if option.dse_engine is DSEEngine:
+        raise ValueError('DSEEngine cannot search HSDFG stages.')
+    stage_option = solver_option(**option)
+    stage_option.dse_engine = option.dse_engine or CPSATEngine
+
+    report = _reporter(log, critical_log)
+
+    start_time = time.time()
+    hsdfg = design.system.sdfg.get_hsdf()
+    stage_actors = find_stages(design.system.sdfg, by_layers)
+    schedules = some_schedules(ranked_schedules(design, hsdfg), option.effort)
+    fimp_lists = [assign_fimps(design.system.sdfg, s) for s in schedules]
+    stage_lists = [[Stage(a, fimps) for a in stage_actors]
+                   for fimps in fimp_lists]
+    report('%s stages and %s schedules are prepared in %f seconds.'
+           % (len(stage_actors), len(schedules), time.time() - start_time),
+           critical=True)
+
+    tasks = [(i, s, design, stage_option, stage)
+             for i, stages in enumerate(stage_lists)
+             for s, stage in enumerate(stages)]
+
+    workers = min(option.workers or os.cpu_count() or 1, len(tasks))
+    stage_results = [[None] * len(stage_actors) for _ in schedules]
+    if workers <= 1:
+        for i, s, result in map(_search_stage_task, tasks):
+            stage_results[i][s] = result
+    else:
+        with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(None, workers)) as pool:
+            for i, s, result in pool.imap_unordered(_search_stage_task,
+                                                    tasks):
+                stage_results[i][s] = result
+
+    results = []
+    for i, schedule in enumerate(schedules):
+
+        if any(r is None for r in stage_results[i]):
+            report('Schedule %s %s: a stage has no solution.'
+                   % (i, schedule), critical=True)
+            results.append([])
+            continue
+
+        search_start_time = time.time()
+        stitched, offsets, feasible = stitch(design, hsdfg, fimp_lists[i],
+                                             stage_lists[i], stage_results[i])
+        stitched['search_time'] = sum(r.search_time
+                                      for r in stage_results[i])
+        solutions = [stitched] if feasible else []
+
+        if polish_pass:
+            polished = polish(design, option, hsdfg, fimp_lists[i],
+                              stage_lists[i], stage_results[i],
+                              stitched, offsets)
+            if polished is not None:
+                polished['search_time'] = time.time() - search_start_time
+                solutions.append(polished)
+
+        results.append([])
+        for one_solution in solutions:
+            telemetry = TelemetryRecord.create(one_solution,
+                                               one_solution['search_time'])
+            one_solution = Solution.load_from_dict(one_solution)
+            one_solution.telemetry = telemetry
+            # only the improving solutions, as the other DSE engines
+            if results[-1] and solution_objective(design, one_solution) >= \
+                    solution_objective(design, results[-1][-1]):
+                continue
+            annotate_solution(one_solution, i, schedule, fimp_lists[i])
+            results[-1].append(one_solution)
+        report('Schedule %s %s: %s solutions, %s after stitching.'
+               % (i, schedule, len(results[-1]),
+                  'feasible' if feasible else 'infeasible'),
+               critical=True)
+
+    return results, hsdfg
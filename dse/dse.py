@@ -3,10 +3,24 @@
 # Design Space Exploration
 ##
 
+import asyncio
+import heapq
+import json
+import multiprocessing
+import os
+import queue
+import signal
 import sys
+import threading
 import time
 
 from sylva.base.sylva_base import SYLVABase
+from sylva.dse.cache import ResultCache, design_key
+from sylva.dse.cgra_engine import CGRAEngine
+from sylva.dse.cpsat_engine import CPSATEngine
+from sylva.dse.dse_engine import DSEEngine, iter_schedules, assign_fimps
+from sylva.dse.genetic_engine import GeneticEngine
+from sylva.dse.telemetry import TelemetryRecord, TraceWriter, write_trace
 
 __author__ = 'Shuo Li <contact@shuol.li>'
 __version__ = '2017-05-26'
@@ -16,12 +30,21 @@ __license__ = 'https://opensource.org/licenses/MIT'
 class solver_option(SYLVABase):
 
     def __init__(self, effort=0, solutions_per_schedule=0,
-                 time_limit=100000, dse_engine=None):
+                 time_limit=100000, dse_engine=None, workers=0,
+                 shared_incumbent=False, checkpoint='',
+                 checkpoint_interval=60, cache='', cache_size=64, trace=''):
 
         self.effort = effort
         self.solutions_per_schedule = solutions_per_schedule
         self.time_limit = time_limit
         self.dse_engine = dse_engine
+        self.workers = workers
+        self.shared_incumbent = shared_incumbent
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.cache = cache
+        self.cache_size = cache_size
+        self.trace = trace
 
 
 class system_constraint(SYLVABase):
@@ -40,12 +63,13 @@ class system_constraint(SYLVABase):
 
 class system_optimization_objective(SYLVABase):
 
-    def __init__(self, ka=0, ke=1, kt=0, kr=0):
+    def __init__(self, ka=0, ke=1, kt=0, kr=0, kc=0):
 
         self.ka = ka
         self.ke = ke
         self.kt = kt
         self.kr = kr
+        self.kc = kc
 
 
 class system_model(SYLVABase):
@@ -68,266 +92,965 @@ class design_specification(SYLVABase):
         self.fimp_lib = fimp_lib
 
 
-def Solution(SYLVABase):
+class Solution(SYLVABase):
 
     def __init__(self, search_time, branches,
                  fimps, area, latency, energy, sample_interval):
 
         self.search_time = search_time
         self.branches = branches
-        self.fimps = list(fimps)
+        self.fimps = fimps
         self.area = area
         self.latency = latency
         self.energy = energy
         self.sample_interval = sample_interval
 
+    ##
+    # @brief      Loads a Solution object from dictionary
+    #
+    # The fields other than the constructor arguments,
+    # e.g. start and fimp_types, are kept,
+    # and the telemetry is loaded as a TelemetryRecord object.
+    ##
+    # @param      cls       The cls
+    # @param      dict_obj  The dictionary object
+    ##
+    # @return     Loaded object
+    ##
+    @classmethod
+    def load_from_dict(cls, dict_obj):
+        fields = dict(dict_obj)
+        result = cls(**{k: fields.pop(k) for k in [
+            'search_time', 'branches', 'fimps', 'area', 'latency',
+            'energy', 'sample_interval']})
+        result.update(fields)
+        if result.telemetry is not None:
+            result.telemetry = TelemetryRecord.load_from_dict(result.telemetry)
+        return result
 
+
+##
+# @brief      Search for the next solution
+#
+# The DSE engine (DSEEngine or CPSATEngine) provides
+# `next_solution()`, which returns a dictionary object
+# with the solution fields or None.
+# The Solution object gets its sylva.dse.telemetry.TelemetryRecord
+# in the `telemetry` field.
+# Nothing is printed when there is no solution,
+# the number of solutions of each schedule is in the log of search_all().
+##
+# @param      dse   The DSE engine
+##
+# @return     Solution object or None
+##
 def one_search(dse):
 
     start_time = time.time()
 
-    if dse.solver.NextSolution():
-
-        end_time = time.time()
-        solution = Solution(search_time=((end_time - start_time) / 1000),
-                            branches=dse.solver.Branches(),
-                            fimps=len(dse.fimps),
-                            area=dse.area.Value(),
-                            latency=dse.latency.Value(),
-                            energy=dse.energy.Value(),
-                            sample_interval=dse.sample_interval.Value())
-
-        solution.start = [int(t.Value()) for t in dse.start]
-        solution.end = [int(t.Value()) for t in dse.end]
-        solution.input_end = [int(t.Value()) for t in dse.input_end]
-        solution.output_start = [int(t.Value()) for t in dse.output_start]
-        solution.buffer_end = [int(t.Value()) for t in dse.buffer_end]
-        solution.extra_buffer = [int(t.Value()) for t in dse.extra_buffer]
-
-        solution.fimp_types = [-1 for f in dse.fimps]
-        for f in dse.fimps:
-            fimp_type = 0
-            for var in dse.fimp_selection_variable[f.index]:
-                if int(var.Value()) == 1:
-                    solution.fimp_types[f.index] = fimp_type
-                fimp_type = fimp_type + 1
-
-        return Solution
+    result = dse.next_solution()
 
-    else:
+    end_time = time.time()
 
-        end_time = time.time()
-        print('No solution found after %s branches\n' % dse.solver.Branches())
-        print('  search time    : %f\n' % ((end_time - start_time) / 1000))
+    if result is not None:
+
+        telemetry = TelemetryRecord.create(result, end_time - start_time)
+        search_time = result.pop('search_time', end_time - start_time)
+        solution = Solution(search_time=search_time,
+                            branches=result.pop('branches'),
+                            fimps=result.pop('fimps'),
+                            area=result.pop('area'),
+                            latency=result.pop('latency'),
+                            energy=result.pop('energy'),
+                            sample_interval=result.pop('sample_interval'))
+
+        # start, end, input_end, output_start, buffer_end,
+        # extra_buffer and fimp_types
+        for k, v in result.items():
+            solution[k] = v
+        solution.telemetry = telemetry
+
+        return solution
 
     return None
 
 
-def search_all(design, option):
-
-    results = []
-
-    # prepare constraints
-    tmax = design.system.constraint.tmax
-    rmax = design.system.constraint.rmax
-    amax = design.system.constraint.amax
-    emax = design.system.constraint.emax
-
-    # prepare optimization objectives
-    KT = design.system.optimization_objective.kt
-    KR = design.system.optimization_objective.kr
-    KA = design.system.optimization_objective.ka
-    KE = design.system.optimization_objective.ke
-
-    # system
-    sdfg = design.system
-
-    # prepare FIMP library
-    fimp_lib = design.fimp_lib
-
-    # prepare solver options
-    time_limit = option.time_limit
-    solutions_per_schedule = option.solutions_per_schedule
-    effort = option.effort
-    dse_engine = option.dse_engine
-
-    # create HSDF graph and schedule it
-
-    hsdfg = sdfg.get_hsdfg()
-    all_sch = all_schedules((sdf_actors, sdf_edges))
-        search_schedules = int(float(effort) * len(all_sch) / 100)
-        schedules = some_schedules((sdf_actors, sdf_edges), search_schedules)
-        end_time = time.time()
-        log += 'Done. ' + time_cost(start_time, end_time) + '\n'
-        log += '%s schedules.\n' % len(schedules)
-        for s in schedules:
-            log += '%s \n' % s
-        log.update()
+##
+# The best weighted objective value found by all the schedules,
+# a multiprocessing.Value object shared by the worker processes
+# of search_all(), or None if `option.shared_incumbent` is False.
+##
+_incumbent = None
 
-    if 'search for each schedule':
-
-        search_index = 0
+##
+# The number of worker processes sharing the CPU cores
+# in the process pool of this process, 1 outside the process pools.
+##
+_pool_workers = 1
+
+##
+# The multiprocessing.Queue object of the solutions found by
+# the worker processes of iter_solutions().
+##
+_solution_queue = None
 
-        for schedule_index, one_schedule in enumerate(schedules):
-
-            result = []
 
-            log += 'Schedule %s: \n' % schedule_index
-            critical_log.status = log.status
-            log.update()
-
-            fimps = assign_fimps(actors, one_schedule)
-
-            log += 'Used FIMP instance space holders are generated. \n'
-
-            for f in fimps:
-                log += '\n  %s\n  Actors: %s\n' % (f, f.actors)
-            log.update()
-
-            log += 'Preparing CSOP'
-            log.update()
-            start_time = time.time()
-            dse = dse_engine(actors, edges, fimp_lib, fimps,
-                             time_limit=time_limit,
-                             max_area=amax, max_energy=emax,
-                             max_latency=tmax, max_sample_interval=rmax,
-                             KA=KA, KE=KE, KT=KT, KR=KR)
-
-            end_time = time.time()
-            log += 'Done. ' + time_cost(start_time, end_time)
-            log.update()
-
-            log += 'Search %s ... \n' % search_index
-            critical_log.status = log.status
-            log.update()
-            start_time = time.time()
-            keep_searching, r = one_search(dse, log)
-            end_time = time.time()
-            log += ('Search %s is done. ' % search_index) \
-                + time_cost(start_time, end_time) + '\n'
-            critical_log.status = log.status
-            log.update()
+##
+# @brief      Get the weighted objective value of one solution
+##
+# @param      design    The design specification
+# @param      solution  The Solution object
+##
+# @return     KA * area + KE * energy + KT * latency + KR * sample interval
+# + KC * communication cost, the communication cost is 0 if
+# the solution does not have it
+##
+def solution_objective(design, solution):
+    k = design.system.optimization_objective
+    return k.ka * solution.area + k.ke * solution.energy + \
+        k.kt * solution.latency + k.kr * solution.sample_interval + \
+        (k.kc or 0) * (solution.communication_cost or 0)
+
+
+##
+# @brief      Get a lower bound of the weighted objective of one schedule
+#
+# The bound holds for any FIMP type selection:
+# - area: each FIMPInstance has at least the minimum FIMP area
+# - energy: each HSDFG actor has at least the minimum FIMP energy
+# - latency: the critical path of the HSDFG without delay,
+#   and the actors sharing one FIMPInstance run one after another,
+#   with the minimum computation phase of each actor
+# - sample interval: the actors sharing one FIMPInstance
+##
+# @param      design         The design specification
+# @param      hsdfg          The HSDFG of `design.system.sdfg`
+# @param      schedule       The number of FIMPInstance objects
+# of each SDFG Actor
+# @param      critical_path  The result of critical_path_bound(),
+# computed if None
+##
+# @return     The lower bound
+##
+def schedule_lower_bound(design, hsdfg, schedule, critical_path=None):
+
+    sdfg = design.system.sdfg
+    k = design.system.optimization_objective
+
+    if critical_path is None:
+        critical_path = critical_path_bound(design, hsdfg)
+
+    area = 0
+    energy = 0
+    serial = 0
+    for one_actor, fimp_count in zip(sdfg.actors, schedule):
+        fimp_costs = design.fimp_lib.get_fimp_costs(one_actor.name)
+        actor_count = len(one_actor.child_actors)
+        area += fimp_count * min(c.area for c in fimp_costs)
+        energy += actor_count * min(c.energy for c in fimp_costs)
+        serial = max(serial, -(-actor_count // fimp_count) *
+                     min(c.computation_phase for c in fimp_costs) - 1)
+
+    latency = max(critical_path, serial)
+
+    return k.ka * area + k.ke * energy + k.kt * latency + k.kr * serial
+
+
+##
+# @brief      Get the latency lower bound of the HSDFG critical path
+#
+# It is the longest path without delay with the minimum computation
+# phase of each actor, which does not depend on the schedule.
+##
+# @param      design  The design specification
+# @param      hsdfg   The HSDFG of `design.system.sdfg`
+##
+# @return     The lower bound in clock cycles
+##
+def critical_path_bound(design, hsdfg):
+
+    computation = {
+        one_actor.name: min(c.computation_phase for c in
+                            design.fimp_lib.get_fimp_costs(one_actor.name))
+        for one_actor in design.system.sdfg.actors}
+
+    # longest path without delay, in the HSDFG actor order
+    positions = {id(a): i for i, a in enumerate(hsdfg.actors)}
+    successors = [[] for _ in hsdfg.actors]
+    in_degrees = [0] * len(hsdfg.actors)
+    for e in hsdfg.edges:
+        if not e.delay:
+            dest = positions[id(e.dest_actor)]
+            successors[positions[id(e.src_actor)]].append(dest)
+            in_degrees[dest] += 1
+    finish = [0] * len(hsdfg.actors)
+    ready = [a for a, d in enumerate(in_degrees) if d == 0]
+    for a in ready:
+        finish[a] += computation[hsdfg.actors[a].base_actor.name]
+        for s in successors[a]:
+            finish[s] = max(finish[s], finish[a])
+            in_degrees[s] -= 1
+            if in_degrees[s] == 0:
+                ready.append(s)
+
+    return max(finish, default=0) - 1
+
+
+##
+# @brief      Update the shared incumbent with one solution
+##
+# @param      objective  The weighted objective value of the solution
+# @param      incumbent  The multiprocessing.Value object,
+# the shared incumbent of the worker processes if None
+##
+def update_incumbent(objective, incumbent=None):
+    if incumbent is None:
+        incumbent = _incumbent
+    if incumbent is None:
+        return
+    with incumbent.get_lock():
+        if objective < incumbent.value:
+            incumbent.value = objective
+
+
+##
+# @brief      Create the DSE engine of one schedule
+##
+# @param      design  The design specification
+# @param      option  The solver option
+# @param      hsdfg   The HSDFG of `design.system.sdfg`
+# @param      fimps   The FIMPInstance objects of the schedule
+# @param      kwargs  The DSE engine arguments replacing the ones
+# from `design.system` and `option`, e.g. max_area or KA
+##
+# @return     The DSE engine, `option.dse_engine` or DSEEngine
+#
+# In a process pool, the CP-SAT engines share the CPU cores
+# with the other worker processes instead of using all of them.
+##
+def create_dse_engine(design, option, hsdfg, fimps, **kwargs):
+
+    constraint = design.system.constraint
+    optimization_objective = design.system.optimization_objective
+    dse_engine = option.dse_engine or DSEEngine
+
+    arguments = {'time_limit': option.time_limit,
+                 'max_area': constraint.amax,
+                 'max_energy': constraint.emax,
+                 'max_latency': constraint.tmax,
+                 'max_sample_interval': constraint.rmax,
+                 'KA': optimization_objective.ka,
+                 'KE': optimization_objective.ke,
+                 'KT': optimization_objective.kt,
+                 'KR': optimization_objective.kr}
+    if issubclass(dse_engine, CGRAEngine):
+        arguments['cgra'] = design.cgra
+        arguments['KC'] = optimization_objective.kc or 0
+    if issubclass(dse_engine, CPSATEngine) and _pool_workers > 1:
+        arguments['num_search_workers'] = \
+            max(1, (os.cpu_count() or 1) // _pool_workers)
+    arguments.update(kwargs)
+
+    return dse_engine(hsdfg, design.fimp_lib, fimps, **arguments)
+
+
+##
+# @brief      Add the schedule fields to one solution
+##
+# @param      solution        The Solution object
+# @param      schedule_index  The schedule index
+# @param      schedule        The number of FIMPInstance objects
+# of each SDFG Actor
+# @param      fimps           The FIMPInstance objects of the schedule
+##
+def annotate_solution(solution, schedule_index, schedule, fimps):
+    solution.schedule_index = schedule_index
+    solution.schedule = list(schedule)
+    solution.fimp_instances = [
+        {'function_name': f.function_name,
+         'index': f.index,
+         'fimp_type_index': solution.fimp_types[i],
+         'actors': [a.index for a in f.actors]}
+        for i, f in enumerate(fimps)]
+    # the FIMPInstance positions of sylva.dse.cgra_engine.CGRAEngine
+    if solution.x is not None:
+        for f, x, y in zip(solution.fimp_instances, solution.x, solution.y):
+            f['x'], f['y'] = x, y
+    if solution.telemetry is not None:
+        solution.telemetry['schedule_index'] = schedule_index
+
+
+##
+# @brief      Search one schedule and give each solution once it is found
+#
+# The FIMPInstance objects of the schedule are created,
+# then the DSE engine searches for solutions until there is no
+# better solution or `option.solutions_per_schedule` solutions are found.
+#
+# With an incumbent, the schedule is skipped if its lower bound
+# cannot improve the incumbent, and only solutions better than
+# the incumbent are searched.
+##
+# @param      design          The design specification
+# @param      option          The solver option
+# @param      hsdfg           The HSDFG of `design.system.sdfg`
+# @param      schedule_index  The schedule index
+# @param      schedule        The number of FIMPInstance objects
+# of each SDFG Actor
+# @param      incumbent       The multiprocessing.Value object
+# of the best weighted objective value, or None
+##
+# @return     generator of Solution objects
+##
+def iter_schedule_solutions(design, option, hsdfg, schedule_index, schedule,
+                            incumbent=None):
+
+    upper_bound = 0
+    if incumbent is not None:
+        upper_bound = incumbent.value
+        if schedule_lower_bound(design, hsdfg, schedule) >= upper_bound:
+            return
+
+    fimps = assign_fimps(design.system.sdfg, schedule)
+
+    # DSEEngine and CPSATEngine also tighten their running searches
+    # with the shared incumbent
+    arguments = {}
+    if incumbent is not None and \
+            issubclass(option.dse_engine or DSEEngine,
+                       (DSEEngine, CPSATEngine)):
+        arguments['incumbent'] = incumbent
+
+    dse = create_dse_engine(design, option, hsdfg, fimps,
+                            upper_bound=upper_bound
+                            if upper_bound < sys.maxsize else 0,
+                            **arguments)
+
+    count = 0
+    try:
+        while not option.solutions_per_schedule or \
+                count < option.solutions_per_schedule:
+
+            solution = one_search(dse)
+            if solution is None:
+                break
+
+            annotate_solution(solution, schedule_index, schedule, fimps)
+            count += 1
+            update_incumbent(solution_objective(design, solution), incumbent)
+            yield solution
+    finally:
+        # CPSATEngine keeps searching in its background thread
+        # and GeneticEngine keeps its worker processes otherwise
+        if isinstance(dse, CPSATEngine):
+            dse.stop_search()
+        elif isinstance(dse, GeneticEngine):
+            dse.close()
+
+
+##
+# @brief      Search one schedule
+#
+# This function runs in the worker processes of search_all(),
+# with the shared incumbent if `option.shared_incumbent` is True.
+##
+# @param      design          The design specification
+# @param      option          The solver option
+# @param      hsdfg           The HSDFG of `design.system.sdfg`
+# @param      schedule_index  The schedule index
+# @param      schedule        The number of FIMPInstance objects
+# of each SDFG Actor
+##
+# @return     list of Solution objects
+##
+def search_schedule(design, option, hsdfg, schedule_index, schedule):
+    return list(iter_schedule_solutions(design, option, hsdfg,
+                                        schedule_index, schedule, _incumbent))
+
+
+def _search_schedule_task(args):
+    return args[3], search_schedule(*args)
+
+
+##
+# @brief      Search one schedule and put each solution into
+# the solution queue of the worker process once it is found
+#
+# This function runs in the worker processes of iter_solutions().
+# (schedule index, None) is put at the end of the schedule.
+##
+# @param      args  The arguments of search_schedule()
+##
+def _stream_schedule_task(args):
+    try:
+        for solution in iter_schedule_solutions(*args, _incumbent):
+            _solution_queue.put((args[3], solution))
+    finally:
+        _solution_queue.put((args[3], None))
+
+
+def _init_worker(incumbent, workers=1, solution_queue=None):
+    global _incumbent, _pool_workers, _solution_queue
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _incumbent = incumbent
+    _pool_workers = workers
+    _solution_queue = solution_queue
+
+
+##
+# @brief      Rank the schedules of one design
+#
+# The schedules of iter_schedules() are given in the order of
+# schedule_lower_bound(), which estimates the area, energy, latency
+# and throughput of each schedule without search.
+# Schedules with the same estimate keep their enumeration order.
+#
+# The ranking is eager: all the schedules and their bounds are kept
+# before the first one is given. There are at most the sum of the
+# numbers of divisors of the repetition counts, and the HSDFG critical
+# path is computed once, so each bound takes O(SDFG actors).
+##
+# @param      design  The design specification
+# @param      hsdfg   The HSDFG of `design.system.sdfg`
+##
+# @return     generator of schedules, the most promising first
+##
+def ranked_schedules(design, hsdfg):
+    critical_path = critical_path_bound(design, hsdfg)
+    heap = [(schedule_lower_bound(design, hsdfg, s, critical_path), i, s)
+            for i, s in enumerate(iter_schedules(design.system.sdfg))]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[2]
+
 
-            if not solutions_per_schedule:
-                while keep_searching == True:
-                    result.append(r)
-                    search_index += 1
-                    log += 'Search %s ... \n' % search_index
-                    critical_log.status = log.status
-                    log.update()
+##
+# @brief      Pick the first schedules
+#
+# With ranked_schedules(), these are the most promising ones.
+##
+# @param      schedules  The schedules
+# @param      effort     The percentage of schedules to search,
+# 0 for all the schedules
+##
+# @return     list of schedules
+##
+def some_schedules(schedules, effort=0):
+    schedules = list(schedules)
+    if not effort or effort >= 100:
+        return schedules
+    count = max(1, int(float(effort) * len(schedules) / 100))
+    return schedules[:count]
+
+
+##
+# @brief      Save the finished schedules of one search to a checkpoint file
+#
+# The file is a JSON object with the design_key() of the search,
+# the schedules, the Solution lists of the finished schedules
+# by schedule index, and the incumbent,
+# the best weighted objective value of the finished schedules.
+# It is written to a temporary file first and then renamed,
+# so an interrupted write keeps the last checkpoint.
+##
+# @param      file_name  The checkpoint file name
+# @param      design     The design specification
+# @param      option     The solver option
+# @param      schedules  The schedules
+# @param      finished   dict of Solution lists by schedule index
+##
+def save_checkpoint(file_name, design, option, schedules, finished):
+
+    objectives = [solution_objective(design, one_solution)
+                  for result in finished.values()
+                  for one_solution in result]
+
+    checkpoint = {
+        'key': design_key(design, option),
+        'schedules': [list(s) for s in schedules],
+        'finished': {str(i): [dict(one_solution) for one_solution in result]
+                     for i, result in finished.items()},
+        'incumbent': min(objectives, default=None)}
+
+    temporary_file_name = file_name + '.tmp'
+    with open(temporary_file_name, 'w') as fp:
+        json.dump(checkpoint, fp)
+    os.replace(temporary_file_name, file_name)
+
+
+##
+# @brief      Load a checkpoint file
+##
+# @param      file_name  The checkpoint file name
+# @param      key        The design_key() the checkpoint must have,
+# None to load any checkpoint
+##
+# @return     (the schedules, dict of Solution lists by schedule index,
+# the incumbent or None)
+##
+def load_checkpoint(file_name, key=None):
+
+    with open(file_name, 'r') as fp:
+        checkpoint = json.load(fp)
+
+    if key is not None and checkpoint.get('key') != key:
+        raise ValueError('Checkpoint %s is not of this design '
+                         'and solver option.' % file_name)
+
+    finished = {int(i): [Solution.load_from_dict(s) for s in result]
+                for i, result in checkpoint['finished'].items()}
+
+    return checkpoint['schedules'], finished, checkpoint['incumbent']
+
+
+def _reporter(log, critical_log):
+
+    def report(msg, critical=False):
+        for one_log in [log, critical_log] if critical else [log]:
+            if one_log is not None:
+                one_log += msg
+                one_log.update()
+
+    return report
+
+
+##
+# @brief      Search the schedules which are not finished
+#
+# With `option.checkpoint`, the finished schedules are saved to it
+# every `option.checkpoint_interval` seconds, when the search stops
+# with an exception, e.g. KeyboardInterrupt, and at the end of the search.
+# With `option.trace`, the telemetry of the solutions is written
+# to it when their schedule is finished, so the trace of a killed
+# search has all the finished schedules, see sylva.dse.telemetry.
+##
+# @param      design     The design specification
+# @param      option     The solver option
+# @param      hsdfg      The HSDFG of `design.system.sdfg`
+# @param      schedules  The schedules
+# @param      finished   dict of Solution lists by schedule index,
+# of the schedules already searched
+# @param      incumbent  The best weighted objective value
+# of `finished`, or None
+# @param      report     The report function
+##
+# @return     list of Solution lists, one list per schedule
+##
+def _search_schedules(design, option, hsdfg, schedules, finished,
+                      incumbent, report):
+
+    tasks = [(design, option, hsdfg, i, s) for i, s in enumerate(schedules)
+             if i not in finished]
+
+    if option.shared_incumbent:
+        incumbent = multiprocessing.Value(
+            'q', sys.maxsize if incumbent is None else incumbent)
+    else:
+        incumbent = None
+
+    def checkpoint():
+        if option.checkpoint:
+            save_checkpoint(option.checkpoint, design, option, schedules,
+                            finished)
+
+    workers = min(option.workers or os.cpu_count() or 1, len(tasks))
+
+    global _incumbent
+    if workers <= 1:
+        _incumbent = incumbent
+        results = map(_search_schedule_task, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker,
+                                    initargs=(incumbent, workers))
+        results = pool.imap_unordered(_search_schedule_task, tasks)
+
+    trace = None
+    if option.trace:
+        trace = TraceWriter(option.trace)
+        for i in sorted(finished):
+            for one_solution in finished[i]:
+                trace.write(one_solution)
+
+    last_checkpoint_time = time.time()
+    try:
+        for schedule_index, result in results:
+            finished[schedule_index] = result
+            if trace is not None:
+                for one_solution in result:
+                    trace.write(one_solution)
+            report('Schedule %s %s: %s solutions.'
+                   % (schedule_index, schedules[schedule_index], len(result)),
+                   critical=True)
+            if time.time() - last_checkpoint_time >= \
+                    option.checkpoint_interval:
+                checkpoint()
+                last_checkpoint_time = time.time()
+    except BaseException as e:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        checkpoint()
+        if isinstance(e, KeyboardInterrupt):
+            report('Search is cancelled.', critical=True)
+        else:
+            report('Search is stopped by %s: %s.' % (type(e).__name__, e),
+                   critical=True)
+        raise
+    finally:
+        _incumbent = None
+        if trace is not None:
+            trace.close()
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    checkpoint()
+
+    if option.trace:
+        report('Telemetry is written to %s.' % option.trace, critical=True)
+
+    return [finished.get(i, []) for i in range(len(schedules))]
+
+
+##
+# @brief      Search all the schedules of one design
+#
+# Each schedule is searched in one worker process,
+# with `option.workers` processes (all CPU cores if 0).
+# The schedules are searched in the order of ranked_schedules(),
+# and the results are in the same order,
+# whatever the order the workers finish.
+#
+# With `option.shared_incumbent`, the best objective value
+# is shared by all the workers as a global branch-and-bound:
+# the schedules which cannot improve it get no solutions.
+# With `option.checkpoint`, the finished schedules are saved,
+# and resume() continues the search from the checkpoint.
+# With `option.cache`, the results are stored in
+# the sylva.dse.cache.ResultCache in that directory,
+# and the same design and option get the stored results without search.
+# On KeyboardInterrupt or any other exception, the workers are
+# terminated, the checkpoint is saved and the exception is raised again.
+##
+# @param      design        The design specification
+# @param      option        The solver option
+# @param      log           The status_log object for details
+# @param      critical_log  The status_log object for progress
+##
+# @return     (list of Solution lists, one list per schedule, the HSDFG)
+##
+def search_all(design, option, log=None, critical_log=None):
+
+    report = _reporter(log, critical_log)
+
+    start_time = time.time()
+    hsdfg = design.system.sdfg.get_hsdf()
+
+    cache = None
+    if option.cache:
+        cache = ResultCache(option.cache, option.cache_size)
+        key = design_key(design, option)
+        results = cache.get_results(key)
+        if results is not None:
+            report('Results are loaded from cache %s in %f seconds.'
+                   % (option.cache, time.time() - start_time), critical=True)
+            results = [[Solution.load_from_dict(s) for s in result]
+                       for result in results]
+            if option.trace:
+                write_trace(results, option.trace)
+                report('Telemetry is written to %s.' % option.trace,
+                       critical=True)
+            return results, hsdfg
+
+    schedules = some_schedules(ranked_schedules(design, hsdfg), option.effort)
+    report('%s HSDFG actors and %s schedules are prepared in %f seconds.'
+           % (len(hsdfg.actors), len(schedules), time.time() - start_time),
+           critical=True)
+    for s in schedules:
+        report('%s' % s)
+
+    results = _search_schedules(design, option, hsdfg, schedules, {}, None,
+                                report)
+
+    if cache is not None:
+        cache.put_results(key, results)
+
+    return results, hsdfg
+
+
+##
+# @brief      Resume the search of one design from its checkpoint
+#
+# The finished schedules in `option.checkpoint` are not searched again.
+# If the checkpoint file does not exist, all the schedules are searched.
+# A checkpoint of another design or solver option raises ValueError,
+# see load_checkpoint().
+##
+# @param      design        The design specification
+# @param      option        The solver option
+# @param      log           The status_log object for details
+# @param      critical_log  The status_log object for progress
+##
+# @return     (list of Solution lists, one list per schedule, the HSDFG)
+##
+def resume(design, option, log=None, critical_log=None):
+
+    report = _reporter(log, critical_log)
+
+    if not option.checkpoint or not os.path.isfile(option.checkpoint):
+        report('No checkpoint %s, searching all the schedules.'
+               % option.checkpoint, critical=True)
+        return search_all(design, option, log, critical_log)
+
+    schedules, finished, incumbent = load_checkpoint(
+        option.checkpoint, design_key(design, option))
+    hsdfg = design.system.sdfg.get_hsdf()
+    report('Resuming from %s: %s of %s schedules are finished.'
+           % (option.checkpoint, len(finished), len(schedules)),
+           critical=True)
+
+    results = _search_schedules(design, option, hsdfg, schedules, finished,
+                                incumbent, report)
+
+    return results, hsdfg
+
+
+##
+# @brief      Search all the schedules of one design
+# and give each solution once it is found
+#
+# Unlike search_all(), the solutions can be used before the search ends.
+# With one worker (`option.workers`), the schedules are searched
+# one after another in this process, in the order of ranked_schedules(),
+# and the solutions are given in that order.
+# With more workers, the schedules are searched by a process pool
+# as in search_all(), and the solutions are given in the order
+# they are found.
+# With `option.shared_incumbent`, the best objective value
+# prunes the other schedules.
+# The search stops when the generator is closed.
+##
+# @param      design        The design specification
+# @param      option        The solver option
+# @param      log           The status_log object for details
+# @param      critical_log  The status_log object for progress
+##
+# @return     generator of Solution objects,
+# with `schedule_index` of the ranked schedules
+##
+def iter_solutions(design, option, log=None, critical_log=None):
+
+    report = _reporter(log, critical_log)
+
+    hsdfg = design.system.sdfg.get_hsdf()
+    incumbent = None
+    if option.shared_incumbent:
+        incumbent = multiprocessing.Value('q', sys.maxsize)
+
+    schedules = some_schedules(ranked_schedules(design, hsdfg), option.effort)
+    workers = min(option.workers or os.cpu_count() or 1, len(schedules))
+
+    if workers <= 1:
+        for schedule_index, schedule in enumerate(schedules):
+            count = 0
+            for solution in iter_schedule_solutions(design, option, hsdfg,
+                                                    schedule_index, schedule,
+                                                    incumbent):
+                count += 1
+                yield solution
+            report('Schedule %s %s: %s solutions.'
+                   % (schedule_index, schedule, count), critical=True)
+        return
+
+    tasks = [(design, option, hsdfg, i, s) for i, s in enumerate(schedules)]
+    solution_queue = multiprocessing.Queue()
+    pool = multiprocessing.Pool(workers, initializer=_init_worker,
+                                initargs=(incumbent, workers, solution_queue))
+    try:
+        task_result = pool.map_async(_stream_schedule_task, tasks)
+        counts = [0] * len(schedules)
+        remaining = len(tasks)
+        while remaining:
+            try:
+                schedule_index, solution = solution_queue.get(timeout=1)
+            except queue.Empty:
+                # raises the exception of a failed worker
+                if task_result.ready() and not task_result.successful():
+                    task_result.get()
+                continue
+            if solution is None:
+                remaining -= 1
+                report('Schedule %s %s: %s solutions.'
+                       % (schedule_index, schedules[schedule_index],
+                          counts[schedule_index]), critical=True)
+                continue
+            counts[schedule_index] += 1
+            yield solution
+        task_result.get()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+##
+# @brief      Search all the schedules of one design
+# as an asynchronous iterator
+#
+# Each step of iter_solutions() runs in the default executor
+# of the running event loop, so the loop is not blocked by the search.
+# If the consumer stops while one step is running, e.g. it is cancelled,
+# iter_solutions() is closed in the executor once that step returns.
+##
+# @param      design        The design specification
+# @param      option        The solver option
+# @param      log           The status_log object for details
+# @param      critical_log  The status_log object for progress
+##
+# @return     asynchronous generator of Solution objects
+##
+async def aiter_solutions(design, option, log=None, critical_log=None):
+
+    loop = asyncio.get_running_loop()
+    solutions = iter_solutions(design, option, log, critical_log)
+    # a generator cannot be closed while it is executing
+    lock = threading.Lock()
+
+    def step():
+        with lock:
+            return next(solutions, None)
+
+    def close():
+        with lock:
+            solutions.close()
+
+    try:
+        while True:
+            solution = await loop.run_in_executor(None, step)
+            if solution is None:
+                return
+            yield solution
+    finally:
+        loop.run_in_executor(None, close)
+
+
+##
+# @brief      Class for writing solutions to a file once they are found
+#
+# In CSV, each row has the solution index and the report items,
+# where the spaces in the report item names are underscores
+# in the Solution fields, e.g. `sample interval`.
+# In JSONL, each line is one Solution object with all its fields.
+# The file is flushed after each solution,
+# so it can be read while the search goes on.
+##
+# Example:
+#
+#     with ResultWriter('result.csv') as writer:
+#         for one_solution in iter_solutions(design, option):
+#             writer.write(one_solution)
+##
 
-                    start_time = time.time()
-                    keep_searching, r = one_search(dse, log)
-                    end_time = time.time()
 
-                    if not keep_searching:
-                        log += 'Search failed, time limit %s seconds. \n' % (time_limit / 1000)
-                        critical_log.status = log.status
-                    else:
-                        log += 'Done. ' + time_cost(start_time, end_time) + '\n'
-                        critical_log.status = log.status
-
-                    log.update()
-            else:
-                while solutions_per_schedule > 0 and keep_searching == True:
-
-                    result.append(r)
-                    search_index += 1
-                    log += 'Search %s ... \n' % search_index
-                    critical_log.status = log.status
-                    log.update()
-
-                    start_time = time.time()
-                    keep_searching, r = one_search(dse)
-                    end_time = time.time()
-
-                    if not keep_searching:
-                        log += 'Search failed, time limit %s seconds. \n' % (time_limit / 1000)
-                        critical_log.status = log.status
-                    else:
-                        log += 'Done. ' + time_cost(start_time, end_time) + '\n'
-                        critical_log.status = log.status
-
-                    log.update()
-                    solutions_per_schedule -= 1
-
-            dse.solver.EndSearch()
-
-            if len(result) > 0:
-
-                for r in result:
-
-                    if r != {}:
-
-                        fimp_instances = []
+class ResultWriter(SYLVABase):
+
+    ##
+    # \var file_format
+    # 'csv' or 'jsonl'.
+    ##
+    # \var report_items
+    # The CSV columns after the index.
+    ##
+    # \var index
+    # The index of the next solution.
+    ##
+    # \var fp
+    # The file object.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self          The object
+    # @param      file_name     The file name
+    # @param      file_format   \copydoc ResultWriter::file_format,
+    # from the file name extension if empty
+    # @param      report_items  \copydoc ResultWriter::report_items
+    ##
+    def __init__(self, file_name, file_format='',
+                 report_items=['search time', 'fimps', 'area', 'energy',
+                               'latency', 'sample interval']):
+
+        if not file_format:
+            file_format = 'jsonl' \
+                if os.path.splitext(file_name)[1] == '.jsonl' else 'csv'
+        if file_format not in ('csv', 'jsonl'):
+            raise ValueError(f'unknown result format {file_format}.')
+
+        self.file_format = file_format
+        self.report_items = list(report_items)
+        self.index = 0
+        self.fp = open(file_name, 'w', newline='')
+
+        if file_format == 'csv':
+            self.fp.write(_csv_header(self.report_items))
+            self.fp.flush()
+
+    ##
+    # @brief      Write one solution
+    ##
+    # @param      self      The object
+    # @param      solution  The Solution object
+    ##
+    def write(self, solution):
+        if self.file_format == 'csv':
+            self.fp.write(_csv_row(self.index, solution, self.report_items))
+        else:
+            self.fp.write(json.dumps(dict(solution)) + '\n')
+        self.index += 1
+        self.fp.flush()
+
+    ##
+    # @brief      Close the file
+    ##
+    # @param      self  The object
+    ##
+    def close(self):
+        self.fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _csv_header(report_items):
+    return ','.join(['index'] + list(report_items)) + '\n'
+
+
+def _csv_row(index, solution, report_items):
+    return ','.join([str(index)] + [str(solution[k.replace(' ', '_')])
+                                    for k in report_items]) + '\n'
 
-                        for f in dse.fimps:
-                            used_fimp = fimp_lib[f.name][r['fimp_types'][f.index]].clone()
-                            used_fimp.index = f.index
-                            used_fimp.actors = []
-                            fimp_instances.append(used_fimp)
-
-                            for a in f.actors:
-                                a.assign_to(used_fimp)
-                                a.fimp_index = used_fimp.index
-
-                        for a in dse.actors:
-                            i = a.index
-                            a.add_schedule(
-                                start=r['start'][i],
-                                buffer_end=r['buffer_end'][i])
-                            a.fimp.extra_buffer = r['extra_buffer'][i]
-
-                        schedule_keys = ['start', 'input_end', 'output_start',
-                                         'end', 'buffer_end', 'fimp_index']
-
-                        r['actors'] = [a.serialize(schedule_keys, include_base_actor=True) for a in actors]
-                        r['edges'] = [e.serialize() for e in edges]
-                        r['fimp_instances'] = [f.serialize() for f in fimp_instances]
-
-                        for a in actors:
-                            log += 'Actor: %s\nFIMP: %s\n' % (a, a.fimp)
-                            log.update()
-                            log += 'Schedule:\n' + a.schedule.__str__()
-                            log.update()
-
-                    else:
-                        log += 'No schedule for the following FIMP assignment:\n%s'\
-                            % one_schedule
-                        critical_log.status = log.status
-                        log.update()
-
-            results.append(result)
-
-    critical_log.update()
-
-    return results, sdfg(actors, edges)
 
 def get_result_csv(search_result, file_name='',
                    report_items=['search time', 'fimps', 'area', 'energy',
                                  'latency', 'sample interval']):
 
-    msg = 'index'
-    for m in report_items:
-        msg += ',' + m
-    msg += '\n'
-
-    index = 0
-    for one_schedule_result in search_result:
-        for one_solution in one_schedule_result:
-            if one_solution != {}:
-                msg += str(index)
-                index += 1
-                for key in report_items:
-                    msg += ',' + str(one_solution[key])
-                msg += '\n'
+    solutions = [one_solution for one_schedule_result in search_result
+                 for one_solution in one_schedule_result
+                 if one_solution != {}]
 
     if file_name == '':
 
-        return msg
+        return _csv_header(report_items) + ''.join(
+            _csv_row(index, one_solution, report_items)
+            for index, one_solution in enumerate(solutions))
 
     else:
 
-        dataf = open(file_name, 'w+')
-        dataf.write(msg)
-        dataf.close()
+        with ResultWriter(file_name, 'csv', report_items) as writer:
+            for one_solution in solutions:
+                writer.write(one_solution)
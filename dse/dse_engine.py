@@ -6,13 +6,14 @@
 
 
 import sys
+import time
 
 from ortools.constraint_solver import pywrapcp
 
-from sylva.base.sylva_base import SYLVABase
-from sylva.base.fimp import FIMPLibrary, FIMPSet, FIMPCost, FIMPInstance
-from sylva.base.cgra import CGRA
-from sylva.base.sdf import SDFG, HSDFG
+from sylva.base.sylva_base import SYLVABase, SDFG, HSDFG, CGRA
+from sylva.base.fimp import FIMPLibrary, FIMPCostSet, FIMPCost, FIMPInstance
+from sylva.dse.cost_tensor import FIMPCostTensor
+from sylva.dse.timing import TimingAnalysis
 
 
 __author__ = 'Shuo Li <contact@shuol.li>'
@@ -20,6 +21,54 @@ __version__ = '2017-05-19'
 __license__ = 'https://opensource.org/licenses/MIT'
 
 
+##
+# @brief      Class for the constraint tightening the objective
+# with a shared incumbent
+#
+# Each time one search variable is bound, the objective is limited
+# to values lower than the incumbent, which other searches may have
+# lowered in the meantime, so a running search is pruned
+# as soon as it cannot improve the incumbent.
+##
+class IncumbentBound(pywrapcp.PyConstraint):
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self       The object
+    # @param      solver     The constraint programming solver
+    # @param      objective  The objective variable
+    # @param      variables  The search variables
+    # @param      incumbent  \copydoc DSEEngine::incumbent
+    ##
+    def __init__(self, solver, objective, variables, incumbent):
+        super().__init__(solver)
+        self.objective = objective
+        self.variables = variables
+        self.incumbent = incumbent
+        self.demons = []
+
+    def Post(self):
+        for v in self.variables:
+            demon = self.Demon(IncumbentBound.tighten)
+            # the demons are not kept by the solver
+            self.demons.append(demon)
+            v.WhenBound(demon)
+
+    def InitialPropagate(self):
+        self.tighten()
+
+    ##
+    # @brief      Limit the objective to the current incumbent
+    ##
+    # @param      self  The object
+    ##
+    def tighten(self):
+        value = self.incumbent.value
+        if value < sys.maxsize:
+            self.objective.SetMax(value - 1)
+
+
 ##
 # @brief      Class for DSEEngine
 ##
@@ -42,6 +91,12 @@ class DSEEngine(SYLVABase):
     # \var fimp_instances
     # The list of FIMPInstance objects.
     # It has all the FIMPInstance objects to be used for CSOP generation.
+    ##
+    # \var incumbent
+    # The best weighted objective value shared by concurrent searches,
+    # a multiprocessing.Value object, or None.
+    # The objective of the running search is tightened with it,
+    # see IncumbentBound.
 
     ##
     # @brief      Constructs the object.
@@ -59,12 +114,18 @@ class DSEEngine(SYLVABase):
     # @param      KE                   Weight factor for energy
     # @param      KT                   Weight factor for latency
     # @param      KR                   Weight factor for sample interval
+    # @param      upper_bound          Only solutions with a weighted
+    # objective lower than this value are searched, 0 for no bound
+    # @param      symmetry_breaking    Order the interchangeable
+    # FIMPInstance objects, see find_symmetries()
+    # @param      incumbent            \copydoc DSEEngine::incumbent
     ##
     def __init__(self, hsdfg, fimp_library, fimp_instances,
                  time_limit=0,
                  max_area=0, max_energy=0, max_latency=0,
                  max_sample_interval=0,
-                 KA=0, KE=0, KT=1, KR=0):
+                 KA=0, KE=0, KT=1, KR=0, upper_bound=0,
+                 symmetry_breaking=True, incumbent=None):
 
         self.solver = pywrapcp.Solver('SYLVA DSE')
 
@@ -73,6 +134,9 @@ class DSEEngine(SYLVABase):
         self.fimp_library = fimp_library
         self.fimp_instances = fimp_instances
 
+        self.actors = hsdfg.actors
+        self.fimps = fimp_instances
+
         if max_area <= 0:
             max_area = sys.maxsize
 
@@ -86,9 +150,9 @@ class DSEEngine(SYLVABase):
             max_sample_interval = sys.maxsize
 
         self.max_area = max_area
-        self.max_energy = sys.maxsize
-        self.max_latency = sys.maxsize
-        self.max_sample_interval = sys.maxsize
+        self.max_energy = max_energy
+        self.max_latency = max_latency
+        self.max_sample_interval = max_sample_interval
 
         self.time_limit = time_limit
 
@@ -108,6 +172,8 @@ class DSEEngine(SYLVABase):
         self.add_fimp_selection_constraint()
         self.add_resource_dependency_constraints()
         self.add_data_dependency_constraints()
+        if symmetry_breaking:
+            self.add_symmetry_breaking_constraints()
 
         self.solver.Add(self.latency < self.max_latency)
         self.solver.Add(self.area < self.max_area)
@@ -115,21 +181,119 @@ class DSEEngine(SYLVABase):
         self.solver.Add(self.sample_interval < self.max_sample_interval)
 
         # prepare optimization objective
+        self.prepare_optimization_objective(KA, KE, KT, KR)
+        if upper_bound > 0:
+            self.solver.Add(self.objective < upper_bound)
 
         search_variables = self.fimp_selection_variable_flatten
         search_variables += self.start
         search_variables += self.extra_buffer
 
+        self.incumbent = incumbent
+        self.incumbent_bound = None
+        if incumbent is not None:
+            self.incumbent_bound = IncumbentBound(
+                self.solver, self.objective, search_variables, incumbent)
+            self.solver.Add(self.incumbent_bound)
+
         self.db = self.solver.Phase(search_variables,
                                     self.solver.CHOOSE_FIRST_UNBOUND,
                                     self.solver.ASSIGN_MIN_VALUE)
 
+        self.best = None
+        self.new_search()
+
+    ##
+    # @brief      Start a new search with the current objective
+    ##
+    # @param      self  The object
+    ##
+    def new_search(self):
+        self.complete = False
+        self.search_start_time = time.time()
         if self.time_limit:
             self.solver.NewSearch(self.db, self.optimization,
                                   self.solver.TimeLimit(self.time_limit))
         else:
             self.solver.NewSearch(self.db, self.optimization)
 
+    ##
+    # @brief      Check if the last search has found all the
+    # improving solutions, instead of being stopped by the time limit
+    ##
+    # @param      self  The object
+    ##
+    # @return     True or False
+    ##
+    def is_complete(self):
+        return self.complete
+
+    ##
+    # @brief      Set the time limit of the next searches
+    ##
+    # @param      self        The object
+    # @param      time_limit  The time limit in ms, 0 for no limit
+    ##
+    def set_time_limit(self, time_limit):
+        self.time_limit = time_limit
+
+    ##
+    # @brief      Prepare the model to be solved again
+    #
+    # The variables and constraints are kept.
+    # The objective weights are replaced and the bounds are tightened,
+    # as the constraints of the constraint solver cannot be removed.
+    # The last solution of the previous search, if it meets the new
+    # bounds, gives the upper bound of the new objective.
+    # The solutions are given by next_solution() again.
+    ##
+    # @param      self                 The object
+    # @param      KA                   Weight factor for area,
+    # None for the current one
+    # @param      KE                   Weight factor for energy
+    # @param      KT                   Weight factor for latency
+    # @param      KR                   Weight factor for sample interval
+    # @param      max_area             The maximum area,
+    # None or a looser bound for the current one
+    # @param      max_energy           The maximum energy
+    # @param      max_latency          The maximum latency
+    # @param      max_sample_interval  The maximum sample interval
+    ##
+    # @return     The object
+    ##
+    def resolve(self, KA=None, KE=None, KT=None, KR=None,
+                max_area=None, max_energy=None, max_latency=None,
+                max_sample_interval=None):
+
+        self.solver.EndSearch()
+
+        for name, maximum in [('area', max_area), ('energy', max_energy),
+                              ('latency', max_latency),
+                              ('sample_interval', max_sample_interval)]:
+            if maximum is not None and 0 < maximum < self['max_' + name]:
+                self['max_' + name] = maximum
+                self[name].SetMax(maximum - 1)
+
+        weights = [w if w is not None else old
+                   for w, old in zip([KA, KE, KT, KR], self.weights)]
+        self.prepare_optimization_objective(*weights)
+        if self.incumbent_bound is not None:
+            self.incumbent_bound.objective = self.objective
+
+        best = self.best
+        if best is not None and \
+                best['area'] < self.max_area and \
+                best['energy'] < self.max_energy and \
+                best['latency'] < self.max_latency and \
+                best['sample_interval'] < self.max_sample_interval:
+            KA, KE, KT, KR = self.weights
+            self.objective.SetMax(KA * best['area'] + KE * best['energy'] +
+                                  KT * best['latency'] +
+                                  KR * best['sample_interval'])
+
+        self.new_search()
+        return self
+
     ##
     # @brief      Prepare optimization objective
     ##
@@ -140,6 +304,7 @@ class DSEEngine(SYLVABase):
     # @param      KR    Weight factor for sample interval
     ##
     def prepare_optimization_objective(self, KA, KE, KT, KR):
+        self.weights = (KA, KE, KT, KR)
         optimization_variable = []
         optimization_weight = []
         if KA > 0:
@@ -159,27 +324,33 @@ class DSEEngine(SYLVABase):
             optimization_variable,
             optimization_weight)
 
-        self.optimization = self.solver.Minimize(optimization_obj, 1)
+        self.objective = optimization_obj.Var()
+        self.optimization = self.solver.Minimize(self.objective, 1)
 
     ##
     # @brief      Preoare FIMP selection variable
+    #
+    # The FIMP types which can never meet the constraints,
+    # see sylva.dse.cost_tensor.FIMPCostTensor.prune(),
+    # get selection variables fixed to 0.
     ##
     # @param      self  The object
     ##
-    # @return     { description_of_the_return_value }
-    ##
     def prepare_fimp_selection_variable(self):
 
         # FIMP assignment search varable
         # It is a matrix.
         # Each row represents a FIMPInstance with unassigned FIMP type
-        self.fimp_matrix = [self.fimp_library[n.function_name]
+        self.fimp_matrix = [self.fimp_library.get_fimp_costs(n.function_name)
                             for n in self.fimp_instances]
 
-        self.fimp_type_count_set = [one_fimp_set.fimp_count
-                                    for one_fimp_set in self.fimp_matrix]
+        self.fimp_type_count_set = [len(fimp_costs)
+                                    for fimp_costs in self.fimp_matrix]
 
-        max_fimp_type_count = max(self.fimp_type_count_set)
+        self.cost_tensor = FIMPCostTensor(self.fimp_library, self.fimps)
+        self.fimp_type_allowed = self.cost_tensor.prune(
+            self.max_area, self.max_energy,
+            self.max_latency, self.max_sample_interval)
 
         self.fimp_selection_variable = []
         for unassignend_fimp_index in range(len(self.fimps)):
@@ -188,8 +359,9 @@ class DSEEngine(SYLVABase):
             for current_fimp_index in range(self.fimp_type_count_set[f]):
                 i = current_fimp_index
                 self.fimp_selection_variable[f].append(
-                    self.solver.IntVar(0, 1, 'FIMP selection %s %s'
-                                       % (str(self.fimp_matrix[f][i].name), i)))
+                    self.solver.IntVar(0, int(self.fimp_type_allowed[f, i]),
+                                       'FIMP selection %s %s'
+                                       % (str(self.fimp_matrix[f][i].fimp_type_name), i)))
 
         self.fimp_selection_variable_flatten \
             = [var for row in self.fimp_selection_variable for var in row]
@@ -201,107 +373,83 @@ class DSEEngine(SYLVABase):
             s = sum(self.fimp_selection_variable[f]).Var()
             self.solver.Add(s == 1)
 
-    def prepare_area_variable(self):
-
-        self.area_matrix = []
-
-        for unassignend_fimp_index in range(len(self.fimps)):
-            f = unassignend_fimp_index
-            self.area_matrix.append([])
-            for current_fimp_index in range(self.fimp_type_count_set[f]):
-                i = current_fimp_index
-                self.area_matrix[f].append(self.fimp_matrix[f][i].area)
-
-        self.area_var = [self.solver.ScalProd(
+    ##
+    # @brief      Get the variable of one FIMPCost field of each FIMPInstance
+    ##
+    # @param      self    The object
+    # @param      matrix  The cost matrix of the FIMPCostTensor
+    ##
+    # @return     list of variables
+    ##
+    def selected_cost_variables(self, matrix):
+        return [self.solver.ScalProd(
             self.fimp_selection_variable[f],
-            self.area_matrix[f]).Var()
+            self.cost_tensor.row(matrix, f)).Var()
             for f in range(len(self.fimps))]
 
-        self.area = sum(self.area_var).Var()
+    def prepare_area_variable(self):
 
-    def prepare_energy_ariable(self):
+        self.area_matrix = self.cost_tensor.area
+        self.area_var = self.selected_cost_variables(self.area_matrix)
 
-        self.energy_matrix = []
+        self.area = sum(self.area_var).Var()
 
-        for unassignend_fimp_index in range(len(self.fimps)):
-            f = unassignend_fimp_index
-            self.energy_matrix.append([])
-            for current_fimp_index in range(self.fimp_type_count_set[f]):
-                i = current_fimp_index
-                self.energy_matrix[f].append(self.fimp_matrix[f][i].energy)
+    def prepare_energy_ariable(self):
 
-        self.energy_var = [self.solver.ScalProd(
-            self.fimp_selection_variable[f],
-            self.energy_matrix[f]).Var()
-            for f in range(len(self.fimps))]
+        self.energy_matrix = self.cost_tensor.energy
+        self.energy_var = self.selected_cost_variables(self.energy_matrix)
 
-        self.energy = sum([self.energy_var[one_actor.fimp.index]
+        self.energy = sum([self.energy_var[one_actor.fimp_instance.index]
                            for one_actor in self.actors]).Var()
 
+    ##
+    # @brief      Prepare start time variables
+    #
+    # The domain of each start time is from its ASAP time to its ALAP time,
+    # see sylva.dse.timing.TimingAnalysis.
+    # An empty domain is replaced by its ASAP time,
+    # and the latency constraint makes the CSOP infeasible.
+    ##
+    # @param      self  The object
+    ##
     def prepare_start_time_variable(self):
 
-        self.start = [self.solver.IntVar(0, self.max_latency - 1,
-                                         'start time %i' % one_actor.index)
-                      for one_actor in self.actors]
+        self.timing = TimingAnalysis(
+            self.hsdfg, self.fimp_library, self.fimps,
+            self.max_latency if self.max_latency < sys.maxsize else 0)
 
-    def prepare_end_time_variable(self):
+        self.start = []
+        for a, one_actor in enumerate(self.actors):
+            lower, upper = self.timing.get_start_domain(a)
+            self.start.append(self.solver.IntVar(
+                lower, max(lower, upper), 'start time %i' % one_actor.index))
 
-        self.end_matrix = []
-
-        for f in range(len(self.fimps)):
-            self.end_matrix.append([])
-            for current_fimp_index in range(self.fimp_type_count_set[f]):
-                i = current_fimp_index
-                self.end_matrix[f].append(self.fimp_matrix[f][i].computation - 1)
+    def prepare_end_time_variable(self):
 
-        self.end_var = [self.solver.ScalProd(
-            self.fimp_selection_variable[f],
-            self.end_matrix[f]).Var()
-            for f in range(len(self.fimps))]
+        self.end_matrix = self.cost_tensor.computation_phase - 1
+        self.end_var = self.selected_cost_variables(self.end_matrix)
 
         self.end = [(self.start[one_actor.index]
-                     + self.end_var[one_actor.fimp.index]).Var()
+                     + self.end_var[one_actor.fimp_instance.index]).Var()
                     for one_actor in self.actors]
 
     def prepare_input_end_time_variable(self):
 
-        self.input_end_matrix = []
-
-        for unassignend_fimp_index in range(len(self.fimps)):
-            f = unassignend_fimp_index
-            self.input_end_matrix.append([])
-            for current_fimp_index in range(self.fimp_type_count_set[f]):
-                i = current_fimp_index
-                self.input_end_matrix[f].append(self.fimp_matrix[f][i].input_end)
-
-        self.input_end_var = [self.solver.ScalProd(
-            self.fimp_selection_variable[f],
-            self.input_end_matrix[f]).Var()
-            for f in range(len(self.fimps))]
+        self.input_end_matrix = self.cost_tensor.input_end_time
+        self.input_end_var = self.selected_cost_variables(self.input_end_matrix)
 
         self.input_end = [(self.start[one_actor.index]
-                           + self.input_end_var[one_actor.fimp.index]).Var()
+                           + self.input_end_var[one_actor.fimp_instance.index]).Var()
                           for one_actor in self.actors]
 
     def prepare_output_start_time_variable(self):
 
-        self.output_start_matrix = []
-
-        for unassignend_fimp_index in range(len(self.fimps)):
-            f = unassignend_fimp_index
-            self.output_start_matrix.append([])
-            for current_fimp_index in range(self.fimp_type_count_set[f]):
-                i = current_fimp_index
-                self.output_start_matrix[f].append(
-                    self.fimp_matrix[f][i].output_start)
-
-        self.output_start_var = [self.solver.ScalProd(
-            self.fimp_selection_variable[f],
-            self.output_start_matrix[f]).Var()
-            for f in range(len(self.fimps))]
+        self.output_start_matrix = self.cost_tensor.output_start_time
+        self.output_start_var = self.selected_cost_variables(
+            self.output_start_matrix)
 
         self.output_start = [(self.start[one_actor.index]
-                              + self.output_start_var[one_actor.fimp.index]).Var()
+                              + self.output_start_var[one_actor.fimp_instance.index]).Var()
                              for one_actor in self.actors]
 
     def prepare_buffer_end_time_variable(self):
@@ -309,7 +457,7 @@ class DSEEngine(SYLVABase):
         self.buffer_end = []
         for one_actor in self.actors:
             input_end_list = [self.end[one_actor.index]]
-            for next_edge in one_actor.next:
+            for next_edge in one_actor.outgoing_edges:
                 input_end_list.append(self.input_end[next_edge.dest_actor.index])
 
             self.buffer_end.append(self.solver.Max(input_end_list).Var())
@@ -341,9 +489,9 @@ class DSEEngine(SYLVABase):
     def add_data_dependency_constraints(self):
 
         for one_actor in self.actors:
-            if len(one_actor.next) > 0:
+            if len(one_actor.outgoing_edges) > 0:
                 input_end_list = [self.end[one_actor.index]]
-                for next_edge in one_actor.next:
+                for next_edge in one_actor.outgoing_edges:
                     # start time > end time
                     self.solver.Add(self.start[next_edge.dest_actor.index]
                                     > self.end[one_actor.index])
@@ -354,6 +502,29 @@ class DSEEngine(SYLVABase):
                 max_input_end = self.solver.Max(input_end_list).Var()
                 self.solver.Add(self.buffer_end[one_actor.index] == max_input_end)
 
+    ##
+    # @brief      Order the interchangeable FIMPInstance objects
+    #
+    # The actors of one FIMPInstance already run in their list order,
+    # so only the twin FIMPInstance objects are ordered lexicographically
+    # by their FIMP type and the start times of their actors.
+    ##
+    # @param      self  The object
+    ##
+    def add_symmetry_breaking_constraints(self):
+
+        _, twin_fimps = find_symmetries(self.hsdfg, self.fimps)
+
+        def order(f):
+            fimp_type = self.solver.ScalProd(
+                self.fimp_selection_variable[f],
+                list(range(self.fimp_type_count_set[f]))).Var()
+            return [fimp_type] + [self.start[a.index]
+                                  for a in self.fimps[f].actors]
+
+        for f, g in twin_fimps:
+            self.solver.Add(self.solver.LexicalLessOrEqual(order(f), order(g)))
+
     def prepare_latency_and_sample_interval_variables(self):
         self.latency = self.solver.Max(self.end).Var()
 
@@ -369,11 +540,70 @@ class DSEEngine(SYLVABase):
 
         self.sample_interval = self.solver.Max(intervals).Var()
 
+    ##
+    # @brief      Get the next improving solution
+    ##
+    # @param      self  The object
+    ##
+    # @return     dictionary object with the fields used by
+    # sylva.dse.dse.one_search, or None if there is no more solution
+    ##
+    def next_solution(self):
+
+        if not self.solver.NextSolution():
+            # the search ends before the time limit only if it is complete
+            self.complete = not self.time_limit or \
+                (time.time() - self.search_start_time) * 1000 < self.time_limit
+            return None
+
+        result = {'branches': self.solver.Branches(),
+                  'failures': self.solver.Failures(),
+                  'memory': pywrapcp.Solver.MemoryUsage(),
+                  'objective': self.objective.Value(),
+                  'fimps': len(self.fimps),
+                  'area': self.area.Value(),
+                  'latency': self.latency.Value(),
+                  'energy': self.energy.Value(),
+                  'sample_interval': self.sample_interval.Value()}
+
+        result['start'] = [int(t.Value()) for t in self.start]
+        result['end'] = [int(t.Value()) for t in self.end]
+        result['input_end'] = [int(t.Value()) for t in self.input_end]
+        result['output_start'] = [int(t.Value()) for t in self.output_start]
+        result['buffer_end'] = [int(t.Value()) for t in self.buffer_end]
+        result['extra_buffer'] = [int(t.Value()) for t in self.extra_buffer]
+
+        result['fimp_types'] = [-1 for f in self.fimps]
+        for f in self.fimps:
+            fimp_type = 0
+            for var in self.fimp_selection_variable[f.index]:
+                if int(var.Value()) == 1:
+                    result['fimp_types'][f.index] = fimp_type
+                fimp_type = fimp_type + 1
+
+        self.best = dict(result)
+
+        return result
 
-def all_schedules(self):
+
+##
+# @brief      Enumerate the load balanced schedules of one SDFG lazily
+#
+# One schedule is the number of FIMPInstance objects of each SDFG Actor.
+# For each divisor of the repetition count of each SDFG Actor,
+# the same ratio of HSDFG actors per FIMPInstance is kept
+# for all the SDFG actors, rounded up to their divisors,
+# otherwise some of the FIMPInstance objects will be wasted.
+# Each distinct schedule is given once.
+##
+# @param      sdfg  The SDFG
+##
+# @return     generator of schedules
+##
+def iter_schedules(sdfg):
 
     # Calculate the factor of n
-    # e.g. factor(4) = [1, 2, 4], factor(10) = [1, 2, 5]
+    # e.g. factor(4) = [1, 2, 4], factor(10) = [1, 2, 5, 10]
     def _factor(n):
         return [i for i in range(1, n + 1) if n % i == 0]
 
@@ -389,7 +619,8 @@ def all_schedules(self):
     # @param      list_obj  The list object
     # @param      number    The number
     ##
-    # @return     { description_of_the_return_value }
+    # @return     The first value not less than the number,
+    # or the last value
     ##
     def _ceil(list_obj, number):
         for v in list_obj:
@@ -397,33 +628,36 @@ def all_schedules(self):
                 return v
         return list_obj[-1]
 
-    repetition_vector = self.repetition_vector
+    repetition_vector = sdfg.repetition_vector
     possible_fimp_counts = [_factor(n) for n in repetition_vector]
 
-    result = []
+    seen = set()
 
-    for actor in self.actor:
-        for fimp_count in possible_fimp_counts[actor.index]:
-            # Maximum numbef of FIMPInstance objects
+    for i, actor in enumerate(sdfg.actors):
+        for fimp_count in possible_fimp_counts[i]:
+            # Maximum number of FIMPInstance objects
             # over
             # current deployed FIMPInstance objects
-            #
-            # This ratio should be kept for all the SDFG Actors otherwise
-            # some of the FIMPInstance objects will be wasted.
-            ratio = int(repetition_vector[actor.index] / fimp_count)
-            schedule = []
+            ratio = repetition_vector[i] // fimp_count
 
-            for a in self.actors:
-                fimp_count = int(repetition_vector[a.index] / ratio)
-                fimp_count = _ceil(possible_fimp_counts[a.index], fimp_count)
-                schedule.append(fimp_count)
+            schedule = tuple(
+                _ceil(possible_fimp_counts[j], repetition_vector[j] // ratio)
+                for j in range(len(sdfg.actors)))
 
-            if schedule not in result:
-                result.append(schedule)
+            if schedule not in seen:
+                seen.add(schedule)
+                yield list(schedule)
 
-        return result
 
-    return result
+##
+# @brief      Get all the load balanced schedules of one SDFG
+##
+# @param      self  The SDFG
+##
+# @return     list of schedules, in the order of iter_schedules()
+##
+def all_schedules(self):
+    return list(iter_schedules(self))
 
 # def some_schedules((sdf_actors, sdf_edges), size=None):
 #     '''
@@ -448,37 +682,83 @@ def all_schedules(self):
 #     return evenly_pick(schedules(p, a, p[0][0], result), size)
 
 
-# def assign_fimps(hsdf_actors, fimp_count_list):
-#     '''
-#       Create a relative schedule based on a given FIMP count list.
-#     '''
-
-#     actors = {}
-#     for a in hsdf_actors:
-#         if a.base_actor.index not in actors.keys():
-#             actors[a.base_actor.index] = []
-#         actors[a.base_actor.index].append(a)
-
-#     fimps = [fimp(index=i)
-#              for i in xrange(sum(fimp_count_list))]
-
-#     c = 0
-#     # current FIMP index
+##
+# @brief      Find the interchangeable HSDFG actors and FIMPInstance objects
+#
+# Two HSDFG actors are twins if they have the same SDFG Actor
+# and the same predecessors and successors,
+# so swapping them keeps the HSDFG.
+# Two FIMPInstance objects are twins if they have the same function
+# and their actors are twins one by one,
+# so swapping them with their actors keeps the CSOP.
+# The symmetries are given as pairs to be ordered,
+# which are consecutive in each class of twins.
+##
+# @param      hsdfg  The HSDFG
+# @param      fimps  The FIMPInstance objects
+##
+# @return     (list of (actor position, actor position) pairs
+# of twins sharing one FIMPInstance,
+# list of (FIMP position, FIMP position) pairs of twins)
+##
+def find_symmetries(hsdfg, fimps):
+
+    positions = {id(a): i for i, a in enumerate(hsdfg.actors)}
+    predecessors = [set() for _ in hsdfg.actors]
+    successors = [set() for _ in hsdfg.actors]
+    for e in hsdfg.edges:
+        src, dest = positions[id(e.src_actor)], positions[id(e.dest_actor)]
+        successors[src].add(dest)
+        predecessors[dest].add(src)
+
+    signatures = [(id(a.base_actor), frozenset(predecessors[i]),
+                   frozenset(successors[i]))
+                  for i, a in enumerate(hsdfg.actors)]
+
+    twin_actors = []
+    fimp_classes = {}
+    for f, one_fimp in enumerate(fimps):
+        last = {}
+        actors = [positions[id(a)] for a in one_fimp.actors]
+        for a in actors:
+            if signatures[a] in last:
+                twin_actors.append((last[signatures[a]], a))
+            last[signatures[a]] = a
+        if actors:
+            key = (one_fimp.function_name,
+                   tuple(signatures[a] for a in actors))
+            fimp_classes.setdefault(key, []).append(f)
+
+    twin_fimps = [pair for twins in fimp_classes.values()
+                  for pair in zip(twins, twins[1:])]
+
+    return twin_actors, twin_fimps
 
-#     for i in actors.keys():  # for each SDF actor
 
-#         f = 0
-#         # current FIMP index for one SDF actor
+##
+# @brief      Create the FIMPInstance objects for one schedule
+#
+# The HSDFG actors of each SDFG Actor are assigned to its
+# FIMPInstance objects in a round-robin way.
+# `sdfg.get_hsdf()` should be called before,
+# so each SDFG Actor has its HSDFG actors in `child_actors`.
+##
+# @param      sdfg             The SDFG
+# @param      fimp_count_list  The number of FIMPInstance objects
+# of each SDFG Actor
+##
+# @return     list of FIMPInstance objects
+##
+def assign_fimps(sdfg, fimp_count_list):
 
-#         for a in actors[i]:
-#             # for each HSDF actor
-#             if f == fimp_count_list[i]:
-#                 c -= fimp_count_list[i]
-#                 f = 0
+    result = []
 
-#             fimps[c].name = a.name
-#             fimps[c].add_actor(a)
-#             c += 1
-#             f += 1
+    for one_sdf_actor, fimp_count in zip(sdfg.actors, fimp_count_list):
+        fimps = [FIMPInstance(function_name=one_sdf_actor.name,
+                              index=len(result) + i, actors=[])
+                 for i in range(fimp_count)]
+        for i, one_hsdf_actor in enumerate(one_sdf_actor.child_actors):
+            fimps[i % fimp_count].add(one_hsdf_actor)
+        result += fimps
 
-#     return fimps
+    return result
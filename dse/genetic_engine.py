@@ -0,0 +1,400 @@
+##
+# \package sylva.dse.genetic_engine
+#
+# Design Space Exploration (DSE) Engine based on a genetic algorithm
+##
+# For HSDFGs too large for the exact CP search.
+# Each individual is the FIMP type of each FIMPInstance
+# and the priority of each HSDFG actor.
+# It is decoded by the list scheduling of
+# sylva.dse.list_engine.ListSchedulingEngine with its priorities,
+# so every individual is a valid schedule,
+# and only the constraints can be violated.
+# Each child is decoded incrementally from the actor order of
+# its more similar parent, so the actors scheduled before the first
+# changed priority or FIMP type are not list scheduled again.
+# Feasible individuals are always better than infeasible ones,
+# which are ranked by their total constraint violation.
+# The first population has the list scheduling result of the engine,
+# and the others are random.
+# The population is evaluated by worker processes,
+# which are created once and kept until the evolution stops.
+##
+
+import multiprocessing
+import random
+import sys
+import time
+
+from sylva.dse.list_engine import ListSchedulingEngine
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# The GeneticEngine object of the worker processes.
+##
+_engine = None
+
+
+def _init_worker(engine):
+    global _engine
+    _engine = engine
+
+
+def _evaluate_task(individual):
+    return _engine.fitness(individual)
+
+
+##
+# @brief      Class for genetic algorithm DSE engine
+#
+# It can replace sylva.dse.dse_engine.DSEEngine in sylva.dse.one_search.
+# Each next_solution() continues the evolution until a better feasible
+# individual is found, or there is no improvement for `patience`
+# generations, or the time limit is reached.
+##
+
+
+class GeneticEngine(ListSchedulingEngine):
+
+    ##
+    # \var population_size
+    # The number of individuals of each generation.
+    ##
+    # \var elite_size
+    # The number of the best individuals kept in the next generation.
+    ##
+    # \var mutation_rate
+    # The probability to mutate each gene.
+    ##
+    # \var patience
+    # The number of generations without improvement to stop.
+    ##
+    # \var workers
+    # The number of worker processes, all CPU cores if 0.
+    # The population is evaluated in this process
+    # if it is 1 or this process is a daemon, e.g. a worker of
+    # sylva.dse.dse.search_all().
+    ##
+    # \var population
+    # The individuals of the current generation, each one is
+    # (fitness, FIMP type tuple, priority tuple, actor order tuple),
+    # sorted by fitness.
+    ##
+    # \var generations
+    # The number of generations.
+    ##
+    # \var evaluations
+    # The number of evaluated individuals.
+    ##
+    # \var pool
+    # The multiprocessing.Pool object of the worker processes,
+    # None before the first next_solution() and after close().
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self                 The object
+    # @param      hsdfg                The HSDFG object
+    # @param      fimp_library         The FIMPLibrary
+    # @param      fimp_instances       The list of FIMPInstance objects
+    # @param      time_limit           The time limit of each
+    # next_solution() in ms, 0 for no limit
+    # @param      max_area             The maximum area
+    # @param      max_energy           The maximum energy
+    # @param      max_latency          The maximum latency
+    # @param      max_sample_interval  The maximum sample interval
+    # @param      KA                   Weight factor for area
+    # @param      KE                   Weight factor for energy
+    # @param      KT                   Weight factor for latency
+    # @param      KR                   Weight factor for sample interval
+    # @param      upper_bound          Only solutions with a weighted
+    # objective lower than this value are accepted, 0 for no bound
+    # @param      population_size      \copydoc GeneticEngine::population_size
+    # @param      elite_size           \copydoc GeneticEngine::elite_size
+    # @param      mutation_rate        \copydoc GeneticEngine::mutation_rate
+    # @param      patience             \copydoc GeneticEngine::patience
+    # @param      workers              \copydoc GeneticEngine::workers
+    # @param      seed                 The random seed
+    ##
+    def __init__(self, hsdfg, fimp_library, fimp_instances,
+                 time_limit=0,
+                 max_area=0, max_energy=0, max_latency=0,
+                 max_sample_interval=0,
+                 KA=0, KE=0, KT=1, KR=0, upper_bound=0,
+                 population_size=32, elite_size=2, mutation_rate=0.1,
+                 patience=20, workers=0, seed=None):
+
+        super().__init__(hsdfg, fimp_library, fimp_instances, time_limit,
+                         max_area, max_energy, max_latency,
+                         max_sample_interval, KA, KE, KT, KR, upper_bound)
+
+        self.population_size = max(2, population_size)
+        self.elite_size = min(elite_size, self.population_size)
+        self.mutation_rate = mutation_rate
+        self.patience = patience
+        self.workers = workers
+        self.random = random.Random(seed)
+
+        self.population = None
+        self.generations = 0
+        self.evaluations = 0
+        self.stalled = 0
+        self.best = None
+        self.best_objective = sys.maxsize
+        self.pool = None
+
+    ##
+    # @brief      Get the fitness of one individual
+    ##
+    # @param      self        The object
+    # @param      individual  (FIMP type tuple, priority tuple),
+    # and the parents of a child, each one is
+    # (FIMP type tuple, priority tuple, actor order tuple)
+    ##
+    # @return     ((total constraint violation, weighted objective),
+    # actor order tuple)
+    ##
+    def fitness(self, individual):
+
+        fimp_types, priority = individual[:2]
+        start, order = self.decode(fimp_types, priority, individual[2:])
+        result = self.get_result(fimp_types, start)
+
+        objective = self.weighted_objective(result)
+
+        violation = 0
+        for value, maximum in [(result['latency'], self.max_latency),
+                               (result['area'], self.max_area),
+                               (result['energy'], self.max_energy),
+                               (result['sample_interval'],
+                                self.max_sample_interval),
+                               (objective, self.upper_bound)]:
+            violation += max(0, value - maximum + 1)
+
+        return (violation, objective), order
+
+    ##
+    # @brief      Create the worker processes
+    ##
+    # @param      self  The object
+    ##
+    # @return     multiprocessing.Pool object, or None
+    # if the population is evaluated in this process
+    ##
+    def create_pool(self):
+        workers = min(self.workers or multiprocessing.cpu_count(),
+                      self.population_size)
+        if workers <= 1 or multiprocessing.current_process().daemon:
+            return None
+        return multiprocessing.Pool(workers, initializer=_init_worker,
+                                    initargs=(self,))
+
+    ##
+    # @brief      Evaluate the individuals
+    ##
+    # @param      self         The object
+    # @param      individuals  list of individuals of fitness()
+    # @param      pool         The multiprocessing.Pool object, or None
+    ##
+    # @return     list of (fitness, FIMP type tuple, priority tuple,
+    # actor order tuple)
+    ##
+    def evaluate(self, individuals, pool=None):
+
+        if pool is None:
+            fitness = [self.fitness(i) for i in individuals]
+        else:
+            fitness = pool.map(_evaluate_task, individuals)
+
+        self.evaluations += len(individuals)
+        return [(f, i[0], i[1], order)
+                for (f, order), i in zip(fitness, individuals)]
+
+    ##
+    # @brief      Create the first population
+    ##
+    # @param      self  The object
+    # @param      pool  The multiprocessing.Pool object, or None
+    ##
+    def initialize(self, pool=None):
+
+        fimp_types = tuple(self.select_fimp_types())
+        costs = [self.fimp_matrix[f][fimp_types[f]] for f in self.actor_fimps]
+        individuals = [(fimp_types,
+                        tuple(self.critical_path_priority(costs)))]
+
+        while len(individuals) < self.population_size:
+            individuals.append((
+                tuple(self.random.randrange(len(row))
+                      for row in self.fimp_matrix),
+                tuple(self.random.random() for _ in self.actors)))
+
+        self.population = sorted(self.evaluate(individuals, pool))
+
+    ##
+    # @brief      Select one parent by binary tournament
+    ##
+    # @param      self  The object
+    ##
+    # @return     (fitness, FIMP type tuple, priority tuple,
+    # actor order tuple)
+    ##
+    def select_parent(self):
+        return min(self.random.sample(self.population, 2))
+
+    ##
+    # @brief      Create one child by uniform crossover and mutation
+    #
+    # The FIMP type is mutated to another random FIMP type,
+    # and the priority to a random value between the lowest and
+    # the highest priority of the parent.
+    ##
+    # @param      self     The object
+    # @param      parent1  (fitness, FIMP type tuple, priority tuple,
+    # actor order tuple)
+    # @param      parent2  The other parent
+    ##
+    # @return     (FIMP type tuple, priority tuple, parent1 decoding,
+    # parent2 decoding), the decodings are the parents without fitness
+    ##
+    def create_child(self, parent1, parent2):
+
+        def choose(genes1, genes2):
+            return [a if self.random.random() < 0.5 else b
+                    for a, b in zip(genes1, genes2)]
+
+        fimp_types = choose(parent1[1], parent2[1])
+        for f, row in enumerate(self.fimp_matrix):
+            if self.random.random() < self.mutation_rate:
+                fimp_types[f] = self.random.randrange(len(row))
+
+        priority = choose(parent1[2], parent2[2])
+        lower, upper = min(parent1[2]), max(parent1[2])
+        for a in range(len(priority)):
+            if self.random.random() < self.mutation_rate:
+                priority[a] = self.random.uniform(lower, upper)
+
+        return tuple(fimp_types), tuple(priority), parent1[1:], parent2[1:]
+
+    ##
+    # @brief      Create the next generation
+    #
+    # The elite individuals are kept with their fitness,
+    # so only the children are evaluated.
+    ##
+    # @param      self  The object
+    # @param      pool  The multiprocessing.Pool object, or None
+    ##
+    def evolve(self, pool=None):
+
+        children = [self.create_child(self.select_parent(),
+                                      self.select_parent())
+                    for _ in range(self.population_size - self.elite_size)]
+
+        self.population = sorted(self.population[:self.elite_size] +
+                                 self.evaluate(children, pool))
+        self.generations += 1
+
+    ##
+    # @brief      Check if the evolution has stopped
+    #
+    # The genetic algorithm cannot prove that there is no better solution,
+    # so it is complete when there is no improvement
+    # for `patience` generations.
+    ##
+    # @param      self  The object
+    ##
+    # @return     True or False
+    ##
+    def is_complete(self):
+        return self.done
+
+    ##
+    # @brief      Set the time limit of the next next_solution()
+    ##
+    # @param      self        The object
+    # @param      time_limit  The time limit in ms, 0 for no limit
+    ##
+    def set_time_limit(self, time_limit):
+        self.time_limit = time_limit
+
+    ##
+    # @brief      Get the next improving solution
+    ##
+    # @param      self  The object
+    ##
+    # @return     dictionary object with the fields used by
+    # sylva.dse.dse.one_search, or None if there is no improvement
+    ##
+    def next_solution(self):
+
+        start_time = time.time()
+        if self.pool is None and not self.done:
+            self.pool = self.create_pool()
+        try:
+            return self.search(start_time, self.pool)
+        except BaseException:
+            self.close()
+            raise
+        finally:
+            if self.done:
+                self.close()
+
+    ##
+    # @brief      Stop the worker processes
+    #
+    # It is called when the evolution stops, and should be called
+    # if the engine is not used until is_complete().
+    ##
+    # @param      self  The object
+    ##
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    ##
+    # @brief      Evolve until a better feasible individual is found
+    ##
+    # @param      self        The object
+    # @param      start_time  The start time of next_solution()
+    # @param      pool        The multiprocessing.Pool object, or None
+    ##
+    # @return     The result of next_solution()
+    ##
+    def search(self, start_time, pool):
+
+        if self.population is None:
+            self.initialize(pool)
+
+        while not self.done:
+
+            (violation, objective), fimp_types, priority, _ = \
+                self.population[0]
+            if not violation and objective < self.best_objective:
+                self.best_objective = objective
+                self.stalled = 0
+                result = self.schedule(fimp_types, priority)
+                result['branches'] = self.evaluations
+                result['search_time'] = time.time() - start_time
+                self.best = dict(result)
+                result['objective'] = objective
+                return result
+
+            if self.stalled >= self.patience:
+                self.done = True
+                break
+            if self.time_limit and \
+                    (time.time() - start_time) * 1000 >= self.time_limit:
+                break
+
+            self.evolve(pool)
+            self.stalled += 1
+
+        return None
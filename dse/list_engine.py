@@ -0,0 +1,414 @@
+##
+# \package sylva.dse.list_engine
+#
+# Design Space Exploration (DSE) Engine based on list scheduling
+##
+# The FIMP type of each FIMPInstance is selected greedily,
+# then the HSDFG actors are scheduled by priority list scheduling,
+# where the priority of one Actor is its critical path length
+# to the end of the HSDFG.
+# The result is feasible for the CSOP of
+# sylva.dse.cpsat_engine.CPSATEngine,
+# so it can be used as an upper bound and a solution hint for it.
+# It is not always feasible for sylva.dse.dse_engine.DSEEngine,
+# which runs the actors of one FIMPInstance in their list order
+# and gives the extra buffer to the earlier actor,
+# while here they run in priority order and the later actor
+# gets the extra buffer.
+##
+
+import heapq
+import sys
+import time
+
+from sylva.base.sylva_base import SYLVABase
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Class for list scheduling DSE engine
+#
+# It can replace sylva.dse.dse_engine.DSEEngine in sylva.dse.one_search.
+# It gives only one solution.
+##
+
+
+class ListSchedulingEngine(SYLVABase):
+
+    ##
+    # \var hsdfg
+    # The HSDFG object.
+    ##
+    # \var fimp_library
+    # The FIMPLibrary.
+    ##
+    # \var fimp_instances
+    # The list of FIMPInstance objects.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self                 The object
+    # @param      hsdfg                \copydoc ListSchedulingEngine::hsdfg
+    # @param      fimp_library         \copydoc ListSchedulingEngine::fimp_library
+    # @param      fimp_instances       \copydoc ListSchedulingEngine::fimp_instances
+    # @param      time_limit           Not used, for the same interface as
+    # the other DSE engines
+    # @param      max_area             The maximum area
+    # @param      max_energy           The maximum energy
+    # @param      max_latency          The maximum latency
+    # @param      max_sample_interval  The maximum sample interval
+    # @param      KA                   Weight factor for area
+    # @param      KE                   Weight factor for energy
+    # @param      KT                   Weight factor for latency
+    # @param      KR                   Weight factor for sample interval
+    # @param      upper_bound          Only solutions with a weighted
+    # objective lower than this value are accepted, 0 for no bound
+    ##
+    def __init__(self, hsdfg, fimp_library, fimp_instances,
+                 time_limit=0,
+                 max_area=0, max_energy=0, max_latency=0,
+                 max_sample_interval=0,
+                 KA=0, KE=0, KT=1, KR=0, upper_bound=0):
+
+        self.hsdfg = hsdfg
+        self.fimp_library = fimp_library
+        self.fimp_instances = fimp_instances
+
+        self.actors = list(hsdfg.actors)
+        self.fimps = list(fimp_instances)
+
+        self.max_area = max_area if max_area > 0 else sys.maxsize
+        self.max_energy = max_energy if max_energy > 0 else sys.maxsize
+        self.max_latency = max_latency if max_latency > 0 else sys.maxsize
+        self.max_sample_interval = max_sample_interval \
+            if max_sample_interval > 0 else sys.maxsize
+
+        self.time_limit = time_limit
+        self.weights = (KA, KE, KT, KR)
+        self.upper_bound = upper_bound if upper_bound > 0 else sys.maxsize
+
+        self.fimp_matrix = [self.fimp_library.get_fimp_costs(f.function_name)
+                            for f in self.fimps]
+
+        positions = {id(a): i for i, a in enumerate(self.actors)}
+        self.actor_fimps = [None] * len(self.actors)
+        self.fimp_actors = []
+        for f, one_fimp in enumerate(self.fimps):
+            self.fimp_actors.append([positions[id(a)] for a in one_fimp.actors])
+            for a in self.fimp_actors[-1]:
+                self.actor_fimps[a] = f
+        for a, f in enumerate(self.actor_fimps):
+            if f is None:
+                one_actor = self.actors[a]
+                raise ValueError(f'no FIMPInstance for actor '
+                                 f'{one_actor.name}_{one_actor.index}.')
+
+        self.successors = [[] for _ in self.actors]
+        self.predecessors = [[] for _ in self.actors]
+        for e in hsdfg.edges:
+            if not e.delay:
+                src, dest = positions[id(e.src_actor)], positions[id(e.dest_actor)]
+                self.successors[src].append(dest)
+                self.predecessors[dest].append(src)
+
+        self.done = False
+
+    ##
+    # @brief      Select the FIMP type of each FIMPInstance greedily
+    #
+    # The FIMP type with the lowest weighted area, energy and
+    # computation time for all its actors is selected.
+    ##
+    # @param      self  The object
+    ##
+    # @return     The FIMP type index of each FIMPInstance
+    ##
+    def select_fimp_types(self):
+        KA, KE, KT, KR = self.weights
+        result = []
+        for f, fimp_costs in enumerate(self.fimp_matrix):
+            count = len(self.fimp_actors[f])
+            result.append(min(
+                range(len(fimp_costs)),
+                key=lambda i: (KA * fimp_costs[i].area +
+                               KE * fimp_costs[i].energy * count +
+                               (KT + KR) * fimp_costs[i].computation_phase * count,
+                               fimp_costs[i].computation_phase)))
+        return result
+
+    ##
+    # @brief      Get the topological order of the HSDFG actors
+    ##
+    # @param      self  The object
+    ##
+    # @return     list of Actor positions
+    ##
+    def topological_order(self):
+        in_degrees = [len(p) for p in self.predecessors]
+        result = [a for a, d in enumerate(in_degrees) if d == 0]
+        for a in result:
+            for s in self.successors[a]:
+                in_degrees[s] -= 1
+                if in_degrees[s] == 0:
+                    result.append(s)
+        if len(result) != len(self.actors):
+            raise ValueError('the HSDFG has a cycle without delay.')
+        return result
+
+    ##
+    # @brief      Get the critical path length of each HSDFG actor
+    # to the end of the HSDFG
+    ##
+    # @param      self   The object
+    # @param      costs  The FIMPCost object of each HSDFG actor
+    ##
+    # @return     list of int
+    ##
+    def critical_path_priority(self, costs):
+        priority = [0] * len(self.actors)
+        for a in reversed(self.topological_order()):
+            priority[a] = costs[a].computation_phase + max(
+                [priority[s] for s in self.successors[a]], default=0)
+        return priority
+
+    ##
+    # @brief      Schedule the HSDFG actors with one FIMP type selection
+    ##
+    # @param      self        The object
+    # @param      fimp_types  The FIMP type index of each FIMPInstance
+    # @param      priority    The priority of each HSDFG actor,
+    # the ready actor with the highest priority is scheduled first,
+    # critical_path_priority() if None
+    ##
+    # @return     dictionary object with the fields used by
+    # sylva.dse.dse.one_search
+    ##
+    def schedule(self, fimp_types, priority=None):
+        start, _ = self.decode(fimp_types, priority)
+        return self.get_result(fimp_types, start)
+
+    ##
+    # @brief      Get the first position of the actor order of one decoding
+    # which can change with another FIMP type selection and priorities
+    #
+    # The actors before this position are scheduled in the same order
+    # at the same time:
+    # an actor with another priority can change the order only when
+    # it is ready, and an actor with another computation phase
+    # can change only the start time of the later ones.
+    ##
+    # @param      self        The object
+    # @param      fimp_types  The FIMP type index of each FIMPInstance
+    # @param      priority    The priority of each HSDFG actor
+    # @param      decoding    (FIMP type tuple, priority tuple,
+    # actor order tuple) of the other decoding
+    ##
+    # @return     int
+    ##
+    def first_change(self, fimp_types, priority, decoding):
+
+        old_fimp_types, old_priority, order = decoding
+
+        position = [0] * len(self.actors)
+        for i, a in enumerate(order):
+            position[a] = i
+
+        result = len(order)
+        for f, actors in enumerate(self.fimp_actors):
+            if fimp_types[f] != old_fimp_types[f] and \
+                    self.fimp_matrix[f][fimp_types[f]].computation_phase != \
+                    self.fimp_matrix[f][old_fimp_types[f]].computation_phase:
+                result = min([result] + [position[a] for a in actors])
+        for a, p in enumerate(priority):
+            if p != old_priority[a]:
+                result = min(result, max(
+                    [position[s] + 1 for s in self.predecessors[a]],
+                    default=0))
+        return result
+
+    ##
+    # @brief      Get the start time of each HSDFG actor
+    # by priority list scheduling
+    #
+    # With the decodings of similar individuals, e.g. the parents in
+    # sylva.dse.genetic_engine.GeneticEngine, the actors before
+    # first_change() of the most similar one are placed in its order
+    # without the priority queue, and only the others are list scheduled.
+    # The result is the same as without them.
+    ##
+    # @param      self        The object
+    # @param      fimp_types  The FIMP type index of each FIMPInstance
+    # @param      priority    The priority of each HSDFG actor,
+    # critical_path_priority() if None
+    # @param      decodings   list of (FIMP type tuple, priority tuple,
+    # actor order tuple) of the similar individuals
+    ##
+    # @return     (start time list, actor order tuple)
+    ##
+    def decode(self, fimp_types, priority=None, decodings=()):
+
+        costs = [self.fimp_matrix[f][fimp_types[f]] for f in self.actor_fimps]
+        count = len(self.actors)
+
+        if priority is None:
+            priority = self.critical_path_priority(costs)
+
+        prefix = ()
+        for one_decoding in decodings:
+            first = self.first_change(fimp_types, priority, one_decoding)
+            if first > len(prefix):
+                prefix = one_decoding[2][:first]
+
+        start = [0] * count
+        ready_time = [0] * count
+        fimp_free = [0] * len(self.fimps)
+        waiting = [len(p) for p in self.predecessors]
+        placed = [False] * count
+        for a in prefix:
+            placed[a] = True
+
+        order = []
+        ready = [(-priority[a], a) for a in range(count)
+                 if not waiting[a] and not placed[a]]
+        heapq.heapify(ready)
+        while len(order) < len(prefix) or ready:
+            if len(order) < len(prefix):
+                a = prefix[len(order)]
+            else:
+                _, a = heapq.heappop(ready)
+            order.append(a)
+            f = self.actor_fimps[a]
+            start[a] = max(ready_time[a], fimp_free[f])
+            end = start[a] + costs[a].computation_phase - 1
+            fimp_free[f] = end + 1
+            for s in self.successors[a]:
+                ready_time[s] = max(ready_time[s], end + 1)
+                waiting[s] -= 1
+                if not waiting[s] and not placed[s]:
+                    heapq.heappush(ready, (-priority[s], s))
+
+        return start, tuple(order)
+
+    ##
+    # @brief      Get the result of one FIMP type selection and start times
+    #
+    # The actors whose output buffer usage overlaps the previous one
+    # on the same FIMPInstance get an extra buffer.
+    # The start times should meet the data and resource dependencies.
+    ##
+    # @param      self        The object
+    # @param      fimp_types  The FIMP type index of each FIMPInstance
+    # @param      start       The start time of each HSDFG actor
+    ##
+    # @return     dictionary object with the fields used by
+    # sylva.dse.dse.one_search
+    ##
+    def get_result(self, fimp_types, start):
+
+        costs = [self.fimp_matrix[f][fimp_types[f]] for f in self.actor_fimps]
+        count = len(self.actors)
+
+        start = list(start)
+        end = [start[a] + costs[a].computation_phase - 1 for a in range(count)]
+        input_end = [start[a] + costs[a].input_end_time for a in range(count)]
+        output_start = [start[a] + costs[a].output_start_time
+                        for a in range(count)]
+        buffer_end = [max([end[a]] + [input_end[s] for s in self.successors[a]])
+                      for a in range(count)]
+
+        extra_buffer = [0] * count
+        for actors in self.fimp_actors:
+            last_stop = None
+            for a in sorted(actors, key=lambda a: output_start[a]):
+                stop = max(buffer_end[a] + 1, output_start[a])
+                if last_stop is None or output_start[a] >= last_stop:
+                    last_stop = stop
+                else:
+                    extra_buffer[a] = 1
+
+        sample_interval = max(
+            max(max(end[a] for a in actors) - min(start[a] for a in actors),
+                max(buffer_end[a] for a in actors) -
+                min(output_start[a] for a in actors))
+            for actors in self.fimp_actors if actors)
+
+        return {
+            'branches': 0,
+            'fimps': len(self.fimps),
+            'area': sum(self.fimp_matrix[f][t].area
+                        for f, t in enumerate(fimp_types)),
+            'latency': max(end),
+            'energy': sum(c.energy for c in costs),
+            'sample_interval': sample_interval,
+            'start': start,
+            'end': end,
+            'input_end': input_end,
+            'output_start': output_start,
+            'buffer_end': buffer_end,
+            'extra_buffer': extra_buffer,
+            'fimp_types': list(fimp_types)}
+
+    ##
+    # @brief      Get the weighted objective value of one result
+    ##
+    # @param      self    The object
+    # @param      result  The result
+    ##
+    # @return     int
+    ##
+    def weighted_objective(self, result):
+        KA, KE, KT, KR = self.weights
+        return KA * result['area'] + KE * result['energy'] + \
+            KT * result['latency'] + KR * result['sample_interval']
+
+    ##
+    # @brief      Check if one result meets the constraints
+    ##
+    # @param      self    The object
+    # @param      result  The result
+    ##
+    # @return     True or False
+    ##
+    def is_feasible(self, result):
+        objective = self.weighted_objective(result)
+        return result['latency'] < self.max_latency and \
+            result['area'] < self.max_area and \
+            result['energy'] < self.max_energy and \
+            result['sample_interval'] < self.max_sample_interval and \
+            objective < self.upper_bound
+
+    ##
+    # @brief      Check if the only solution has been searched
+    ##
+    # @param      self  The object
+    ##
+    # @return     True or False
+    ##
+    def is_complete(self):
+        return self.done
+
+    ##
+    # @brief      Get the next solution
+    ##
+    # @param      self  The object
+    ##
+    # @return     dictionary object with the fields used by
+    # sylva.dse.dse.one_search, or None if the heuristic solution
+    # violates the constraints or has been returned
+    ##
+    def next_solution(self):
+        if self.done:
+            return None
+        self.done = True
+        start_time = time.time()
+        result = self.schedule(self.select_fimp_types())
+        result['search_time'] = time.time() - start_time
+        if self.is_feasible(result):
+            result['objective'] = self.weighted_objective(result)
+            return result
+        return None
@@ -0,0 +1,313 @@
+##
+# \package sylva.dse.modulo_engine
+#
+# Design Space Exploration (DSE) Engine based on modulo scheduling
+##
+# For throughput-bound designs, the iterations of the HSDFG overlap,
+# and a new iteration starts every initiation interval (II).
+# Each FIMPInstance has a reservation table of II time slots,
+# and one HSDFG actor computing from time t occupies the slots
+# t mod II to (t + computation phase - 1) mod II.
+# Within one iteration, each actor starts after its predecessors end,
+# and through an edge with delay d, it starts after its predecessor
+# of d iterations earlier ends.
+# The actors are placed by iterative modulo scheduling
+# (<https://doi.org/10.1145/192724.192731>, last checked 2026-10-19):
+# in the order of their critical path length, each actor gets the first
+# free time slot from its earliest start time,
+# or evicts the actors conflicting with it when there is none,
+# until all the actors are placed or the budget runs out.
+# The minimum II is found by binary search, between the resource bound
+# and the latency of the list schedule of one iteration,
+# which is always feasible.
+# The sample interval of the result is II - 1, comparable with
+# the other DSE engines, where it is the end time minus the start time
+# of the longest busy window of one FIMPInstance.
+##
+
+import heapq
+import time
+
+from sylva.dse.list_engine import ListSchedulingEngine
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Class for modulo scheduling DSE engine
+#
+# It can replace sylva.dse.dse_engine.DSEEngine in sylva.dse.one_search.
+# It gives the improving solutions of two FIMP type selections,
+# the greedy one of ListSchedulingEngine and the fastest one.
+##
+
+
+class ModuloSchedulingEngine(ListSchedulingEngine):
+
+    ##
+    # \var initiation_interval
+    # The target II, 0 for the minimum II.
+    ##
+    # \var budget_ratio
+    # The number of placements of iterative modulo scheduling
+    # per HSDFG actor.
+    ##
+    # \var in_edges
+    # The (predecessor, delay) pairs of each HSDFG actor,
+    # including the edges with delay.
+    ##
+    # \var out_edges
+    # The (successor, delay) pairs of each HSDFG actor.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self                 The object
+    # @param      hsdfg                The HSDFG object
+    # @param      fimp_library         The FIMPLibrary
+    # @param      fimp_instances       The list of FIMPInstance objects
+    # @param      time_limit           Not used, for the same interface as
+    # the other DSE engines
+    # @param      max_area             The maximum area
+    # @param      max_energy           The maximum energy
+    # @param      max_latency          The maximum latency
+    # @param      max_sample_interval  The maximum sample interval,
+    # i.e. the maximum II
+    # @param      KA                   Weight factor for area
+    # @param      KE                   Weight factor for energy
+    # @param      KT                   Weight factor for latency
+    # @param      KR                   Weight factor for sample interval
+    # @param      upper_bound          Only solutions with a weighted
+    # objective lower than this value are accepted, 0 for no bound
+    # @param      initiation_interval  \copydoc ModuloSchedulingEngine::initiation_interval
+    # @param      budget_ratio         \copydoc ModuloSchedulingEngine::budget_ratio
+    ##
+    def __init__(self, hsdfg, fimp_library, fimp_instances,
+                 time_limit=0,
+                 max_area=0, max_energy=0, max_latency=0,
+                 max_sample_interval=0,
+                 KA=0, KE=0, KT=0, KR=1, upper_bound=0,
+                 initiation_interval=0, budget_ratio=4):
+
+        super().__init__(hsdfg, fimp_library, fimp_instances, time_limit,
+                         max_area, max_energy, max_latency,
+                         max_sample_interval, KA, KE, KT, KR, upper_bound)
+
+        self.initiation_interval = initiation_interval
+        self.budget_ratio = budget_ratio
+
+        positions = {id(a): i for i, a in enumerate(self.actors)}
+        self.in_edges = [[] for _ in self.actors]
+        self.out_edges = [[] for _ in self.actors]
+        for e in hsdfg.edges:
+            src, dest = positions[id(e.src_actor)], positions[id(e.dest_actor)]
+            self.in_edges[dest].append((src, e.delay))
+            self.out_edges[src].append((dest, e.delay))
+
+        self.candidates = None
+        self.best_objective = None
+        self.placements = 0
+
+    ##
+    # @brief      Place the HSDFG actors modulo one II
+    ##
+    # @param      self        The object
+    # @param      fimp_types  The FIMP type index of each FIMPInstance
+    # @param      ii          The II
+    ##
+    # @return     The start time of each HSDFG actor,
+    # or None if no modulo schedule is found
+    ##
+    def modulo_schedule(self, fimp_types, ii):
+
+        costs = [self.fimp_matrix[f][fimp_types[f]] for f in self.actor_fimps]
+        phase = [c.computation_phase for c in costs]
+        count = len(self.actors)
+
+        for actors in self.fimp_actors:
+            if sum(phase[a] for a in actors) > ii:
+                return None
+        for a in range(count):
+            for p, delay in self.in_edges[a]:
+                if p == a and phase[a] > delay * ii:
+                    return None
+
+        priority = self.critical_path_priority(costs)
+        tables = [[None] * ii for _ in self.fimps]
+        start = [None] * count
+        last_start = [None] * count
+
+        def slots(a, t):
+            return [(t + i) % ii for i in range(phase[a])]
+
+        def remove(b):
+            table = tables[self.actor_fimps[b]]
+            for s in slots(b, start[b]):
+                table[s] = None
+            start[b] = None
+            heapq.heappush(unscheduled, (-priority[b], b))
+
+        unscheduled = [(-priority[a], a) for a in range(count)]
+        heapq.heapify(unscheduled)
+        budget = self.budget_ratio * count
+        while unscheduled:
+
+            if budget <= 0:
+                return None
+            budget -= 1
+            self.placements += 1
+
+            _, a = heapq.heappop(unscheduled)
+            table = tables[self.actor_fimps[a]]
+
+            earliest = max([start[p] + phase[p] - delay * ii
+                            for p, delay in self.in_edges[a]
+                            if p != a and start[p] is not None] + [0])
+
+            t = next((t for t in range(earliest, earliest + ii)
+                      if all(table[s] is None for s in slots(a, t))), None)
+            if t is None:
+                # no free slot, evict the conflicting actors
+                if last_start[a] is None or earliest > last_start[a]:
+                    t = earliest
+                else:
+                    t = last_start[a] + 1
+                for b in {table[s] for s in slots(a, t)} - {None}:
+                    remove(b)
+
+            for d, delay in self.out_edges[a]:
+                if d != a and start[d] is not None and \
+                        start[d] + delay * ii < t + phase[a]:
+                    remove(d)
+
+            start[a] = last_start[a] = t
+            for s in slots(a, t):
+                table[s] = a
+
+        return start
+
+    ##
+    # @brief      Get the result of one modulo schedule
+    #
+    # The output buffer usage of each actor also occupies its
+    # FIMPInstance modulo II, and the actors whose usage overlaps
+    # get an extra buffer.
+    ##
+    # @param      self        The object
+    # @param      fimp_types  The FIMP type index of each FIMPInstance
+    # @param      start       The start time of each HSDFG actor
+    # @param      ii          The II
+    ##
+    # @return     dictionary object with the fields used by
+    # sylva.dse.dse.one_search, and the II
+    ##
+    def get_modulo_result(self, fimp_types, start, ii):
+
+        result = self.get_result(fimp_types, start)
+
+        output_start = result['output_start']
+        buffer_end = result['buffer_end']
+        extra_buffer = [0] * len(self.actors)
+        for actors in self.fimp_actors:
+            used = [False] * ii
+            for a in sorted(actors, key=lambda a: output_start[a]):
+                stop = max(buffer_end[a] + 1, output_start[a])
+                usage = [t % ii for t in range(output_start[a], stop)]
+                if stop - output_start[a] > ii or any(used[s] for s in usage):
+                    extra_buffer[a] = 1
+                else:
+                    for s in usage:
+                        used[s] = True
+
+        result['extra_buffer'] = extra_buffer
+        result['sample_interval'] = ii - 1
+        result['initiation_interval'] = ii
+        result['branches'] = self.placements
+        return result
+
+    ##
+    # @brief      Search the minimum II of one FIMP type selection
+    ##
+    # @param      self        The object
+    # @param      fimp_types  The FIMP type index of each FIMPInstance
+    ##
+    # @return     The result of get_modulo_result(),
+    # or None if the target II has no modulo schedule
+    ##
+    def search(self, fimp_types):
+
+        if self.initiation_interval:
+            ii = self.initiation_interval
+            start = self.modulo_schedule(fimp_types, ii)
+            if start is None:
+                return None
+            return self.get_modulo_result(fimp_types, start, ii)
+
+        # the list schedule of one iteration never overlaps
+        # with the next iteration
+        one_iteration = self.schedule(fimp_types)
+        upper = max(one_iteration['buffer_end']) + 1
+        best = (upper, one_iteration['start'])
+
+        costs = [self.fimp_matrix[f][fimp_types[f]] for f in self.actor_fimps]
+        lower = max(sum(costs[a].computation_phase for a in actors)
+                    for actors in self.fimp_actors if actors)
+
+        while lower < best[0]:
+            ii = (lower + best[0]) // 2
+            start = self.modulo_schedule(fimp_types, ii)
+            if start is None:
+                lower = ii + 1
+            else:
+                best = (ii, start)
+
+        ii, start = best
+        return self.get_modulo_result(fimp_types, start, ii)
+
+    ##
+    # @brief      Check if all the FIMP type selections are searched
+    ##
+    # @param      self  The object
+    ##
+    # @return     True or False
+    ##
+    def is_complete(self):
+        return self.done
+
+    ##
+    # @brief      Get the next improving solution
+    ##
+    # @param      self  The object
+    ##
+    # @return     dictionary object with the fields used by
+    # sylva.dse.dse.one_search, or None if there is no more solution
+    ##
+    def next_solution(self):
+
+        if self.candidates is None:
+            fastest = [min(range(len(row)),
+                           key=lambda i: row[i].computation_phase)
+                       for row in self.fimp_matrix]
+            self.candidates = [self.select_fimp_types()]
+            if fastest != self.candidates[0]:
+                self.candidates.append(fastest)
+
+        while self.candidates:
+            start_time = time.time()
+            result = self.search(self.candidates.pop(0))
+            if result is None or not self.is_feasible(result):
+                continue
+            objective = self.weighted_objective(result)
+            if self.best_objective is not None and \
+                    objective >= self.best_objective:
+                continue
+            self.best_objective = objective
+            result['objective'] = objective
+            result['search_time'] = time.time() - start_time
+            return result
+
+        self.done = True
+        return None
@@ -0,0 +1,270 @@
+##
+# \package sylva.dse.pareto
+#
+# Pareto-front multi-objective Design Space Exploration
+##
+# Instead of one weighted objective, the non-dominated solutions
+# in area, energy, latency and sample interval are searched.
+# The area is explored by epsilon-constraint iteration:
+# each schedule is searched with the weighted objective of energy,
+# latency and sample interval, under an area bound
+# which is tightened to the area of the last best solution,
+# until there is no solution.
+# Every improving solution of the DSE engine is offered to
+# the ParetoArchive, so the intermediate solutions
+# on the other objectives are kept as well.
+##
+
+import bisect
+import collections
+import sys
+import time
+
+from sylva.base.sylva_base import SYLVABase
+from sylva.dse.dse import one_search, some_schedules, ranked_schedules, \
+    create_dse_engine, annotate_solution
+from sylva.dse.dse_engine import assign_fimps
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Get the objective values of one solution
+##
+# @param      solution  The Solution object
+##
+# @return     (area, energy, latency, sample interval)
+##
+def solution_objectives(solution):
+    return (solution.area, solution.energy,
+            solution.latency, solution.sample_interval)
+
+
+##
+# @brief      Check if one objective tuple dominates the other one
+##
+# @param      a     The objective tuple
+# @param      b     The other objective tuple
+##
+# @return     True if `a` is not worse than `b` in all the objectives
+##
+def dominates(a, b):
+    return all(x <= y for x, y in zip(a, b))
+
+
+##
+# @brief      Class for the archive of non-dominated solutions
+#
+# The objective tuples are kept in lexicographic order.
+# A tuple can only be dominated by the tuples before it
+# and can only dominate the tuples after it,
+# so each dominance check scans one side of a binary search.
+# Solutions with the same objective tuple as an archived one
+# are not added.
+##
+
+
+class ParetoArchive(SYLVABase):
+
+    ##
+    # \var points
+    # The sorted objective tuples of the archived solutions.
+    ##
+    # \var solutions
+    # The archived Solution objects, in the order of `points`.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self  The object
+    ##
+    def __init__(self):
+        self.points = []
+        self.solutions = []
+
+    ##
+    # @brief      Check if one objective tuple is dominated by the archive
+    ##
+    # @param      self  The object
+    # @param      key   The objective tuple
+    ##
+    # @return     True or False
+    ##
+    def is_dominated(self, key):
+        end = bisect.bisect_right(self.points, key)
+        return any(dominates(k, key) for k in self.points[:end])
+
+    ##
+    # @brief      Add one solution if it is not dominated
+    #
+    # The archived solutions dominated by it are removed.
+    ##
+    # @param      self      The object
+    # @param      solution  The Solution object
+    ##
+    # @return     True if the solution is added
+    ##
+    def add(self, solution):
+        key = solution_objectives(solution)
+        if self.is_dominated(key):
+            return False
+
+        start = bisect.bisect_left(self.points, key)
+        kept = [i for i in range(start, len(self.points))
+                if not dominates(key, self.points[i])]
+        self.points[start:] = [key] + [self.points[i] for i in kept]
+        self.solutions[start:] = [solution] + \
+            [self.solutions[i] for i in kept]
+        return True
+
+
+##
+# @brief      Class for Pareto-front exploration of one design
+#
+# The exploration is incremental:
+# refine() can be called again with a new time budget,
+# and it continues with the pending epsilon-constraint steps.
+##
+
+
+class ParetoExplorer(SYLVABase):
+
+    ##
+    # \var design
+    # The design specification.
+    ##
+    # \var option
+    # The solver option,
+    # `option.dse_engine` must support the max_area constraint.
+    ##
+    # \var hsdfg
+    # The HSDFG of `design.system.sdfg`.
+    ##
+    # \var schedules
+    # The schedules to search.
+    ##
+    # \var archive
+    # The ParetoArchive of all the schedules.
+    ##
+    # \var pending
+    # The epsilon-constraint steps to search,
+    # a deque of (schedule index, area bound).
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self    The object
+    # @param      design  \copydoc ParetoExplorer::design
+    # @param      option  \copydoc ParetoExplorer::option
+    ##
+    def __init__(self, design, option):
+
+        self.design = design
+        self.option = option
+        self.hsdfg = design.system.sdfg.get_hsdf()
+        self.schedules = some_schedules(
+            ranked_schedules(design, self.hsdfg), option.effort)
+        self.archive = ParetoArchive()
+
+        amax = design.system.constraint.amax
+        self.pending = collections.deque(
+            (i, amax) for i in range(len(self.schedules)))
+
+        k = design.system.optimization_objective
+        self.weights = {'KA': 0, 'KE': k.ke, 'KT': k.kt, 'KR': k.kr}
+        if not (k.ke or k.kt or k.kr):
+            self.weights['KT'] = 1
+
+    ##
+    # @brief      Check if all the epsilon-constraint steps are searched
+    ##
+    # @param      self  The object
+    ##
+    # @return     True or False
+    ##
+    @property
+    def done(self):
+        return not self.pending
+
+    ##
+    # @brief      Search one epsilon-constraint step
+    ##
+    # @param      self            The object
+    # @param      schedule_index  The schedule index
+    # @param      max_area        The area bound
+    # @param      time_limit      The time limit in ms, 0 for no limit
+    ##
+    # @return     (the last solution or None if there is no solution,
+    # True if the search was not stopped by the time limit)
+    ##
+    def search_step(self, schedule_index, max_area, time_limit=0):
+
+        schedule = self.schedules[schedule_index]
+        fimps = assign_fimps(self.design.system.sdfg, schedule)
+        dse = create_dse_engine(self.design, self.option, self.hsdfg, fimps,
+                                time_limit=time_limit, max_area=max_area,
+                                **self.weights)
+
+        last = None
+        while True:
+            solution = one_search(dse)
+            if solution is None:
+                return last, dse.is_complete()
+            annotate_solution(solution, schedule_index, schedule, fimps)
+            self.archive.add(solution)
+            last = solution
+
+    ##
+    # @brief      Refine the Pareto front within one time budget
+    #
+    # The schedules are visited in turn, so the front of each schedule
+    # is refined evenly when the time budget runs out.
+    # The step stopped by the time budget is searched again
+    # by the next refine().
+    ##
+    # @param      self        The object
+    # @param      time_limit  The time budget in ms, 0 for no limit
+    ##
+    # @return     The non-dominated Solution objects found so far
+    ##
+    def refine(self, time_limit=0):
+
+        start_time = time.time()
+        while self.pending:
+            engine_time_limit = self.option.time_limit
+            budget_limited = False
+            if time_limit:
+                remaining = time_limit - (time.time() - start_time) * 1000
+                if remaining <= 0:
+                    break
+                budget_limited = remaining < (engine_time_limit or sys.maxsize)
+                engine_time_limit = int(min(engine_time_limit or sys.maxsize,
+                                            max(remaining, 1)))
+
+            schedule_index, max_area = self.pending.popleft()
+            solution, complete = self.search_step(schedule_index, max_area,
+                                                  engine_time_limit)
+            if not complete and budget_limited:
+                self.pending.appendleft((schedule_index, max_area))
+                break
+            if solution is not None:
+                self.pending.append((schedule_index, solution.area))
+
+        return list(self.archive.solutions)
+
+
+##
+# @brief      Search the Pareto front of one design
+##
+# @param      design      The design specification
+# @param      option      The solver option
+# @param      time_limit  The time budget in ms, 0 for no limit
+##
+# @return     The non-dominated Solution objects of all the schedules
+##
+def search_pareto(design, option, time_limit=0):
+    return ParetoExplorer(design, option).refine(time_limit)
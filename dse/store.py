@@ -0,0 +1,397 @@
+##
+# \package sylva.dse.store
+#
+# SQLite database of DSE solutions with indexed queries
+##
+# The solutions of many searches can be kept in one SQLite file
+# and queried without loading all of them.
+# The `solutions` table has one row per Solution object,
+# with the metrics in indexed columns and the other scalar fields,
+# e.g. schedule, fimp_instances and telemetry, as one JSON column.
+# The `actor_arrays` table has the per-actor schedule arrays,
+# e.g. start and end, as little-endian int64 blobs,
+# one row per array of one solution,
+# and they are only read for the solutions given by one query.
+##
+
+import json
+import sqlite3
+
+import numpy
+
+from sylva.base.sylva_base import SYLVABase
+from sylva.dse.dse import Solution
+from sylva.dse.pareto import ParetoArchive
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# The Solution fields stored as int64 blobs.
+##
+ARRAY_FIELDS = ['start', 'end', 'input_end', 'output_start', 'buffer_end',
+                'extra_buffer', 'fimp_types']
+
+##
+# The Solution fields stored as indexed columns.
+##
+METRIC_FIELDS = ['area', 'energy', 'latency', 'sample_interval']
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS solutions (
+    id INTEGER PRIMARY KEY,
+    schedule_index INTEGER,
+    solution_index INTEGER,
+    search_time REAL,
+    branches INTEGER,
+    fimps INTEGER,
+    area INTEGER,
+    energy INTEGER,
+    latency INTEGER,
+    sample_interval INTEGER,
+    fields TEXT,
+    UNIQUE (schedule_index, solution_index));
+CREATE TABLE IF NOT EXISTS actor_arrays (
+    solution_id INTEGER REFERENCES solutions (id) ON DELETE CASCADE,
+    name TEXT,
+    data BLOB,
+    PRIMARY KEY (solution_id, name));
+CREATE INDEX IF NOT EXISTS solutions_area ON solutions (area);
+CREATE INDEX IF NOT EXISTS solutions_energy ON solutions (energy);
+CREATE INDEX IF NOT EXISTS solutions_latency ON solutions (latency);
+CREATE INDEX IF NOT EXISTS solutions_sample_interval
+    ON solutions (sample_interval);
+'''
+
+_COLUMNS = ['id', 'schedule_index', 'solution_index', 'search_time',
+            'branches', 'fimps'] + METRIC_FIELDS + ['fields']
+
+
+##
+# @brief      Get the rows of one solution for the two tables
+##
+# @param      solution        The Solution object
+# @param      schedule_index  The schedule index
+# @param      solution_index  The solution index in the schedule
+##
+# @return     (solutions row without id, list of (name, blob))
+##
+def _solution_rows(solution, schedule_index, solution_index):
+    fields = {k: v for k, v in dict(solution).items()
+              if k not in _COLUMNS + ARRAY_FIELDS + ['solution_id']}
+    row = (schedule_index, solution_index,
+           float(solution.search_time), int(solution.branches),
+           int(solution.fimps)) + \
+        tuple(int(solution[k]) for k in METRIC_FIELDS) + \
+        (json.dumps(fields, default=int),)
+    arrays = [(k, numpy.asarray(solution[k], dtype='<i8').tobytes())
+              for k in ARRAY_FIELDS if solution[k] is not None]
+    return row, arrays
+
+
+##
+# @brief      Class for the SQLite database of DSE solutions
+#
+# All the constraints of the queries are strict and 0 means no limit,
+# as the constraints of the DSE engines.
+##
+# Example:
+#
+#     with SolutionStore('solutions.db') as store:
+#         store.add_results(search_all(design, option)[0])
+#         best = store.top_k(10, ka=1, kt=1, max_energy=100)
+##
+
+
+class SolutionStore(SYLVABase):
+
+    ##
+    # \var file_name
+    # The SQLite database file name, ':memory:' for an in-memory database.
+    ##
+    # \var connection
+    # The sqlite3.Connection object.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self       The object
+    # @param      file_name  \copydoc SolutionStore::file_name
+    ##
+    def __init__(self, file_name=':memory:'):
+        self.file_name = file_name
+        self.connection = sqlite3.connect(file_name)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(_SCHEMA)
+
+    ##
+    # @brief      Insert the rows of some solutions
+    ##
+    # @param      self     The object
+    # @param      entries  list of (Solution object, schedule index,
+    # solution index)
+    ##
+    # @return     The ids of the solutions
+    ##
+    def insert(self, entries):
+        result = []
+        cursor = self.connection.cursor()
+        for solution, schedule_index, solution_index in entries:
+            row, arrays = _solution_rows(solution, schedule_index,
+                                         solution_index)
+            cursor.execute(
+                'INSERT INTO solutions (%s) VALUES (%s)'
+                % (', '.join(_COLUMNS[1:]), ', '.join('?' * len(row))), row)
+            result.append(cursor.lastrowid)
+            cursor.executemany(
+                'INSERT INTO actor_arrays VALUES (?, ?, ?)',
+                [(cursor.lastrowid, k, v) for k, v in arrays])
+        return result
+
+    ##
+    # @brief      Add one solution
+    #
+    # It is the last solution of its schedule.
+    ##
+    # @param      self            The object
+    # @param      solution        The Solution object
+    # @param      schedule_index  The schedule index,
+    # `solution.schedule_index` if None
+    ##
+    # @return     The id of the solution
+    ##
+    def add(self, solution, schedule_index=None):
+        if schedule_index is None:
+            schedule_index = solution.schedule_index
+        with self.connection:
+            solution_index = self.connection.execute(
+                'SELECT COALESCE(MAX(solution_index) + 1, 0) FROM solutions '
+                'WHERE schedule_index IS ?', (schedule_index,)).fetchone()[0]
+            return self.insert([(solution, schedule_index,
+                                 solution_index)])[0]
+
+    ##
+    # @brief      Add the solutions of one search result
+    #
+    # The stored solutions of the same schedules are replaced.
+    ##
+    # @param      self           The object
+    # @param      search_result  list of Solution lists, one list per schedule
+    ##
+    # @return     The ids of the solutions
+    ##
+    def add_results(self, search_result):
+        entries = []
+        schedules = set(range(len(search_result)))
+        for i, one_schedule_result in enumerate(search_result):
+            for j, one_solution in enumerate(one_schedule_result):
+                schedule_index = one_solution.schedule_index
+                if schedule_index is None:
+                    schedule_index = i
+                schedules.add(schedule_index)
+                entries.append((one_solution, schedule_index, j))
+        with self.connection:
+            self.connection.executemany(
+                'DELETE FROM solutions WHERE schedule_index IS ?',
+                [(s,) for s in schedules])
+            return self.insert(entries)
+
+    ##
+    # @brief      Get the number of stored solutions
+    ##
+    # @param      self  The object
+    ##
+    # @return     int
+    ##
+    def count_solutions(self):
+        return self.connection.execute(
+            'SELECT COUNT(*) FROM solutions').fetchone()[0]
+
+    ##
+    # @brief      Load the Solution objects of some rows
+    ##
+    # @param      self    The object
+    # @param      rows    The rows of the solutions table
+    # @param      arrays  Load the per-actor schedule arrays
+    ##
+    # @return     list of Solution objects, with their `solution_id`
+    ##
+    def load_solutions(self, rows, arrays=True):
+        result = []
+        for row in rows:
+            fields = json.loads(row[-1])
+            fields.update(zip(_COLUMNS[1:-1], row[1:-1]))
+            fields['solution_id'] = row[0]
+            result.append(Solution.load_from_dict(fields))
+        if arrays:
+            self.load_arrays(result)
+        return result
+
+    ##
+    # @brief      Load the per-actor schedule arrays of some solutions
+    ##
+    # @param      self       The object
+    # @param      solutions  The Solution objects from load_solutions()
+    ##
+    def load_arrays(self, solutions):
+        positions = {s.solution_id: i for i, s in enumerate(solutions)}
+        ids = list(positions)
+        # not more than the default SQLite variable limit per query
+        for k in range(0, len(ids), 900):
+            chunk = ids[k:k + 900]
+            for solution_id, name, data in self.connection.execute(
+                    'SELECT solution_id, name, data FROM actor_arrays '
+                    'WHERE solution_id IN (%s)' % ', '.join('?' * len(chunk)),
+                    chunk):
+                solutions[positions[solution_id]][name] = \
+                    numpy.frombuffer(data, dtype='<i8').tolist()
+
+    ##
+    # @brief      Query the solutions
+    ##
+    # @param      self                 The object
+    # @param      max_area             The maximum area
+    # @param      max_energy           The maximum energy
+    # @param      max_latency          The maximum latency
+    # @param      max_sample_interval  The maximum sample interval
+    # @param      order_by             The SQL expressions to sort
+    # the solutions, before the storage order
+    # @param      limit                The maximum number of solutions,
+    # 0 for no limit
+    # @param      arrays               Load the per-actor schedule arrays
+    ##
+    # @return     list of Solution objects
+    ##
+    def select(self, max_area=0, max_energy=0, max_latency=0,
+               max_sample_interval=0, order_by=[], limit=0, arrays=True):
+
+        conditions = []
+        parameters = []
+        for k, maximum in zip(METRIC_FIELDS, [max_area, max_energy,
+                                              max_latency,
+                                              max_sample_interval]):
+            if maximum:
+                conditions.append(f'{k} < ?')
+                parameters.append(int(maximum))
+
+        query = 'SELECT %s FROM solutions' % ', '.join(_COLUMNS)
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY %s' % ', '.join(list(order_by) + ['id'])
+        if limit:
+            query += ' LIMIT %d' % limit
+
+        return self.load_solutions(self.connection.execute(query, parameters),
+                                   arrays)
+
+    ##
+    # @brief      Get the solutions meeting the constraints
+    ##
+    # @param      self         The object
+    # @param      arrays       Load the per-actor schedule arrays
+    # @param      constraints  The constraints of select()
+    ##
+    # @return     list of Solution objects, in the storage order
+    ##
+    def filter_constraints(self, arrays=True, **constraints):
+        return self.select(arrays=arrays, **constraints)
+
+    ##
+    # @brief      Get the best solutions by one weighted objective
+    #
+    # The solutions with the same objective value are in the storage order.
+    ##
+    # @param      self         The object
+    # @param      k            The number of solutions
+    # @param      ka           Weight factor for area
+    # @param      ke           Weight factor for energy
+    # @param      kt           Weight factor for latency
+    # @param      kr           Weight factor for sample interval
+    # @param      arrays       Load the per-actor schedule arrays
+    # @param      constraints  The constraints of select()
+    ##
+    # @return     list of Solution objects, the best first
+    ##
+    def top_k(self, k, ka=0, ke=0, kt=0, kr=0, arrays=True, **constraints):
+        terms = [name if w == 1 else f'{int(w)} * {name}'
+                 for name, w in zip(METRIC_FIELDS, [ka, ke, kt, kr]) if w]
+        return self.select(order_by=[' + '.join(terms)] if terms else [],
+                           limit=k, arrays=arrays, **constraints)
+
+    ##
+    # @brief      Get the non-dominated solutions
+    #
+    # The metrics are read in lexicographic order of
+    # (area, energy, latency, sample interval)
+    # and filtered by sylva.dse.pareto.ParetoArchive,
+    # then only the arrays of the non-dominated solutions are read.
+    ##
+    # @param      self         The object
+    # @param      arrays       Load the per-actor schedule arrays
+    # @param      constraints  The constraints of select()
+    ##
+    # @return     list of Solution objects, in lexicographic order
+    # of their objective tuples
+    ##
+    def pareto_front(self, arrays=True, **constraints):
+
+        archive = ParetoArchive()
+        for one_solution in self.select(order_by=METRIC_FIELDS, arrays=False,
+                                        **constraints):
+            archive.add(one_solution)
+
+        if arrays:
+            self.load_arrays(archive.solutions)
+        return archive.solutions
+
+    ##
+    # @brief      Get one solution of one schedule
+    ##
+    # @param      self            The object
+    # @param      schedule_index  The schedule index
+    # @param      solution_index  The solution index in the schedule,
+    # negative from the last one
+    ##
+    # @return     The Solution object, or None if it does not exist
+    ##
+    def find_solution(self, schedule_index, solution_index=-1):
+        order = 'ASC' if solution_index >= 0 else 'DESC'
+        offset = solution_index if solution_index >= 0 \
+            else -solution_index - 1
+        result = self.load_solutions(self.connection.execute(
+            'SELECT %s FROM solutions WHERE schedule_index IS ? '
+            'ORDER BY solution_index %s LIMIT 1 OFFSET ?'
+            % (', '.join(_COLUMNS), order), (schedule_index, offset)))
+        return result[0] if result else None
+
+    ##
+    # @brief      Get the last solution of each schedule
+    ##
+    # @param      self    The object
+    # @param      arrays  Load the per-actor schedule arrays
+    ##
+    # @return     list of Solution objects, in the schedule order
+    ##
+    def last_solutions(self, arrays=True):
+        return self.load_solutions(self.connection.execute(
+            'SELECT %s FROM solutions AS s WHERE solution_index = '
+            '(SELECT MAX(solution_index) FROM solutions '
+            'WHERE schedule_index IS s.schedule_index) '
+            'ORDER BY schedule_index' % ', '.join(_COLUMNS)), arrays)
+
+    ##
+    # @brief      Close the database
+    ##
+    # @param      self  The object
+    ##
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
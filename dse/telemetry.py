@@ -0,0 +1,366 @@
+##
+# \package sylva.dse.telemetry
+#
+# Telemetry of the DSE engines, one record per solution
+##
+# sylva.dse.dse.one_search() gives each Solution object a TelemetryRecord
+# in its `telemetry` field, with the wall time of its `next_solution()`,
+# the search time, branches and failures reported by the DSE engine,
+# the peak memory, the weighted objective value and its lower bound.
+# The records of one schedule, in the order of the solutions,
+# are the objective trajectory of its search.
+# The records can be written to a JSONL trace file, one record per line,
+# and summarized by the `telemetry` command of the SYLVA shell.
+##
+
+import json
+import sys
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+from sylva.base.sylva_base import SYLVABase
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Get the peak memory usage of this process
+#
+# The DSE engines run in the process calling them,
+# so it includes the memory of the solvers.
+##
+# @return     The peak resident set size in bytes, or None if unknown
+##
+def peak_memory():
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # in bytes on macOS and in kilobytes on the others
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+##
+# @brief      Get the relative gap between one objective value
+# and its lower bound
+#
+# It is the same as the relative gap of CP-SAT.
+##
+# @param      objective  The objective value, or None
+# @param      bound      The lower bound, or None
+##
+# @return     float, or None if any of them is None
+##
+def relative_gap(objective, bound):
+    if objective is None or bound is None:
+        return None
+    return abs(objective - bound) / max(1, abs(objective))
+
+
+##
+# @brief      Class for the telemetry of one solution
+##
+
+
+class TelemetryRecord(SYLVABase):
+
+    ##
+    # \var wall_time
+    # The time of the `next_solution()` giving the solution in seconds.
+    ##
+    # \var search_time
+    # The search time reported by the DSE engine in seconds.
+    ##
+    # \var branches
+    # The number of branches reported by the DSE engine.
+    ##
+    # \var failures
+    # The number of failures (conflicts for CP-SAT),
+    # None if the DSE engine does not report it.
+    ##
+    # \var memory
+    # The peak memory in bytes, None if unknown.
+    ##
+    # \var objective
+    # The weighted objective value, None if the DSE engine
+    # does not report it.
+    ##
+    # \var objective_bound
+    # The lower bound of the weighted objective value,
+    # None if the DSE engine does not report it.
+    ##
+    # \var gap
+    # The relative gap between `objective` and `objective_bound`,
+    # see relative_gap().
+    ##
+    # \var schedule_index
+    # The schedule index, None if unknown.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self             The object
+    # @param      wall_time        \copydoc TelemetryRecord::wall_time
+    # @param      search_time      \copydoc TelemetryRecord::search_time
+    # @param      branches         \copydoc TelemetryRecord::branches
+    # @param      failures         \copydoc TelemetryRecord::failures
+    # @param      memory           \copydoc TelemetryRecord::memory
+    # @param      objective        \copydoc TelemetryRecord::objective
+    # @param      objective_bound  \copydoc TelemetryRecord::objective_bound
+    # @param      schedule_index   \copydoc TelemetryRecord::schedule_index
+    ##
+    def __init__(self, wall_time=0, search_time=0, branches=0,
+                 failures=None, memory=None, objective=None,
+                 objective_bound=None, schedule_index=None):
+        self.wall_time = wall_time
+        self.search_time = search_time
+        self.branches = branches
+        self.failures = failures
+        self.memory = memory
+        self.objective = objective
+        self.objective_bound = objective_bound
+        self.gap = relative_gap(objective, objective_bound)
+        self.schedule_index = schedule_index
+
+    ##
+    # @brief      Create the record of one result of `next_solution()`
+    #
+    # The telemetry fields only used by the record, i.e. failures,
+    # memory, objective and objective_bound, are removed from the result.
+    ##
+    # @param      cls        The cls
+    # @param      result     dictionary object with the fields used by
+    # sylva.dse.dse.one_search
+    # @param      wall_time  \copydoc TelemetryRecord::wall_time
+    ##
+    # @return     TelemetryRecord object
+    ##
+    @classmethod
+    def create(cls, result, wall_time):
+        memory = result.pop('memory', None)
+        return cls(wall_time=wall_time,
+                   search_time=result.get('search_time', wall_time),
+                   branches=result.get('branches', 0),
+                   failures=result.pop('failures', None),
+                   memory=peak_memory() if memory is None else memory,
+                   objective=result.pop('objective', None),
+                   objective_bound=result.pop('objective_bound', None))
+
+    ##
+    # @brief      Loads a TelemetryRecord object from dictionary
+    ##
+    # @param      cls       The cls
+    # @param      dict_obj  The dictionary object
+    ##
+    # @return     Loaded object
+    ##
+    @classmethod
+    def load_from_dict(cls, dict_obj):
+        return cls(**{k: v for k, v in dict_obj.items() if k != 'gap'})
+
+
+##
+# @brief      Class for writing the telemetry of solutions to a JSONL file
+#
+# Each line is the TelemetryRecord of one solution.
+# Solutions without telemetry are skipped.
+# The file is flushed after each solution,
+# so it can be read while the search goes on.
+##
+
+
+class TraceWriter(SYLVABase):
+
+    ##
+    # \var fp
+    # The file object.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self       The object
+    # @param      file_name  The file name
+    ##
+    def __init__(self, file_name):
+        self.fp = open(file_name, 'w')
+
+    ##
+    # @brief      Write the telemetry of one solution
+    ##
+    # @param      self      The object
+    # @param      solution  The Solution object
+    ##
+    def write(self, solution):
+        if solution.telemetry is None:
+            return
+        self.fp.write(json.dumps(dict(solution.telemetry)) + '\n')
+        self.fp.flush()
+
+    ##
+    # @brief      Close the file
+    ##
+    # @param      self  The object
+    ##
+    def close(self):
+        self.fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+##
+# @brief      Write the telemetry of one search result to a JSONL file
+##
+# @param      search_result  list of Solution lists, one list per schedule
+# @param      file_name      The file name
+##
+def write_trace(search_result, file_name):
+    with TraceWriter(file_name) as writer:
+        for one_schedule_result in search_result:
+            for one_solution in one_schedule_result:
+                writer.write(one_solution)
+
+
+##
+# @brief      Load the records of one JSONL trace file
+##
+# @param      file_name  The file name
+##
+# @return     list of TelemetryRecord objects
+##
+def load_trace(file_name):
+    with open(file_name) as fp:
+        return [TelemetryRecord.load_from_dict(json.loads(line))
+                for line in fp if line.strip()]
+
+
+##
+# @brief      Get the records of one search result
+##
+# @param      search_result  list of Solution lists, one list per schedule
+##
+# @return     list of TelemetryRecord objects
+##
+def search_result_records(search_result):
+    return [TelemetryRecord.load_from_dict(one_solution.telemetry)
+            for one_schedule_result in search_result
+            for one_solution in one_schedule_result
+            if one_solution.telemetry is not None]
+
+
+##
+# @brief      Class for the summary of telemetry records
+##
+
+
+class TelemetrySummary(SYLVABase):
+
+    ##
+    # \var records
+    # List of TelemetryRecord objects.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self     The object
+    # @param      records  \copydoc TelemetrySummary::records
+    ##
+    def __init__(self, records=[]):
+        self.records = list(records)
+
+    ##
+    # @brief      Get the objective trajectory of each schedule
+    ##
+    # @param      self  The object
+    ##
+    # @return     dictionary object of TelemetryRecord lists
+    # by schedule index, in the order of the records
+    ##
+    def get_trajectories(self):
+        result = {}
+        for r in self.records:
+            result.setdefault(r.schedule_index, []).append(r)
+        return result
+
+    ##
+    # \var trajectories
+    # \copybrief TelemetrySummary::get_trajectories()
+    ##
+    trajectories = property(get_trajectories)
+
+    ##
+    # @brief      Get the best record
+    ##
+    # @param      self  The object
+    ##
+    # @return     The TelemetryRecord object with the lowest objective value,
+    # or None if no record has one
+    ##
+    def get_best_record(self):
+        return min((r for r in self.records if r.objective is not None),
+                   key=lambda r: r.objective, default=None)
+
+    ##
+    # \var best_record
+    # \copybrief TelemetrySummary::get_best_record()
+    ##
+    best_record = property(get_best_record)
+
+    ##
+    # @brief      Get the summary as text lines, for the SYLVA shell
+    ##
+    # @param      self  The object
+    ##
+    # @return     list of str
+    ##
+    def get_lines(self):
+
+        trajectories = self.trajectories
+        result = [f'Telemetry: {len(self.records)} solution(s) of '
+                  f'{len(trajectories)} schedule(s).']
+        if not self.records:
+            return result
+
+        failures = [r.failures for r in self.records
+                    if r.failures is not None]
+        memory = [r.memory for r in self.records if r.memory is not None]
+        result.append(
+            'Wall time {:.3f} s, branches {}, failures {}, '
+            'peak memory {}.'.format(
+                sum(r.wall_time for r in self.records),
+                sum(r.branches for r in self.records),
+                sum(failures) if failures else 'n/a',
+                '{:.1f} MB'.format(max(memory) / 2 ** 20)
+                if memory else 'n/a'))
+
+        best = self.best_record
+        if best is not None:
+            result.append('Best objective {} in schedule {}, gap {}.'.format(
+                best.objective, best.schedule_index, _format_gap(best.gap)))
+
+        for schedule_index, records in trajectories.items():
+            result.append('Schedule {}: objective {}, gap {}, '
+                          'search time {:.3f} s.'.format(
+                              schedule_index,
+                              ' -> '.join(str(r.objective) for r in records),
+                              _format_gap(records[-1].gap),
+                              records[-1].search_time))
+        return result
+
+    def __str__(self):
+        return '\n'.join(self.get_lines())
+
+
+def _format_gap(gap):
+    return 'n/a' if gap is None else '{:.2%}'.format(gap)
@@ -0,0 +1,203 @@
+##
+# \package sylva.dse.timing
+#
+# ASAP/ALAP timing analysis of one HSDFG before the CP search
+##
+# The earliest start time (ASAP) of each HSDFG actor is its longest
+# path from the sources of the HSDFG, with the fastest FIMP
+# of every actor on the path.
+# The latest start time (ALAP) is the deadline minus the longest path
+# to the sinks of the HSDFG, also with the fastest FIMPs.
+# Every feasible schedule starts each actor between the two,
+# so they are used as the domains of the start time variables
+# of sylva.dse.dse_engine.DSEEngine and
+# sylva.dse.cpsat_engine.CPSATEngine.
+# Without latency constraint, the deadline is the sequential execution
+# of all the actors with the slowest FIMPs.
+##
+
+from sylva.base.sylva_base import SYLVABase
+
+__author__ = 'Shuo Li <contact@shuol.li>'
+__version__ = '2026-10-19'
+__license__ = 'https://opensource.org/licenses/MIT'
+
+
+##
+# @brief      Class for the timing analysis of one HSDFG
+#
+# The actors are identified by their positions in `hsdfg.actors`.
+# Only the edges without delay are data dependencies.
+##
+
+
+class TimingAnalysis(SYLVABase):
+
+    ##
+    # \var hsdfg
+    # The HSDFG object.
+    ##
+    # \var fastest
+    # The shortest computation phase of each actor.
+    ##
+    # \var slowest
+    # The longest computation phase of each actor.
+    ##
+    # \var deadline
+    # All actors end before the deadline.
+    ##
+    # \var asap
+    # The earliest start time of each actor.
+    ##
+    # \var alap
+    # The latest start time of each actor to meet the deadline.
+    ##
+    # \var latency_bound
+    # The lower bound of the latency,
+    # the critical path length with the fastest FIMPs minus one,
+    # as the latency is the end time of the last actor.
+    ##
+    # \var slack
+    # The time each actor can be delayed without
+    # making the critical path longer.
+    ##
+    # \var critical_path
+    # The actor positions on one critical path, in execution order.
+    ##
+
+    ##
+    # @brief      Constructs the object.
+    ##
+    # @param      self            The object
+    # @param      hsdfg           \copydoc TimingAnalysis::hsdfg
+    # @param      fimp_library    The FIMPLibrary
+    # @param      fimp_instances  The list of FIMPInstance objects,
+    # which have all the HSDFG actors
+    # @param      max_latency     The maximum latency, 0 for no limit
+    ##
+    def __init__(self, hsdfg, fimp_library, fimp_instances, max_latency=0):
+
+        self.hsdfg = hsdfg
+
+        count = len(hsdfg.actors)
+        positions = {id(a): i for i, a in enumerate(hsdfg.actors)}
+
+        self.fastest = [None] * count
+        self.slowest = [None] * count
+        for one_fimp in fimp_instances:
+            phases = [c.computation_phase for c in
+                      fimp_library.get_fimp_costs(one_fimp.function_name)]
+            for one_actor in one_fimp.actors:
+                a = positions[id(one_actor)]
+                self.fastest[a] = min(phases)
+                self.slowest[a] = max(phases)
+        for a, phase in enumerate(self.fastest):
+            if phase is None:
+                one_actor = hsdfg.actors[a]
+                raise ValueError(f'no FIMPInstance for actor '
+                                 f'{one_actor.name}_{one_actor.index}.')
+
+        self.successors = [[] for _ in range(count)]
+        self.predecessors = [[] for _ in range(count)]
+        for e in hsdfg.edges:
+            if not e.delay:
+                src, dest = positions[id(e.src_actor)], positions[id(e.dest_actor)]
+                self.successors[src].append(dest)
+                self.predecessors[dest].append(src)
+
+        order = self.topological_order()
+
+        self.asap = [0] * count
+        for a in order:
+            for s in self.successors[a]:
+                self.asap[s] = max(self.asap[s], self.asap[a] + self.fastest[a])
+
+        # the longest path to the sinks, with the actor itself
+        tail = [0] * count
+        for a in reversed(order):
+            tail[a] = self.fastest[a] + max(
+                [tail[s] for s in self.successors[a]], default=0)
+
+        critical_length = max(tail, default=0)
+        self.latency_bound = critical_length - 1
+
+        if max_latency > 0:
+            self.deadline = max_latency
+        else:
+            self.deadline = sum(self.slowest)
+
+        self.alap = [self.deadline - t for t in tail]
+        self.slack = [critical_length - t - s
+                      for t, s in zip(tail, self.asap)]
+
+        self.critical_path = []
+        current = [a for a in range(count)
+                   if not self.predecessors[a] and not self.slack[a]]
+        while current:
+            a = current[0]
+            self.critical_path.append(a)
+            current = [s for s in self.successors[a]
+                       if not self.slack[s] and
+                       self.asap[s] == self.asap[a] + self.fastest[a]]
+
+    ##
+    # @brief      Get the topological order of the actors
+    ##
+    # @param      self  The object
+    ##
+    # @return     list of actor positions
+    ##
+    def topological_order(self):
+        in_degrees = [len(p) for p in self.predecessors]
+        result = [a for a, d in enumerate(in_degrees) if d == 0]
+        for a in result:
+            for s in self.successors[a]:
+                in_degrees[s] -= 1
+                if in_degrees[s] == 0:
+                    result.append(s)
+        if len(result) != len(in_degrees):
+            raise ValueError('the HSDFG has a cycle without delay.')
+        return result
+
+    ##
+    # @brief      Check if the deadline can be met
+    ##
+    # @param      self  The object
+    ##
+    # @return     True or False
+    ##
+    @property
+    def feasible(self):
+        return all(s <= a for s, a in zip(self.asap, self.alap))
+
+    ##
+    # @brief      Get the start time domain of one actor
+    ##
+    # @param      self   The object
+    # @param      actor  The actor position
+    ##
+    # @return     (lower bound, upper bound), which is empty
+    # if the deadline cannot be met
+    ##
+    def get_start_domain(self, actor):
+        return self.asap[actor], self.alap[actor]
+
+    ##
+    # @brief      Get the report lines
+    ##
+    # @param      self  The object
+    ##
+    # @return     list of strings
+    ##
+    def get_lines(self):
+        result = ['latency lower bound: %s, deadline: %s'
+                  % (self.latency_bound, self.deadline)]
+        result.append('critical path: ' + ' -> '.join(
+            '%s_%s' % (self.hsdfg.actors[a].name, self.hsdfg.actors[a].index)
+            for a in self.critical_path))
+        result.append('actor, asap, alap, slack')
+        for a, one_actor in enumerate(self.hsdfg.actors):
+            result.append('%s_%s, %s, %s, %s'
+                          % (one_actor.name, one_actor.index, self.asap[a],
+                             self.alap[a], self.slack[a]))
+        return result
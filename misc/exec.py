@@ -3,6 +3,7 @@ import tcl_parser
 import os
 import json
 import imp
+import time
 import sys
 import FileDialog
 from sylva.base.fimp import fimp_lib as FIMP_Lib
@@ -16,6 +17,12 @@ from sylva.misc.vhdl_ulti import VHDL as HDL
 from sylva.base.sdf import sdfg as SDFG
 from sylva.base.cgra import cgra as CGRA
 from sylva.dse import dse
+from sylva.dse.dse_engine import assign_fimps
+from sylva.dse.cpsat_engine import CPSATEngine
+from sylva.dse.cgra_engine import CGRAEngine
+from sylva.dse.store import SolutionStore
+from sylva.dse.telemetry import TelemetrySummary, load_trace, \
+    search_result_records
 from sylva.dse.dse_engine_v1 import dse_v1
 import sylva.frontend.simulink2sdf
 import sylva.glic.glic as glic
@@ -23,6 +30,7 @@ from sylva.code_generation.air import air_to_vhdl
 from sylva.code_generation.hsdf_to_vhdl import hsdf_to_vhdl
 from sylva.misc.plot import schedule_plot
 from sylva.code_generation.floorplanner import floorplanner
+from sylva.analysis.validator import validate
 
 args_is_list = [
     'lib_search_path',
@@ -32,7 +40,7 @@ args_is_list = [
 
 args_is_bool = ['create_schedule_plot']
 args_is_int = ['information_level', 'solutions_per_schedule', 'time_limit_in_sec',
-               'low', 'high', 'mid', 'full']
+               'checkpoint_interval_in_sec', 'cache_size', 'low', 'high', 'mid', 'full']
 
 show_path = [
     'fimp_library',
@@ -43,7 +51,7 @@ show_path = [
     'current_solution'
 ]
 show_count = ['solutions']
-hide = ['cmds', 'log', 'critical_log']
+hide = ['cmds', 'log', 'critical_log', 'solution_store']
 
 to_clean = [
     'output_path',
@@ -258,6 +266,14 @@ class SYLVA(DictObject):
             self.execute_floorplan(cmd[1:])
         elif cmd[0] == 'assign_fimps_to_cgra':
             self.execute_assign_fimps_to_cgra()
+        elif cmd[0] == 'validate':
+            self.execute_validate(cmd[1:])
+        elif cmd[0] == 'resume':
+            self.execute_resume(cmd[1:])
+        elif cmd[0] == 'what_if':
+            self.execute_what_if(cmd[1:])
+        elif cmd[0] == 'telemetry':
+            self.execute_telemetry(cmd[1:])
         else:
             self.log_critical('Unaccepted command : {}'.format(cmd))
 
@@ -273,16 +289,21 @@ class SYLVA(DictObject):
         else:
             self.log_critical('Cannot execute {}.'.format(' '.join([write] + args)))
 
+    def open_solution_store(self):
+        if self.solution_store is None:
+            self.solution_store = SolutionStore(self.solution_database or ':memory:')
+        return self.solution_store
+
     def execute_pick_solution(self, args):
-        self.current_solution_file_path = str(args[0]) + ', '
-        self.current_solution = self.solutions[int(args[0])]
+        solution_index = int(args[1]) if len(args) > 1 else -1
+        solution = self.open_solution_store().find_solution(int(args[0]), solution_index)
+        if solution is None:
+            self.log_critical('Error: No solution {} of schedule {}.'.format(
+                solution_index, args[0]))
+            return
 
-        if len(args) > 1:
-            self.current_solution_file_path = (int(args[0]), int(args[1]))
-            self.current_solution = self.current_solution[int(args[1])]
-        else:
-            self.current_solution_file_path = (int(args[0]), len(self.current_solution) - 1)
-            self.current_solution = self.current_solution[-1]
+        self.current_solution_file_path = (solution.schedule_index, solution.solution_index)
+        self.current_solution = solution
 
         self.current_hsdfg = SDFG.load(self.current_solution)
         self.log_critical('Current solution is {}'.format(self.current_solution_file_path))
@@ -320,6 +341,17 @@ class SYLVA(DictObject):
             else:
                 self.log_critical('Executing CGRA floorplanning got no solution.')
 
+    def execute_validate(self, args):
+        attr_name = args[0] if args else 'sdf_graph'
+        if not self[attr_name]:
+            self.log_critical('Error: No {} is loaded.'.format(attr_name))
+            return False
+        self.log_critical('Validating {} ...'.format(attr_name))
+        self.validation_report = validate(self[attr_name])
+        for line in self.validation_report.get_lines():
+            self.log_critical(line)
+        return self.validation_report.valid
+
     def execute_run(self, cmd):
         # print('running command: ', cmd[1:-1])
         print(eval(cmd[1:-1]))
@@ -417,14 +449,15 @@ class SYLVA(DictObject):
 
         mkdir(output_dir)
 
-        if self.solutions:
-            for i, schedules in enumerate(self.solutions):
-                solution = schedules[-1]
-                output_path = os.path.join(output_dir, self.hdl_output_dir_perfix + str(i))
+        solutions = self.open_solution_store().last_solutions()
+        if solutions:
+            for solution in solutions:
+                output_path = os.path.join(
+                    output_dir, self.hdl_output_dir_perfix + str(solution.schedule_index))
                 mkdir(output_path)
                 hsdfg = SDFG.load(solution)
                 air = self.create_air(self.sdf_graph, hsdfg, solution)
-                sample_interval = solution['sample interval']
+                sample_interval = solution.sample_interval
                 air_to_vhdl(air, sample_interval, self.fimp_library, output_path, top_module_name)
             self.log_critical('Writing HDLs is done.')
         else:
@@ -441,13 +474,14 @@ class SYLVA(DictObject):
 
         mkdir(output_dir)
 
-        for schedule_index, schedule in enumerate(self.solutions):
-            fimp_count = len(schedule[-1]['fimp_types'])
-            plot_name = self.fimp_schedule_plot_pattern.replace('INDEX', str(schedule_index))
+        for solution in self.open_solution_store().last_solutions():
+            fimp_count = len(solution['fimp_types'])
+            plot_name = self.fimp_schedule_plot_pattern.replace(
+                'INDEX', str(solution.schedule_index))
             plot_name = plot_name.replace('FIMPS', str(fimp_count))
             plot_path = os.path.join(output_dir, plot_name)
-            hsdfg = SDFG.load(schedule[-1])
-            fimps = [fimp.load_fimp(f) for f in schedule[-1]['fimp_instances']]
+            hsdfg = SDFG.load(solution)
+            fimps = [fimp.load_fimp(f) for f in solution['fimp_instances']]
             for a in hsdfg.actors:
                 a.assign_to(fimps[a.fimp_index])
 
@@ -498,6 +532,15 @@ class SYLVA(DictObject):
         if attr_name == 'simulink_model':
             self.load_simulink_model(file_name)
             self.log_critical('Loading {} from {} is done.'.format(attr_name, file_name))
+        elif attr_name == 'solutions':
+            # the loaded solutions replace the stored ones of their schedules,
+            # as the ones of synthesize, for pick_solution and write
+            search_result = self.load(file_name, attr_name)
+            if search_result:
+                self.solutions = [[dse.Solution.load_from_dict(s) for s in r]
+                                  for r in search_result]
+                self.open_solution_store().add_results(self.solutions)
+                self.log_critical('Loading {} from {} is done.'.format(attr_name, file_name))
         else:
             self[attr_name] = self.load(file_name, attr_name)
             if self[attr_name]:
@@ -516,7 +559,78 @@ class SYLVA(DictObject):
             self.log_critical('ERROR : Dumping {} to file {} failed.'.format(attr_name, file_name))
             self.log_critical(str(e))
 
-    def execute_synthesize(self, args):
+    def execute_what_if(self, args):
+        if not self.current_solution:
+            self.log_critical('Error: No solution is selected.')
+            return
+
+        schedule_index = self.current_solution['schedule_index']
+        if self.what_if_engine is None or \
+                self.what_if_schedule_index != schedule_index:
+            fimps = assign_fimps(self.design.system.sdfg,
+                                 self.current_solution['schedule'])
+            option = dse.solver_option(time_limit=self.time_limit_in_sec * 1000,
+                                       dse_engine=CPSATEngine)
+            self.what_if_engine = dse.create_dse_engine(
+                self.design, option, self.hsdf_graph, fimps,
+                hint=self.current_solution)
+            self.what_if_schedule_index = schedule_index
+
+        names = {'ka': 'KA', 'ke': 'KE', 'kt': 'KT', 'kr': 'KR',
+                 'amax': 'max_area', 'emax': 'max_energy',
+                 'tmax': 'max_latency', 'rmax': 'max_sample_interval'}
+        options = list(chunks(args, 2))
+        unknown = [k for k, _ in options if k not in names]
+        if unknown:
+            self.log_critical('Error: what_if cannot change {}.'.format(
+                ', '.join(unknown)))
+            return
+        kwargs = {names[k]: int(v) for k, v in options}
+
+        start_time = time.time()
+        self.what_if_engine.resolve(**kwargs)
+        result = None
+        while True:
+            solution = self.what_if_engine.next_solution()
+            if solution is None:
+                break
+            result = solution
+
+        if result is None:
+            self.log_critical('What if {}: no solution in {:.3f} seconds.'.format(
+                kwargs, time.time() - start_time))
+        else:
+            self.log_critical(
+                'What if {}: area {}, energy {}, latency {}, sample interval {}'
+                ' in {:.3f} seconds.'.format(
+                    kwargs, result['area'], result['energy'], result['latency'],
+                    result['sample_interval'], time.time() - start_time))
+        self.what_if_solution = result
+
+    def execute_telemetry(self, args):
+        if args:
+            if not os.path.isfile(args[0]):
+                self.log_critical('Error: {} does not exist.'.format(args[0]))
+                return
+            records = load_trace(args[0])
+        elif self.solutions:
+            records = search_result_records(self.solutions)
+        else:
+            self.log_critical('Error: No solution is found.')
+            return
+        self.telemetry_summary = TelemetrySummary(records)
+        for line in self.telemetry_summary.get_lines():
+            self.log_critical(line)
+
+    def execute_resume(self, args):
+        if args:
+            self.checkpoint_file = args[0]
+        if not self.checkpoint_file:
+            self.log_critical('Error: No checkpoint_file is set.')
+            return
+        self.execute_synthesize(['synthesize'], resume=True)
+
+    def execute_synthesize(self, args, resume=False):
 
         if len(args) > 1:
 
@@ -528,7 +642,7 @@ class SYLVA(DictObject):
                 elif v == 'to_asic':
                     self.to_fpga = True
                 elif v == 'to_cgra':
-                    self.to_fpga = True
+                    self.to_cgra = True
                 elif v == 'effort':
                     try:
                         effort = int(args[k + 1])
@@ -551,11 +665,15 @@ class SYLVA(DictObject):
                 kt=self.kt,
                 kr=self.kr,
                 ke=self.ke,
-                ka=self.ka)
+                ka=self.ka,
+                kc=self.kc or 0)
 
             if not self.sdf_graph:
                 raise Exception('No SDF graph loaded, synthesizing abort.')
 
+            if not self.execute_validate(['sdf_graph']):
+                raise Exception('Invalid SDF graph, synthesizing abort.')
+
             self.system = dse.system_model(self.system_name,
                                            self.sdf_graph.actors,
                                            self.sdf_graph.edges,
@@ -577,18 +695,32 @@ class SYLVA(DictObject):
 
             self.design = dse.design_specification(
                 target_architecture=self.target_architecture,
-                system=self.system, fimp_lib=self.fimp_library)
+                system=self.system, fimp_lib=self.fimp_library,
+                cgra=self.cgra)
 
-        self.dse_engine = dse_v1
+        if self.target_architecture == 'CGRA' and self.cgra:
+            # schedule and floorplan in one search
+            self.dse_engine = CGRAEngine
+        else:
+            self.dse_engine = dse_v1
 
         self.option = dse.solver_option(self.effort,
                                         self.solutions_per_schedule,
                                         self.time_limit_in_sec * 1000,
                                         # self.create_schedule_plot,
-                                        self.dse_engine)
-
-        self.solutions, self.hsdf_graph = dse.search_all(self.design, self.option,
-                                                         self.log, self.critical_log)
+                                        self.dse_engine,
+                                        checkpoint=self.checkpoint_file or '',
+                                        cache=self.cache_path or '',
+                                        trace=self.trace_file or '')
+        if self.checkpoint_interval_in_sec is not None:
+            self.option.checkpoint_interval = self.checkpoint_interval_in_sec
+        if self.cache_size is not None:
+            self.option.cache_size = self.cache_size
+
+        search = dse.resume if resume else dse.search_all
+        self.solutions, self.hsdf_graph = search(self.design, self.option,
+                                                 self.log, self.critical_log)
+        self.open_solution_store().add_results(self.solutions)
 
     def execute_define_constraint_and_optimization(self, args):
         for arg in chunks(args, 2):
@@ -863,6 +995,7 @@ if __name__ == '__main__':
             'set_attribute create_schedule_plot true',
             'set_attribute effort_low 10',
             'set_attribute time_limit_in_sec 100',
+            'set_attribute checkpoint_interval_in_sec 60',
             'set_attribute solutions_per_schedule 0',
             'set_attribute dse_engin dse_v1',
             'define_constraint -tmax 1000 -rmax 1000 -emax 1000 -amax 1000',
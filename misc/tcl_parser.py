@@ -82,7 +82,11 @@ if 'all commands' :
     'run',
     'pick_solution',
     'floorplan',
-    'assign_fimps_to_cgra')
+    'assign_fimps_to_cgra',
+    'validate',
+    'resume',
+    'what_if',
+    'telemetry')
 
 if 'set_attribute' :
   attribute= Word(alphas + '_')
@@ -96,11 +100,15 @@ if 'define_constraint' :
   define_constraint_command = (define_constraint + OneOrMore(constraint))
 
 if 'define_optimization' :
-  optimizations = Keywords('ka', 'ke', 'kt', 'kr')
+  optimizations = Keywords('ka', 'ke', 'kt', 'kr', 'kc')
   optimization_objective_name = anyof(optimizations.keys)
   optimization_objective = (Suppress('-') + optimization_objective_name + integer)
   define_optimization_command = (define_optimization + OneOrMore(optimization_objective))
 
+if 'what_if' :
+  what_if_option = (constraint | optimization_objective)
+  what_if_command = (what_if + OneOrMore(what_if_option))
+
 if 'synthesis' :
   synthesis_options = Keywords(
     'to_asic', 'to_fpga', 'to_cgra','effort')
@@ -118,6 +126,9 @@ source_command = (source + value)
 pick_solution_command = (pick_solution + integer + Optional(integer))
 floorplan_command = (floorplan + Optional(integer + Optional(integer)))
 assign_fimps_to_cgra_command = assign_fimps_to_cgra
+validate_command = (validate + Optional(value))
+resume_command = (resume + Optional(value))
+telemetry_command = (telemetry + Optional(value))
 
 if 'generate' :
   generate_outputs = Keywords('vhdl', 'verilog', 'matlab', 'hsdf_graph')
@@ -0,0 +1,293 @@
+import random
+from fractions import Fraction
+from math import gcd
+
+from sylva.base.sylva_base import DataTokenType, Port, Actor, Edge, SDFG
+from sylva.analysis.simulator import SDFSimulator
+from sylva.analysis.looped_schedule import apgan, rpmc
+from sylva.analysis.buffer_sizing import BufferSizing, output_buffer_size, \
+    shared_buffer_size, buffer_addresses
+from sylva.analysis.validator import validate
+from sylva.analysis.partition import partition
+
+
+def create_sdfg():
+    a, b, c, d = [Actor(name=name) for name in ['a', 'b', 'c', 'd']]
+
+    a_dout_b = Port(name='a_dout_b', count=4)
+    a.output_ports.append(a_dout_b)
+    d_dout_b = Port(name='d_dout_b', count=2)
+    d.output_ports.append(d_dout_b)
+
+    a_din_b = Port(name='a_din_b', count=2)
+    d_din_b = Port(name='d_din_b', count=4)
+    b.input_ports += [a_din_b, d_din_b]
+    b_dout_c = Port(name='b_dout_c', count=2)
+    b.output_ports.append(b_dout_c)
+
+    b_din_c = Port(name='b_din_c', count=2)
+    c.input_ports.append(b_din_c)
+
+    Edge(a, a_dout_b, b, a_din_b)
+    Edge(d, d_dout_b, b, d_din_b)
+    Edge(b, b_dout_c, c, b_din_c)
+
+    return SDFG([a, d, b, c], reassign_actor_indexes=True)
+
+
+def test_simulator():
+    sdfg = create_sdfg()
+    received = []
+
+    def source(inputs, outputs):
+        outputs[0][:] = 1
+
+    def add(inputs, outputs):
+        outputs[0][:] = inputs[0] + inputs[1][:2]
+
+    def sink(inputs, outputs):
+        received.append(inputs[0].sum())
+
+    simulator = SDFSimulator(sdfg, kernels={'a': source, 'd': source,
+                                            'b': add, 'c': sink})
+    simulator.run(iterations=10)
+    report = simulator.report()
+
+    assert report['iterations'] == 10
+    assert [a['firings'] for a in report['actors']] == \
+        [10 * r for r in sdfg.repetition_vector]
+    assert all(e['occupancy'] == 0 for e in report['edges'])
+    assert all(e['max_occupancy'] <= e['capacity'] for e in report['edges'])
+    assert received == [4.0] * 20
+
+
+def test_simulator_delay():
+    a, b = Actor('a'), Actor('b')
+    a_dout = Port('a_dout')
+    a_din = Port('a_din')
+    b_dout = Port('b_dout')
+    b_din = Port('b_din')
+    a.output_ports.append(a_dout)
+    a.input_ports.append(a_din)
+    b.output_ports.append(b_dout)
+    b.input_ports.append(b_din)
+    Edge(a, a_dout, b, b_din)
+    Edge(b, b_dout, a, a_din, delay=1)
+    sdfg = SDFG([a, b])
+
+    def increase(inputs, outputs):
+        return [inputs[0] + 1]
+
+    simulator = SDFSimulator(sdfg, kernels={'a': increase, 'b': increase})
+    simulator.run(iterations=5)
+    feedback = simulator.buffers[1]
+    assert feedback.data[feedback.head] == 10
+
+    Edge(b, b_dout, a, a_din)
+    try:
+        SDFSimulator(SDFG([a, b]))
+        assert False
+    except ValueError:
+        pass
+
+
+def create_chain(rates, reassign_actor_indexes=True):
+    actors = [Actor(f'n{i}') for i in range(len(rates) + 1)]
+    for i, (produce, consume) in enumerate(rates):
+        dout = Port('dout', count=produce)
+        din = Port('din', count=consume)
+        actors[i].output_ports.append(dout)
+        actors[i + 1].input_ports.append(din)
+        Edge(actors[i], dout, actors[i + 1], din)
+    return SDFG(actors, reassign_actor_indexes=reassign_actor_indexes)
+
+
+def replay(schedule):
+    sdfg = schedule.sdfg
+    tokens = [e.delay or 0 for e in sdfg.edges]
+    firings = {a.index: 0 for a in sdfg.actors}
+    inputs = {a.index: [] for a in sdfg.actors}
+    outputs = {a.index: [] for a in sdfg.actors}
+    for i, e in enumerate(sdfg.edges):
+        inputs[e.dest_actor.index].append((i, e.dest_port.count))
+        outputs[e.src_actor.index].append((i, e.src_port.count))
+
+    def fire(item):
+        if isinstance(item, Actor):
+            for i, count in inputs[item.index]:
+                tokens[i] -= count
+                assert tokens[i] >= 0, f'{item.name} fires too early'
+            for i, count in outputs[item.index]:
+                tokens[i] += count
+            firings[item.index] += 1
+            return
+        for _ in range(item.count):
+            for one_item in item.body:
+                fire(one_item)
+
+    fire(schedule.root)
+    assert [firings[a.index] for a in sdfg.actors] == \
+        sdfg.repetition_vector
+    assert tokens == [e.delay or 0 for e in sdfg.edges]
+
+
+def create_crossing_sdfg():
+    a, b, c, d, e = [Actor(name) for name in 'abcde']
+    for src, dest, produce, consume in [(a, c, 1, 1), (b, c, 1, 4),
+                                        (a, d, 1, 1), (d, e, 4, 1),
+                                        (b, e, 1, 1)]:
+        dout = Port('dout', count=produce)
+        din = Port('din', count=consume)
+        src.output_ports.append(dout)
+        dest.input_ports.append(din)
+        Edge(src, dout, dest, din)
+    return SDFG([a, b, c, d, e], reassign_actor_indexes=True)
+
+
+def test_looped_schedule():
+    sdfg = create_sdfg()
+    for scheduler in [apgan, rpmc]:
+        schedule = scheduler(sdfg)
+        assert str(schedule) == 'a (2 (2 d) b c)'
+        assert schedule.get_firing_counts() == sdfg.repetition_vector
+        assert schedule.buffer_sizes == [4, 4, 2]
+        assert schedule.buffer_memory == 10
+        replay(schedule)
+
+    sdfg = create_chain([(1, 2), (1, 2)])
+    assert sdfg.repetition_vector == [4, 2, 1]
+    assert str(apgan(sdfg)) == '(2 (2 n0) n1) n2'
+    assert apgan(sdfg).buffer_sizes == [2, 2]
+
+    sdfg = create_crossing_sdfg()
+    for scheduler in [apgan, rpmc]:
+        replay(scheduler(sdfg))
+
+    sdfg = create_chain([(3, 2), (2, 3)] * 500, False)
+    for scheduler in [apgan, rpmc]:
+        schedule = scheduler(sdfg)
+        assert schedule.get_firing_counts() == sdfg.repetition_vector
+        replay(schedule)
+
+    # random consistent DAGs, with the rates from random repetition counts
+    generator = random.Random(1)
+    for _ in range(20):
+        actors = [Actor(f'n{i}') for i in range(12)]
+        counts = [generator.choice([1, 2, 3, 4, 6]) for _ in actors]
+        for dest in range(1, len(actors)):
+            for src in generator.sample(range(dest), min(dest, 2)):
+                g = gcd(counts[src], counts[dest])
+                dout = Port('dout', count=counts[dest] // g)
+                din = Port('din', count=counts[src] // g)
+                actors[src].output_ports.append(dout)
+                actors[dest].input_ports.append(din)
+                Edge(actors[src], dout, actors[dest], din)
+        sdfg = SDFG(actors, reassign_actor_indexes=True)
+        for scheduler in [apgan, rpmc]:
+            replay(scheduler(sdfg))
+
+
+def test_buffer_sizing():
+    sdfg = create_chain([(2, 3), (1, 2)])
+    buffer_sizing = BufferSizing(sdfg)
+    assert buffer_sizing.lower_bounds == [4, 2]
+
+    pareto = buffer_sizing.explore()
+    assert pareto[0].sizes == [4, 2]
+    assert all(x.size < y.size and x.throughput < y.throughput
+               for x, y in zip(pareto, pareto[1:]))
+
+    best = pareto[-1]
+    assert best.throughput == buffer_sizing.throughput(
+        buffer_sizing.upper_bounds)[0]
+    assert buffer_sizing.minimum(best.throughput).size == best.size
+    assert buffer_sizing.minimum(best.throughput * 2) is None
+    assert best.get_port_sizes() == {('n0', 'dout'): best.sizes[0],
+                                     ('n1', 'dout'): best.sizes[1]}
+
+    slow = BufferSizing(sdfg, execution_times={'n2': 10})
+    assert slow.explore()[-1].throughput == Fraction(1, 10)
+
+    # the AIR buffers of the HSDFG actors with the explored sizes
+    sdfg = create_chain([(2, 1), (1, 1), (1, 2)])
+    port_sizes = BufferSizing(sdfg).explore()[0].get_port_sizes()
+    assert port_sizes[('n1', 'dout')] == 1
+    copies = [a for a in sdfg.get_hsdf().actors if a.name == 'n1']
+    port = copies[0].output_ports[0]
+    assert shared_buffer_size(copies, port) == 2
+    assert shared_buffer_size(copies, port, port_sizes) == 1
+    assert shared_buffer_size(copies, port, {('n1', 'dout'): 10}) == 2
+    assert output_buffer_size(copies[0], port, port_sizes) == 1
+    # the tokens of the copies wrap around the shared buffer
+    assert [buffer_addresses(port.count, 1, i * port.count)
+            for i in range(len(copies))] == [[0], [0]]
+    assert buffer_addresses(4, 3, 1) == [1, 2, 0, 1]
+
+
+def test_validator():
+    report = validate(create_sdfg())
+    assert report.valid
+    assert report.repetition_vector == [1, 4, 2, 2]
+    assert report.issues == []
+
+    a, b, c = Actor('a'), Actor('b'), Actor('c')
+    a_dout = Port('a_dout', count=2, dtype=DataTokenType('int8', 8))
+    a_din = Port('a_din')
+    b_dout = Port('b_dout')
+    b_din = Port('b_din', dtype=DataTokenType('int16', 16))
+    c_din = Port('c_din')
+    a.output_ports.append(a_dout)
+    a.input_ports.append(a_din)
+    b.output_ports.append(b_dout)
+    b.input_ports.append(b_din)
+    c.input_ports.append(c_din)
+    Edge(a, a_dout, b, b_din)
+    Edge(b, b_dout, a, a_din)
+    report = validate(SDFG([a, b, c]))
+
+    assert not report.valid
+    assert report.repetition_vector is None
+    assert report.components == [['a', 'b']]
+    assert sorted(i.kind for i in report.errors) == \
+        ['consistency', 'liveness', 'port', 'type']
+    assert len(report.get_lines()) == 2 + len(report.issues)
+
+    def create_loop(delay):
+        a, b = Actor('a'), Actor('b')
+        a_dout = Port('a_dout', count=2)
+        a_din = Port('a_din', count=2)
+        b_dout = Port('b_dout')
+        b_din = Port('b_din')
+        a.output_ports.append(a_dout)
+        a.input_ports.append(a_din)
+        b.output_ports.append(b_dout)
+        b.input_ports.append(b_din)
+        Edge(a, a_dout, b, b_din)
+        Edge(b, b_dout, a, a_din, delay=delay)
+        return SDFG([a, b])
+
+    report = validate(create_loop(1))
+    assert not report.valid
+    assert report.repetition_vector == [1, 2]
+    assert [i.kind for i in report.errors] == ['liveness']
+    assert validate(create_loop(2)).valid
+
+
+def test_partition():
+    sdfg = create_chain([(1, 1)] * 99, False)
+    sdfg.edges[49].src_port.dtype = DataTokenType('int32', 32)
+
+    result = partition(sdfg, k=2)
+    assert result.imbalance <= 1.05
+    assert len(result.cut_edges) == 1
+    assert result.cut_weight == 1
+
+    result = partition(sdfg, k=4)
+    assert result.imbalance <= 1.05
+    assert len(result.cut_edges) == 3
+    for part in range(4):
+        interfaces = result.get_interfaces(part)
+        for e in interfaces['inputs']:
+            assert result.get_part(e.dest_actor) == part
+            assert result.get_part(e.src_actor) != part
+        assert len(result.get_part_edges(part)) == len(result.parts[part]) - 1
@@ -0,0 +1,842 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from sylva.base.cgra import CGRA
+from sylva.base.fimp import FIMPCost, FIMPCostSet, FIMPLibrary, FIMPInstance
+from sylva.dse.dse import solver_option, system_constraint, \
+    system_optimization_objective, system_model, design_specification, \
+    search_all, Solution, ranked_schedules, some_schedules, \
+    schedule_lower_bound, resume, load_checkpoint, save_checkpoint, \
+    iter_solutions, aiter_solutions, ResultWriter, get_result_csv, \
+    create_dse_engine, solution_objective
+from sylva.dse.dse_engine import DSEEngine, all_schedules, iter_schedules, \
+    find_symmetries, assign_fimps
+import sylva.dse.dse as dse_module
+from sylva.dse.cpsat_engine import CPSATEngine
+from sylva.dse.list_engine import ListSchedulingEngine
+from sylva.dse.genetic_engine import GeneticEngine
+from sylva.dse.modulo_engine import ModuloSchedulingEngine
+from sylva.dse.cgra_engine import CGRAEngine
+from sylva.dse.timing import TimingAnalysis
+from sylva.dse.cost_tensor import FIMPCostTensor
+from sylva.dse.cache import ResultCache, design_key
+from sylva.dse.budget import AdaptiveSearch
+from sylva.dse.decompose import find_stages, search_decomposed
+from sylva.dse.pareto import ParetoArchive, ParetoExplorer, \
+    dominates, solution_objectives
+from sylva.dse.store import SolutionStore
+from sylva.dse.telemetry import TelemetrySummary, load_trace, \
+    search_result_records
+
+from test_analysis import create_sdfg
+
+
+def create_design(fimp_counts=(1, 1, 1, 1)):
+    sdfg = create_sdfg()
+    hsdfg = sdfg.get_hsdf()
+
+    fimp_library = FIMPLibrary('FPGA', 'test', {})
+    for a in sdfg.actors:
+        fimp_library.fimp_sets[a.name] = FIMPCostSet(a, [
+            FIMPCost(a.name, 0, area=10, energy=2, computation_phase=4,
+                     input_phase=2, output_phase=2),
+            FIMPCost(a.name, 1, area=20, energy=1, computation_phase=2,
+                     input_phase=1, output_phase=1)])
+
+    fimp_instances = []
+    for a, count in zip(sdfg.actors, fimp_counts):
+        group = [FIMPInstance(a.name, len(fimp_instances) + i, [])
+                 for i in range(count)]
+        for i, hsdf_actor in enumerate(a.child_actors):
+            group[i % count].add(hsdf_actor)
+        fimp_instances += group
+
+    return hsdfg, fimp_library, fimp_instances
+
+
+def last_solution(engine):
+    result = None
+    while True:
+        solution = engine.next_solution()
+        if solution is None:
+            return result
+        result = solution
+
+
+def test_cpsat_engine():
+    for fimp_counts in [(1, 1, 1, 1), (1, 2, 2, 1), (1, 4, 2, 2)]:
+        hsdfg, fimp_library, fimp_instances = create_design(fimp_counts)
+        engine = CPSATEngine(hsdfg, fimp_library, fimp_instances,
+                             KA=1, KT=1, num_search_workers=2)
+        result = last_solution(engine)
+        assert engine.is_optimal()
+
+        start, end = result['start'], result['end']
+        for e in hsdfg.edges:
+            assert start[e.dest_actor.index] > end[e.src_actor.index]
+        for f in fimp_instances:
+            times = sorted((start[a.index], end[a.index]) for a in f.actors)
+            assert all(t[1] < u[0] for t, u in zip(times, times[1:]))
+        assert result['latency'] == max(end)
+        assert len(result['fimp_types']) == len(fimp_instances)
+
+        hsdfg, fimp_library, fimp_instances = create_design(fimp_counts)
+        engine = DSEEngine(hsdfg, fimp_library, fimp_instances,
+                           max_latency=100, KA=1, KT=1)
+        expected = last_solution(engine)
+        assert result['area'] + result['latency'] == \
+            expected['area'] + expected['latency']
+
+    # a running DSEEngine search is tightened by the shared incumbent
+    hsdfg, fimp_library, fimp_instances = create_design((1, 4, 2, 2))
+    incumbent = multiprocessing.Value('q', sys.maxsize)
+    engine = DSEEngine(hsdfg, fimp_library, fimp_instances,
+                       max_latency=100, KA=1, KT=1, incumbent=incumbent)
+    first = engine.next_solution()
+    incumbent.value = expected['area'] + expected['latency']
+    assert first['objective'] > incumbent.value
+    assert engine.next_solution() is None
+
+    # the bounds keep all the search workers of CP-SAT
+    optimum = expected['area'] + expected['latency']
+    hsdfg, fimp_library, fimp_instances = create_design((1, 4, 2, 2))
+    engine = CPSATEngine(hsdfg, fimp_library, fimp_instances, KA=1, KT=1,
+                         num_search_workers=2, upper_bound=optimum + 1)
+    logs = []
+    engine.solver.parameters.log_search_progress = True
+    engine.solver.parameters.log_to_stdout = False
+    engine.solver.log_callback = logs.append
+    result = last_solution(engine)
+    assert result['area'] + result['latency'] == optimum
+    assert any('with 2 workers' in line for line in logs)
+    assert not any('sequential' in line for line in logs)
+    # resolve() removes the upper bound and adds a tighter area bound
+    logs.clear()
+    engine.resolve(max_area=expected['area'] + 1)
+    result = last_solution(engine)
+    assert result['area'] <= expected['area']
+    assert result['area'] + result['latency'] == optimum
+    assert any('with 2 workers' in line for line in logs)
+
+
+def test_symmetry_breaking():
+    hsdfg, _, fimp_instances = create_design((1, 1, 1, 1))
+    assert find_symmetries(hsdfg, fimp_instances) == ([(1, 2), (3, 4)], [])
+    hsdfg, _, fimp_instances = create_design((1, 4, 2, 2))
+    assert find_symmetries(hsdfg, fimp_instances) == ([], [(1, 2), (3, 4)])
+
+    for fimp_counts in [(1, 1, 1, 1), (1, 2, 1, 1), (1, 4, 2, 2)]:
+        objectives = []
+        for engine_type, arguments in [(CPSATEngine, {}),
+                                       (DSEEngine, {'max_latency': 100})]:
+            for symmetry_breaking in [True, False]:
+                hsdfg, fimp_library, fimp_instances = \
+                    create_design(fimp_counts)
+                engine = engine_type(hsdfg, fimp_library, fimp_instances,
+                                     KA=1, KT=1,
+                                     symmetry_breaking=symmetry_breaking,
+                                     **arguments)
+                result = last_solution(engine)
+                objectives.append(result['area'] + result['latency'])
+        assert len(set(objectives)) == 1
+
+
+def test_timing_analysis():
+    hsdfg, fimp_library, fimp_instances = create_design((1, 4, 2, 2))
+    timing = TimingAnalysis(hsdfg, fimp_library, fimp_instances)
+    assert timing.asap == [0, 0, 0, 0, 0, 2, 2, 4, 4]
+    assert timing.latency_bound == 5
+    assert timing.deadline == 4 * len(hsdfg.actors)
+    assert [hsdfg.actors[a].name for a in timing.critical_path] == \
+        ['a', 'b', 'c']
+    assert all(s == 0 for s in timing.slack)
+
+    timing = TimingAnalysis(hsdfg, fimp_library, fimp_instances,
+                            max_latency=5)
+    assert not timing.feasible
+
+    # the start time domains are bounded without latency constraint
+    engine = DSEEngine(hsdfg, fimp_library, fimp_instances, KA=1, KT=1)
+    result = last_solution(engine)
+    engine = CPSATEngine(hsdfg, fimp_library, fimp_instances, KA=1, KT=1)
+    expected = last_solution(engine)
+    assert result['area'] + result['latency'] == \
+        expected['area'] + expected['latency']
+
+
+def test_cost_tensor():
+    hsdfg, fimp_library, fimp_instances = create_design()
+    tensor = FIMPCostTensor(fimp_library, fimp_instances)
+    assert tensor.actor_counts.tolist() == [1, 4, 2, 2]
+    assert tensor.prune(sys.maxsize, sys.maxsize, sys.maxsize,
+                        sys.maxsize).all()
+    # 3 FIMPInstance objects have at least area 10
+    assert tensor.prune(50, sys.maxsize, sys.maxsize,
+                        sys.maxsize).tolist() == [[True, False]] * 4
+    # 4 actors of 4 or 2 cycles on one FIMPInstance
+    assert tensor.prune(sys.maxsize, sys.maxsize, 8, sys.maxsize).tolist() == \
+        [[True, True], [False, True], [True, True], [True, True]]
+    assert not tensor.prune(sys.maxsize, sys.maxsize, 7, sys.maxsize)[1].any()
+
+    area, energy, lower, upper = tensor.evaluate([[0, 0, 0, 0], [1, 1, 1, 1]])
+    assert area.tolist() == [40, 80]
+    assert energy.tolist() == [18, 9]
+    assert lower.tolist() == [15, 7] and upper.tolist() == [35, 17]
+
+    for dse_engine in [DSEEngine, CPSATEngine]:
+        engine = dse_engine(hsdfg, fimp_library, fimp_instances,
+                            max_area=50, KA=1, KT=1)
+        assert last_solution(engine)['fimp_types'] == [0, 0, 0, 0]
+        engine = dse_engine(hsdfg, fimp_library, fimp_instances,
+                            max_latency=7, KA=1, KT=1)
+        assert last_solution(engine) is None
+
+
+def test_resolve():
+    for engine_type, arguments in [(CPSATEngine, {}),
+                                   (DSEEngine, {'max_latency': 100})]:
+        hsdfg, fimp_library, fimp_instances = create_design((1, 4, 2, 2))
+        engine = engine_type(hsdfg, fimp_library, fimp_instances,
+                             KA=1, KT=1, **arguments)
+        last_solution(engine)
+
+        for weights, bounds in [({'KA': 0}, {}),
+                                ({'KA': 1, 'KT': 0}, {}),
+                                ({'KA': 0, 'KT': 1}, {'max_area': 120})]:
+            result = last_solution(engine.resolve(**weights, **bounds))
+
+            hsdfg, fimp_library, fimp_instances = create_design((1, 4, 2, 2))
+            arguments.update(bounds)
+            expected = last_solution(engine_type(
+                hsdfg, fimp_library, fimp_instances,
+                **dict(zip(['KA', 'KE', 'KT', 'KR'], engine.weights)),
+                **arguments))
+            KA, _, KT, _ = engine.weights
+            assert KA * result['area'] + KT * result['latency'] == \
+                KA * expected['area'] + KT * expected['latency']
+
+
+def test_list_engine():
+    for fimp_counts in [(1, 1, 1, 1), (1, 4, 2, 2)]:
+        hsdfg, fimp_library, fimp_instances = create_design(fimp_counts)
+        engine = ListSchedulingEngine(hsdfg, fimp_library, fimp_instances,
+                                      KA=1, KT=1)
+        result = engine.next_solution()
+        assert engine.next_solution() is None
+
+        start, end = result['start'], result['end']
+        for e in hsdfg.edges:
+            assert start[e.dest_actor.index] > end[e.src_actor.index]
+        for f in fimp_instances:
+            times = sorted((start[a.index], end[a.index]) for a in f.actors)
+            assert all(t[1] < u[0] for t, u in zip(times, times[1:]))
+
+        engine = CPSATEngine(hsdfg, fimp_library, fimp_instances,
+                             KA=1, KT=1, hint=result)
+        optimal = last_solution(engine)
+        assert engine.is_optimal()
+        assert optimal['area'] + optimal['latency'] <= \
+            result['area'] + result['latency']
+
+    engine = ListSchedulingEngine(hsdfg, fimp_library, fimp_instances,
+                                  max_latency=2)
+    assert engine.next_solution() is None
+
+
+def test_genetic_engine():
+    for fimp_counts in [(1, 1, 1, 1), (1, 4, 2, 2)]:
+        hsdfg, fimp_library, fimp_instances = create_design(fimp_counts)
+        expected = last_solution(CPSATEngine(hsdfg, fimp_library,
+                                             fimp_instances, KA=1, KT=1))
+
+        results = []
+        for workers in [1, 2]:
+            engine = GeneticEngine(hsdfg, fimp_library, fimp_instances,
+                                   KA=1, KT=1, seed=1, workers=workers)
+            results.append(last_solution(engine))
+            assert engine.is_complete()
+        assert results[0] == dict(results[1], search_time=results[0][
+            'search_time'])
+        assert results[0]['area'] + results[0]['latency'] == \
+            expected['area'] + expected['latency']
+
+    # the worker processes are kept between next_solution() calls
+    hsdfg, fimp_library, fimp_instances = create_design((1, 4, 2, 2))
+    engine = GeneticEngine(hsdfg, fimp_library, fimp_instances,
+                           KA=1, KT=1, seed=1, workers=2)
+    assert engine.next_solution() is not None
+    pool = engine.pool
+    assert pool is not None
+    while not engine.is_complete():
+        engine.next_solution()
+        assert engine.pool is pool or engine.is_complete()
+    assert engine.pool is None
+
+    # the incremental decoding of the children is the full decoding
+    engine = GeneticEngine(hsdfg, fimp_library, fimp_instances,
+                           KA=1, KT=1, seed=1, workers=1, mutation_rate=0.2)
+    engine.initialize()
+    reused = 0
+    for _ in range(200):
+        parent1, parent2 = engine.select_parent(), engine.select_parent()
+        child = engine.create_child(parent1, parent2)
+        assert engine.decode(*child[:2], child[2:]) == \
+            engine.decode(*child[:2])
+        reused += max(engine.first_change(*child[:2], p) for p in child[2:])
+        engine.population.append(engine.evaluate([child])[0])
+    assert reused > 0
+
+    hsdfg, fimp_library, fimp_instances = create_design()
+    engine = GeneticEngine(hsdfg, fimp_library, fimp_instances,
+                           max_latency=7, seed=1, workers=1)
+    assert last_solution(engine) is None
+
+
+def test_modulo_engine():
+    for fimp_counts, initiation_interval in [((1, 1, 1, 1), 8),
+                                             ((1, 4, 2, 2), 2),
+                                             ((1, 2, 1, 1), 4)]:
+        hsdfg, fimp_library, fimp_instances = create_design(fimp_counts)
+        result = last_solution(ModuloSchedulingEngine(
+            hsdfg, fimp_library, fimp_instances))
+        assert result['initiation_interval'] == initiation_interval
+        expected = last_solution(CPSATEngine(
+            hsdfg, fimp_library, fimp_instances, KT=0, KR=1))
+        assert result['sample_interval'] == expected['sample_interval']
+
+        # the computation of each FIMPInstance does not overlap modulo II
+        for one_fimp in fimp_instances:
+            slots = [t % initiation_interval
+                     for a in one_fimp.actors
+                     for t in range(result['start'][a.index],
+                                    result['end'][a.index] + 1)]
+            assert len(slots) == len(set(slots))
+
+    assert ModuloSchedulingEngine(hsdfg, fimp_library, fimp_instances,
+                                  initiation_interval=3).next_solution() \
+        is None
+    result = ModuloSchedulingEngine(hsdfg, fimp_library, fimp_instances,
+                                    initiation_interval=5).next_solution()
+    assert result['initiation_interval'] == 5
+
+
+def test_cgra_engine():
+    hsdfg, fimp_library, fimp_instances = create_design((1, 2, 2, 1))
+    cgra = CGRA(width=6, height=2, hop_x=2, hop_y=1, TC=3, TW=1)
+    engine = CGRAEngine(hsdfg, fimp_library, fimp_instances, cgra=cgra,
+                        KA=1, KT=1, num_search_workers=2)
+    result = last_solution(engine)
+    assert engine.is_optimal()
+
+    x, y, start, end = result['x'], result['y'], \
+        result['start'], result['end']
+    assert len(set(zip(x, y))) == len(fimp_instances)
+    fimp_of = {a.index: f for f, one_fimp in enumerate(fimp_instances)
+               for a in one_fimp.actors}
+    for e in hsdfg.edges:
+        src, dest = fimp_of[e.src_actor.index], fimp_of[e.dest_actor.index]
+        delay = 0
+        if src != dest:
+            routing_points = engine.count_routing_points(
+                abs(x[src] - x[dest]), abs(y[src] - y[dest]))
+            delay = routing_points * (cgra.TC + cgra.TW) + cgra.TW
+        assert start[e.dest_actor.index] > end[e.src_actor.index] + delay
+
+    # the communication time makes the latency longer
+    hsdfg, fimp_library, fimp_instances = create_design((1, 2, 2, 1))
+    expected = last_solution(CPSATEngine(
+        hsdfg, fimp_library, fimp_instances, KA=1, KT=1))
+    assert result['latency'] > expected['latency']
+
+    # one window over the whole fabric without communication time
+    cgra = CGRA(width=6, height=2, hop_x=6, hop_y=2, TC=3, TW=0)
+    communication_cost = None
+    for KC in [0, 1]:
+        hsdfg, fimp_library, fimp_instances = create_design((1, 2, 2, 1))
+        engine = CGRAEngine(hsdfg, fimp_library, fimp_instances, cgra=cgra,
+                            KA=1, KT=1, KC=KC)
+        result = last_solution(engine)
+        assert result['routing_points'] == 0
+        assert result['area'] + result['latency'] == \
+            expected['area'] + expected['latency']
+        if KC:
+            assert result['communication_cost'] < communication_cost
+        communication_cost = result['communication_cost']
+
+    # the ports without data token type send one bit per token
+    hsdfg, fimp_library, fimp_instances = create_design((1, 2, 2, 1))
+    for e in hsdfg.edges:
+        e.src_port.dtype = None
+    result = last_solution(CGRAEngine(hsdfg, fimp_library, fimp_instances,
+                                      cgra=cgra, KA=1, KT=1, KC=1))
+    assert result['communication_cost'] == communication_cost
+
+    # not enough CGRA elements for all the FIMPInstance objects
+    hsdfg, fimp_library, fimp_instances = create_design((1, 2, 2, 1))
+    engine = CGRAEngine(hsdfg, fimp_library, fimp_instances,
+                        cgra=CGRA(width=5, height=1), KT=1)
+    assert engine.next_solution() is None
+
+    sdfg = create_sdfg()
+    system = system_model('test', sdfg, system_constraint(),
+                          system_optimization_objective(ka=1, ke=0, kt=1))
+    design = design_specification(system, fimp_library, cgra, ['CGRA'])
+    results, _ = search_all(design, solver_option(dse_engine=CGRAEngine,
+                                                  workers=1, effort=1))
+    for f in results[0][-1].fimp_instances:
+        assert 0 <= f['x'] < cgra.width and 0 <= f['y'] < cgra.height
+
+    # KC of the design is given to CGRAEngine and weighted in the objective
+    system.optimization_objective = system_optimization_objective(
+        ka=1, ke=0, kt=1, kc=1)
+    option = solver_option(dse_engine=CGRAEngine, workers=1, effort=1)
+    hsdfg = sdfg.get_hsdf()
+    engine = create_dse_engine(design, option, hsdfg,
+                               assign_fimps(sdfg, results[0][-1].schedule))
+    assert engine.KC == 1
+    solution = search_all(design, option)[0][0][-1]
+    assert solution_objective(design, solution) == solution.area + \
+        solution.latency + solution.communication_cost
+
+
+def test_ranked_schedules():
+    sdfg = create_sdfg()
+    hsdfg = sdfg.get_hsdf()
+    _, fimp_library, _ = create_design()
+    system = system_model('test', sdfg, system_constraint(),
+                          system_optimization_objective(ka=1, ke=0, kt=1))
+    design = design_specification(system, fimp_library, None)
+
+    schedules = iter_schedules(sdfg)
+    assert next(schedules) == [1, 4, 2, 2]
+
+    ranked = list(ranked_schedules(design, hsdfg))
+    assert sorted(ranked) == sorted(all_schedules(sdfg))
+    bounds = [schedule_lower_bound(design, hsdfg, s) for s in ranked]
+    assert bounds == sorted(bounds)
+    assert some_schedules(ranked_schedules(design, hsdfg), 34) == ranked[:1]
+
+
+def test_search_all(monkeypatch):
+    sdfg = create_sdfg()
+    _, fimp_library, _ = create_design()
+    system = system_model('test', sdfg, system_constraint(),
+                          system_optimization_objective(ka=1, ke=0, kt=1))
+    design = design_specification(system, fimp_library, None)
+
+    def objectives(results):
+        return [r[-1].area + r[-1].latency for r in results]
+
+    option = solver_option(dse_engine=CPSATEngine, workers=1)
+    results, hsdfg = search_all(design, option)
+    assert len(results) == len(all_schedules(sdfg))
+    assert all(r[-1].schedule_index == i for i, r in enumerate(results))
+    assert len(hsdfg.actors) == sum(sdfg.repetition_vector)
+
+    option = solver_option(dse_engine=CPSATEngine, workers=2)
+    assert objectives(search_all(design, option)[0]) == objectives(results)
+
+    option = solver_option(dse_engine=CPSATEngine, workers=1,
+                           shared_incumbent=True)
+    pruned = search_all(design, option)[0]
+    assert min(objectives(r for r in pruned if r)) == min(objectives(results))
+    assert sum(len(r) for r in pruned) < sum(len(r) for r in results)
+
+    # CP-SAT engines in a pool share the CPU cores
+    hsdfg = sdfg.get_hsdf()
+    fimps = assign_fimps(sdfg, results[0][-1].schedule)
+    option = solver_option(dse_engine=CPSATEngine)
+    monkeypatch.setattr(dse_module, '_pool_workers', 2)
+    engine = create_dse_engine(design, option, hsdfg, fimps)
+    assert engine.num_search_workers == max(1, (os.cpu_count() or 1) // 2)
+
+
+def test_pareto():
+    sdfg = create_sdfg()
+    _, fimp_library, _ = create_design()
+    system = system_model('test', sdfg, system_constraint(),
+                          system_optimization_objective(ka=1, ke=0, kt=1))
+    design = design_specification(system, fimp_library, None)
+    option = solver_option(dse_engine=CPSATEngine)
+
+    archive = ParetoArchive()
+    for values in [(3, 3, 3, 3), (2, 4, 3, 3), (3, 3, 3, 3), (1, 1, 1, 1)]:
+        archive.add(Solution(0, 0, 0, *values))
+    assert archive.points == [(1, 1, 1, 1)]
+
+    explorer = ParetoExplorer(design, option)
+    front = explorer.refine()
+    assert explorer.done
+    keys = [solution_objectives(s) for s in front]
+    assert all(not dominates(a, b) for a in keys for b in keys if a != b)
+
+    results, _ = search_all(design, option)
+    best = min((s for r in results for s in r),
+               key=lambda s: s.area + s.latency)
+    assert any(dominates(k, solution_objectives(best)) for k in keys)
+
+    # the step stopped by the time budget is searched again
+    explorer = ParetoExplorer(design, option)
+    explorer.refine(time_limit=1)
+    assert not explorer.done
+    resumed = explorer.refine()
+    assert explorer.done
+    assert sorted(solution_objectives(s) for s in resumed) == sorted(keys)
+
+
+class FailingEngine(CPSATEngine):
+
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        FailingEngine.created += 1
+        self.number = FailingEngine.created
+
+    def next_solution(self):
+        if self.number == 2:
+            raise RuntimeError('engine failure')
+        return super().next_solution()
+
+
+class SlowEngine(CPSATEngine):
+
+    def next_solution(self):
+        time.sleep(0.5)
+        return super().next_solution()
+
+
+def test_checkpoint(tmp_path):
+    sdfg = create_sdfg()
+    _, fimp_library, _ = create_design()
+    system = system_model('test', sdfg, system_constraint(),
+                          system_optimization_objective(ka=1, ke=0, kt=1))
+    design = design_specification(system, fimp_library, None)
+    checkpoint = str(tmp_path / 'dse.json')
+
+    option = solver_option(dse_engine=CPSATEngine, workers=1,
+                           checkpoint=checkpoint, checkpoint_interval=0)
+    results, _ = search_all(design, option)
+    schedules, finished, incumbent = load_checkpoint(checkpoint)
+    assert len(finished) == len(schedules) == len(results)
+    assert finished[0][-1] == results[0][-1]
+    assert incumbent == min(s.area + s.latency for r in results for s in r)
+
+    # the first schedule is not finished
+    del finished[0]
+    save_checkpoint(checkpoint, design, option, schedules, finished)
+    finished[1][-1].area = -1
+    save_checkpoint(checkpoint + '.1', design, option, schedules, finished)
+    resumed, _ = resume(design, solver_option(
+        dse_engine=CPSATEngine, workers=1, checkpoint=checkpoint))
+    assert resumed[0][-1].area == results[0][-1].area
+    assert resumed[1:] == results[1:]
+    assert len(load_checkpoint(checkpoint)[1]) == len(schedules)
+
+    resumed, _ = resume(design, solver_option(
+        dse_engine=CPSATEngine, workers=1, checkpoint=checkpoint + '.1'))
+    assert resumed[1][-1].area == -1
+
+    # the checkpoint of another solver option is refused
+    try:
+        resume(design, solver_option(dse_engine=CPSATEngine, workers=1,
+                                     checkpoint=checkpoint, effort=1))
+        assert False
+    except ValueError:
+        pass
+
+    # the finished schedules are saved when the search fails
+    FailingEngine.created = 0
+    option = solver_option(dse_engine=FailingEngine, workers=1,
+                           checkpoint=checkpoint + '.2',
+                           trace=checkpoint + '.jsonl')
+    try:
+        search_all(design, option)
+        assert False
+    except RuntimeError:
+        pass
+    finished = load_checkpoint(checkpoint + '.2')[1]
+    assert list(finished) == [0]
+    # the trace has the schedules finished before the failure
+    assert load_trace(checkpoint + '.jsonl') == \
+        search_result_records([finished[0]])
+
+
+def test_result_cache(tmp_path):
+    sdfg = create_sdfg()
+    _, fimp_library, _ = create_design()
+    system = system_model('test', sdfg, system_constraint(),
+                          system_optimization_objective(ka=1, ke=0, kt=1))
+    design = design_specification(system, fimp_library, None)
+    cache_path = str(tmp_path / 'cache')
+
+    option = solver_option(dse_engine=CPSATEngine, workers=1,
+                           cache=cache_path, cache_size=1)
+    results, _ = search_all(design, option)
+    cache = ResultCache(cache_path, 1)
+    key = design_key(design, option)
+    cached = cache.get_results(key)
+    cached[0][-1]['area'] = -1
+    cache.put_results(key, cached)
+    trace_file = str(tmp_path / 'trace.jsonl')
+    option.trace = trace_file
+    assert search_all(design, option)[0][0][-1].area == -1
+    # the results from the cache are also traced
+    assert load_trace(trace_file) == search_result_records(results)
+    option.trace = ''
+
+    system.constraint = system_constraint(tmax=100)
+    assert design_key(design, option) != key
+    assert [r[-1].area + r[-1].latency
+            for r in search_all(design, option)[0]] == \
+        [r[-1].area + r[-1].latency for r in results]
+    # the least recently used result is removed
+    assert cache.get_results(key) is None
+
+    # the FIMP size on the CGRA is in the key
+    key = design_key(design, option)
+    fimp_library.get_fimp_costs(sdfg.actors[0].name)[0].width += 1
+    assert design_key(design, option) != key
+
+
+def test_adaptive_search():
+    sdfg = create_sdfg()
+    _, fimp_library, _ = create_design()
+    system = system_model('test', sdfg, system_constraint(tmax=100),
+                          system_optimization_objective(ka=1, ke=0, kt=1))
+    design = design_specification(system, fimp_library, None)
+
+    def best(results):
+        return min(s.area + s.latency for r in results for s in r)
+
+    expected = best(search_all(design, solver_option(
+        dse_engine=CPSATEngine, workers=1))[0])
+
+    for dse_engine in [CPSATEngine, DSEEngine]:
+        search = AdaptiveSearch(design, solver_option(dse_engine=dse_engine),
+                                slice_time=2000)
+        results = search.search(60000)
+        assert best(results) == expected == search.incumbent
+        assert not search.active_arms()
+        assert all(a.complete or a.lower_bound >= search.incumbent
+                   for a in search.arms)
+
+    # stalled schedules keep the slice time
+    search = AdaptiveSearch(design, solver_option(dse_engine=CPSATEngine),
+                            slice_time=2000)
+    arm = search.arms[0]
+    for _ in range(2):
+        search.run_slice(arm, arm.time_limit)
+        assert arm.solutions and arm.time_limit == 2000
+
+
+def test_iter_solutions(tmp_path, capsys):
+    sdfg = create_sdfg()
+    _, fimp_library, _ = create_design()
+    system = system_model('test', sdfg, system_constraint(),
+                          system_optimization_objective(ka=1, ke=0, kt=1))
+    design = design_specification(system, fimp_library, None)
+    option = solver_option(dse_engine=CPSATEngine, workers=1)
+
+    results, _ = search_all(design, option)
+    expected = [(s.schedule_index, s.area, s.latency)
+                for r in results for s in r]
+
+    csv_file = str(tmp_path / 'result.csv')
+    jsonl_file = str(tmp_path / 'result.jsonl')
+    solutions = []
+    with ResultWriter(csv_file) as csv_writer, \
+            ResultWriter(jsonl_file) as jsonl_writer:
+        for one_solution in iter_solutions(design, option):
+            csv_writer.write(one_solution)
+            jsonl_writer.write(one_solution)
+            # the rows are in the file before the search ends
+            with open(csv_file) as fp:
+                assert len(fp.readlines()) == len(solutions) + 2
+            solutions.append(one_solution)
+    assert [(s.schedule_index, s.area, s.latency)
+            for s in solutions] == expected
+    # the end of each schedule search is not printed
+    assert capsys.readouterr().out == ''
+
+    with open(csv_file) as fp:
+        assert fp.read() == get_result_csv([solutions])
+    with open(jsonl_file) as fp:
+        loaded = [Solution.load_from_dict(json.loads(line)) for line in fp]
+    assert [s.start for s in loaded] == [s.start for s in solutions]
+
+    async def collect():
+        return [s async for s in aiter_solutions(design, option)]
+
+    assert [(s.schedule_index, s.area, s.latency)
+            for s in asyncio.run(collect())] == expected
+
+    # the consumer is cancelled while one search step is running
+    async def cancel():
+        solutions = aiter_solutions(
+            design, solver_option(dse_engine=SlowEngine, workers=1))
+        await solutions.__anext__()
+        step = asyncio.ensure_future(solutions.__anext__())
+        await asyncio.sleep(0.1)
+        step.cancel()
+        try:
+            await step
+            assert False
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel())
+
+    # the solutions of a process pool are given in the order they are found
+    def best(solutions):
+        result = {}
+        for s in solutions:
+            result[s.schedule_index] = min(
+                result.get(s.schedule_index, sys.maxsize), s.area + s.latency)
+        return result
+
+    option = solver_option(dse_engine=CPSATEngine, workers=2)
+    assert best(iter_solutions(design, option)) == best(solutions)
+
+
+def test_telemetry(tmp_path):
+    sdfg = create_sdfg()
+    _, fimp_library, _ = create_design()
+    system = system_model('test', sdfg, system_constraint(),
+                          system_optimization_objective(ka=1, ke=0, kt=1))
+    design = design_specification(system, fimp_library, None)
+    trace_file = str(tmp_path / 'trace.jsonl')
+    option = solver_option(dse_engine=CPSATEngine, workers=1,
+                           trace=trace_file)
+
+    results, _ = search_all(design, option)
+    for r in results:
+        objectives = [s.telemetry.objective for s in r]
+        assert objectives == [s.area + s.latency for s in r]
+        assert objectives == sorted(objectives, reverse=True)
+        for s in r:
+            assert s.telemetry.schedule_index == s.schedule_index
+            assert s.telemetry.search_time == s.search_time
+            assert s.telemetry.failures is not None
+            assert s.telemetry.memory > 0
+            assert 0 <= s.telemetry.objective_bound <= s.telemetry.objective
+            assert 0 <= s.telemetry.gap <= 1
+            # the objective must not be left in the solution fields
+            assert 'objective' not in s
+
+    records = load_trace(trace_file)
+    assert records == search_result_records(results)
+    summary = TelemetrySummary(records)
+    assert summary.best_record.objective == \
+        min(r[-1].area + r[-1].latency for r in results)
+    lines = summary.get_lines()
+    assert lines[0] == f'Telemetry: {len(records)} solution(s) of ' \
+        f'{len(results)} schedule(s).'
+    assert len(lines) == 3 + len(results)
+
+    # the search time of DSEEngine is measured by one_search in seconds
+    solution = Solution.load_from_dict(dict(results[0][-1]))
+    assert solution.telemetry == results[0][-1].telemetry
+    option = solver_option(dse_engine=DSEEngine, workers=1, effort=1)
+    results, _ = search_all(design, option)
+    telemetry = results[0][-1].telemetry
+    assert telemetry.search_time == telemetry.wall_time < 100
+    assert telemetry.failures is not None and telemetry.gap is None
+
+
+def test_solution_store(tmp_path):
+    sdfg = create_sdfg()
+    _, fimp_library, _ = create_design()
+    system = system_model('test', sdfg, system_constraint(),
+                          system_optimization_objective(ka=1, ke=0, kt=1))
+    design = design_specification(system, fimp_library, None)
+    results, _ = search_all(design, solver_option(dse_engine=CPSATEngine,
+                                                  workers=1))
+    file_name = str(tmp_path / 'solutions.db')
+
+    with SolutionStore(file_name) as store:
+        store.add_results(results)
+        # the same schedules are replaced
+        store.add_results(results)
+        assert store.count_solutions() == sum(len(r) for r in results)
+
+    with SolutionStore(file_name) as store:
+        last = store.find_solution(1)
+        assert last.start == results[1][-1].start
+        assert last.telemetry == results[1][-1].telemetry
+        assert last.schedule == results[1][-1].schedule
+        assert store.find_solution(1, 0).area == results[1][0].area
+        assert store.find_solution(len(results)) is None
+        assert [s.area for s in store.last_solutions()] == \
+            [r[-1].area for r in results if r]
+
+        # many solutions with different metrics
+        for i in range(2000):
+            one_solution = Solution.load_from_dict(dict(results[0][-1]))
+            one_solution.area = i * 7 % 101
+            one_solution.energy = i * 13 % 97
+            one_solution.latency = i % 89
+            one_solution.schedule_index = len(results)
+            store.add(one_solution)
+        solutions = store.select(arrays=False)
+        assert len(solutions) == store.count_solutions()
+
+        def metrics(s):
+            return (s.area, s.energy, s.latency, s.sample_interval)
+
+        best = store.top_k(10, ka=1, kt=2, max_energy=50)
+        expected = sorted((s for s in solutions if s.energy < 50),
+                          key=lambda s: (s.area + 2 * s.latency,
+                                         s.solution_id))[:10]
+        assert [s.solution_id for s in best] == \
+            [s.solution_id for s in expected]
+        assert best[0].start == results[0][-1].start
+
+        assert [s.solution_id for s in store.filter_constraints(
+            max_area=20, max_latency=10, arrays=False)] == \
+            [s.solution_id for s in solutions
+             if s.area < 20 and s.latency < 10]
+
+        front = store.pareto_front()
+        assert [metrics(s) for s in front] == sorted(
+            set(metrics(s) for s in solutions
+                if not any(dominates(metrics(t), metrics(s)) and
+                           metrics(t) != metrics(s) for t in solutions)))
+        assert all(s.start is not None for s in front)
+
+        plan = store.connection.execute(
+            'EXPLAIN QUERY PLAN SELECT id FROM solutions WHERE latency < 3'
+        ).fetchall()
+        assert 'solutions_latency' in str(plan)
+
+
+def test_search_decomposed():
+    sdfg = create_sdfg()
+    _, fimp_library, _ = create_design()
+    system = system_model('test', sdfg, system_constraint(),
+                          system_optimization_objective(ka=1, ke=0, kt=1))
+    design = design_specification(system, fimp_library, None)
+
+    assert [[a.name for a in s] for s in find_stages(sdfg)] == \
+        [['d'], ['a'], ['b'], ['c']]
+    assert [[a.name for a in s] for s in find_stages(sdfg, True)] == \
+        [['a', 'd'], ['b'], ['c']]
+
+    expected = search_all(design, solver_option(dse_engine=CPSATEngine,
+                                                 workers=1))[0]
+    for by_layers, polish_pass in [(False, False), (True, True)]:
+        results, hsdfg = search_decomposed(design, solver_option(workers=1),
+                                           by_layers, polish_pass)
+        positions = {id(a): i for i, a in enumerate(hsdfg.actors)}
+        for result, exact in zip(results, expected):
+            best = result[-1]
+            assert best.area + best.latency == \
+                exact[-1].area + exact[-1].latency
+            for e in hsdfg.edges:
+                if not e.delay:
+                    assert best.start[positions[id(e.dest_actor)]] > \
+                        best.end[positions[id(e.src_actor)]]